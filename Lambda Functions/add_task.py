@@ -1,11 +1,13 @@
 import json
-import boto3
 import uuid
+from botocore.exceptions import ClientError
+from flatchat.http import respond
+from flatchat import idempotency, log, metrics, versioning
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('Households')
-
+@metrics.invocation
+@idempotency.idempotent()
 def lambda_handler(event, context):
+    log.request(event, context)
     try:
         body = json.loads(event['body'])
         household_id = body.get('HouseholdID')
@@ -15,11 +17,7 @@ def lambda_handler(event, context):
         due_date = body.get('DueDate')
 
         if not household_id or not title:
-            return {
-                "statusCode": 400,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps("Missing required fields")
-            }
+            return respond(400, "Missing required fields")
 
         new_task = {
             "TaskID": str(uuid.uuid4()),
@@ -30,25 +28,23 @@ def lambda_handler(event, context):
             "Completed": False
         }
 
-        #Add task to Household's task list
-        table.update_item(
-            Key={"HouseholdID": household_id},
-            UpdateExpression="SET Tasks = list_append(if_not_exists(Tasks, :empty_list), :task)",
-            ExpressionAttributeValues={
-                ":task": [new_task],
-                ":empty_list": []
+        #Add task to Household's task list, stamped with the next tasks version.
+        #The version check makes concurrent task writes take turns.
+        def changes(household, version, now):
+            new_task["Version"] = version
+            return {
+                "sets": ["Tasks = list_append(if_not_exists(Tasks, :empty_list), :task)"],
+                "values": {":task": [new_task], ":empty_list": []}
             }
-        )
 
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Task added", "task": new_task})
-        }
+        try:
+            versioning.TASKS.write(household_id, changes=changes, projection="TasksVersion")
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return respond(409, "Tasks changed concurrently, please retry")
+
+        return respond(200, {"message": "Task added", "task": new_task})
     
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps(f"Error: {str(e)}")
-        }
+        return respond(500, f"Error: {str(e)}")
@@ -1,18 +1,72 @@
 import os
+import io
+import csv
 import json
+import time
 import uuid
 import base64
+import argparse
+from datetime import datetime
 from decimal import Decimal, InvalidOperation
-import boto3
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
+from flatchat.http import respond, CORS_HEADERS
+from flatchat import aws, encoding, idempotency, log, metrics
+from flatchat.validation import Boolean, List, Number, Object, Schema, String, ValidationError
 
-dynamodb = boto3.resource('dynamodb', region_name='eu-west-1')
-s3_client = boto3.client('s3', region_name='eu-west-1')
+dynamodb = aws.resource('dynamodb', region_name='eu-west-1')
+s3_client = aws.client('s3', region_name='eu-west-1')
 
 TABLE_NAME = os.environ.get('BILLS_TABLE', 'Bills')
+ROLLUPS_TABLE_NAME = os.environ.get('BILL_ROLLUPS_TABLE', 'BillRollups')
 BILLS_BUCKET = os.environ.get('BILLS_BUCKET', 'my-bills-bucket-flatchat')
-table = dynamodb.Table(TABLE_NAME)
+table = aws.table(TABLE_NAME, region_name='eu-west-1')
+rollups_table = aws.table(ROLLUPS_TABLE_NAME, region_name='eu-west-1')
+
+# Rollup items live in BillRollups under the household's partition:
+#   RollupKey "2025-03"                 -> household totals for the month
+#   RollupKey "2025-03#MEMBER#<UserID>" -> that member's shares for the month
+ROLLUP_FIELDS = ("TotalAmount", "PaidAmount", "OutstandingAmount", "BillCount")
+UNDATED_MONTH = "undated"
+
+IMPORT_MAX_ROWS = int(os.environ.get('BILL_IMPORT_MAX_ROWS', '5000'))
+BATCH_WRITE_SIZE = 25
+BATCH_WRITE_MAX_ATTEMPTS = 6
+
+# Exports up to EXPORT_INLINE_BYTES come back in the response body; anything
+# bigger is streamed to S3 in EXPORT_PART_BYTES multipart chunks (S3 needs
+# at least 5 MB per part) and a presigned link is returned instead.
+EXPORT_INLINE_BYTES = int(os.environ.get('BILL_EXPORT_INLINE_BYTES', str(1024 * 1024)))
+EXPORT_PART_BYTES = int(os.environ.get('BILL_EXPORT_PART_BYTES', str(8 * 1024 * 1024)))
+EXPORT_LINK_SECONDS = 3600
+EXPORT_COLUMNS = ["BillID", "Title", "Description", "TotalAmount", "DueBy", "CreatedAt", "Members", "PaidMembers", "Splits", "ImageURL"]
+
+# Request bodies for the JSON routes. BillID, CreatedAt and Revision are
+# ours to set, so clients cannot send them; ImageData leaves room for a
+# base64 image inside API Gateway's payload limit.
+BILL_UPDATE = Schema({
+    "HouseholdID": String(max_length=128),
+    "Title": String(max_length=200),
+    "Description": String(max_length=2000),
+    "TotalAmount": Number(minimum=0, maximum=1_000_000, places=2),
+    "DueBy": String(max_length=32),
+    "Members": List(String(max_length=128), max_items=50),
+    "PaidMembers": List(String(max_length=128), max_items=50),
+    "Splits": List(Object({
+        "UserID": String(max_length=128, required=True),
+        "Share": Number(minimum=0, maximum=1_000_000, places=2),
+        "Paid": Boolean(),
+    }), max_items=50),
+    "ImageData": String(max_length=5_500_000),
+    "ImageContentType": String(max_length=64, pattern=r"image/[\w.+-]+"),
+    "ImageURL": String(max_length=2048),
+}, max_bytes=6 * 1024 * 1024)
+BILL_CREATE = BILL_UPDATE.extend(required=("Title",))
+
+REQUEST_SCHEMAS = {
+    ("POST", "/bills"): BILL_CREATE,
+    ("PUT", "/bills/{id}"): BILL_UPDATE,
+}
 
 def upload_image_to_s3(image_data, content_type):
     """
@@ -20,8 +74,7 @@ def upload_image_to_s3(image_data, content_type):
     Returns the S3 URL if successful.
     """
     try:
-        print("Uploading image with content type:", content_type)
-        print("Image data (first 100 chars):", image_data[:100])
+        log.debug("uploading bill image", contentType=content_type, bytes=len(image_data))
         
         decoded_image = base64.b64decode(image_data)
 
@@ -38,28 +91,549 @@ def upload_image_to_s3(image_data, content_type):
         return f"https://{BILLS_BUCKET}.s3.eu-west-1.amazonaws.com/{key}"
     
     except ClientError as e:
-        print("Error uploading image:", e)
+        log.error("bill image upload failed", error=str(e))
         return None
 
-def lambda_handler(event, context):
-    print("Received event:", json.dumps(event))
-    
+def bill_month(bill):
+    """
+    Returns the YYYY-MM bucket a bill is rolled up under: its DueBy month,
+    falling back to when it was created.
+    """
+    for field in ("DueBy", "CreatedAt"):
+        value = str(bill.get(field) or "")
+        if len(value) >= 7 and value[4] == "-" and value[:4].isdigit() and value[5:7].isdigit():
+            return value[:7]
+    return UNDATED_MONTH
+
+def equal_splits(total_amount, members):
+    """
+    Splits total_amount evenly across members to the cent. The leftover
+    cents go one each to the first members so the shares always add up to
+    the total exactly. Amounts are whole cents: create and import reject
+    anything finer.
+    """
+    if not members:
+        return []
+    cents = int(total_amount * 100)
+    base, remainder = divmod(cents, len(members))
+    return [
+        {"UserID": user, "Share": (Decimal(base + (1 if i < remainder else 0)) / 100).quantize(Decimal("0.01")), "Paid": False}
+        for i, user in enumerate(members)
+    ]
+
+def to_decimal(value):
     try:
-        if "body" in event:
-            payload = json.loads(event.get("body") or "{}")
+        return Decimal(str(value if value not in (None, "") else "0"))
+    except (InvalidOperation, ValueError):
+        return Decimal("0")
+
+def bill_contributions(bill):
+    """
+    Works out what a single bill adds to its month's rollup items.
+    Returns {RollupKey: {field: Decimal}}.
+    """
+    if not bill:
+        return {}
+
+    month = bill_month(bill)
+    total = to_decimal(bill.get("TotalAmount"))
+    paid_members = set(bill.get("PaidMembers") or [])
+
+    splits = bill.get("Splits")
+    if not splits:
+        splits = equal_splits(total, bill.get("Members") or [])
+
+    contributions = {}
+    paid_total = Decimal("0")
+    for split in splits:
+        user = split.get("UserID")
+        if not user:
+            continue
+        share = to_decimal(split.get("Share"))
+        paid = share if (split.get("Paid") or user in paid_members) else Decimal("0")
+        paid_total += paid
+        contributions[f"{month}#MEMBER#{user}"] = {
+            "TotalAmount": share,
+            "PaidAmount": paid,
+            "OutstandingAmount": share - paid,
+            "BillCount": Decimal("1")
+        }
+
+    contributions[month] = {
+        "TotalAmount": total,
+        "PaidAmount": paid_total,
+        "OutstandingAmount": total - paid_total,
+        "BillCount": Decimal("1")
+    }
+    return contributions
+
+def rollup_deltas(old_bill, new_bill):
+    """
+    Difference between the rollup contributions of the old and new version
+    of a bill. Either side may be None for creates and deletes.
+    """
+    deltas = {}
+    for sign, bill in ((Decimal("-1"), old_bill), (Decimal("1"), new_bill)):
+        for rollup_key, values in bill_contributions(bill).items():
+            entry = deltas.setdefault(rollup_key, {field: Decimal("0") for field in ROLLUP_FIELDS})
+            for field, value in values.items():
+                entry[field] += sign * value
+    return {
+        rollup_key: values for rollup_key, values in deltas.items()
+        if any(value != 0 for value in values.values())
+    }
+
+def rollup_update(household_id, rollup_key, values):
+    """Builds the transactional ADD for one rollup item."""
+    month, _, user = rollup_key.partition("#MEMBER#")
+    names = {f"#{field}": field for field in values}
+    attr_values = {f":{field}": value for field, value in values.items()}
+    set_clauses = ["#Month = :month"]
+    names["#Month"] = "Month"
+    attr_values[":month"] = month
+    if user:
+        set_clauses.append("#UserID = :user")
+        names["#UserID"] = "UserID"
+        attr_values[":user"] = user
+    return {
+        "Update": {
+            "TableName": ROLLUPS_TABLE_NAME,
+            "Key": {"HouseholdID": household_id, "RollupKey": rollup_key},
+            "UpdateExpression": "SET " + ", ".join(set_clauses) + " ADD " + ", ".join(f"#{field} :{field}" for field in values),
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": attr_values
+        }
+    }
+
+def write_bill_with_rollups(household_id, bill_id, new_bill=None, old_bill=None):
+    """
+    Writes (or deletes, when new_bill is None) a bill and applies the matching
+    rollup deltas in one DynamoDB transaction. The bill's Revision guards
+    against a concurrent edit slipping in between our read and this write.
+    Raises ClientError(TransactionCanceledException) when the guard fails.
+    """
+    key = {"HouseholdID": household_id, "BillID": bill_id}
+    if old_bill is None:
+        condition = {"ConditionExpression": "attribute_not_exists(BillID)"}
+    elif "Revision" in old_bill:
+        condition = {
+            "ConditionExpression": "Revision = :rev",
+            "ExpressionAttributeValues": {":rev": old_bill["Revision"]}
+        }
+    else:
+        condition = {"ConditionExpression": "attribute_exists(BillID) AND attribute_not_exists(Revision)"}
+
+    if new_bill is not None:
+        new_bill["Revision"] = (old_bill or {}).get("Revision", 0) + 1
+        bill_action = {"Put": {"TableName": TABLE_NAME, "Item": new_bill, **condition}}
+    else:
+        bill_action = {"Delete": {"TableName": TABLE_NAME, "Key": key, **condition}}
+
+    actions = [bill_action]
+    for rollup_key, values in rollup_deltas(old_bill, new_bill).items():
+        actions.append(rollup_update(household_id, rollup_key, values))
+
+    dynamodb.meta.client.transact_write_items(TransactItems=actions)
+
+def is_write_conflict(error):
+    return error.response.get("Error", {}).get("Code") in ("TransactionCanceledException", "ConditionalCheckFailedException")
+
+def get_summary(household_id, from_month=None, to_month=None):
+    """
+    Reads the household and member rollup items for a range of months
+    instead of the full bill history.
+    """
+    if from_month and to_month:
+        condition = Key("HouseholdID").eq(household_id) & Key("RollupKey").between(from_month, to_month + "~")
+    elif from_month:
+        condition = Key("HouseholdID").eq(household_id) & Key("RollupKey").gte(from_month)
+    elif to_month:
+        condition = Key("HouseholdID").eq(household_id) & Key("RollupKey").lte(to_month + "~")
+    else:
+        condition = Key("HouseholdID").eq(household_id)
+
+    items = []
+    query_kwargs = {"KeyConditionExpression": condition}
+    while True:
+        result = rollups_table.query(**query_kwargs)
+        items.extend(result.get("Items", []))
+        if "LastEvaluatedKey" not in result:
+            break
+        query_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
+    months = {}
+    for item in items:
+        month, _, user = item["RollupKey"].partition("#MEMBER#")
+        summary = months.setdefault(month, {"Month": month, "Members": {}})
+        values = {field: item.get(field, Decimal("0")) for field in ROLLUP_FIELDS}
+        if user:
+            summary["Members"][user] = values
         else:
-            payload = event
+            summary.update(values)
+    return [months[month] for month in sorted(months)]
+
+def iter_bills(household_id):
+    """Yields a household's bills one page of the Bills query at a time."""
+    query_kwargs = {"KeyConditionExpression": Key("HouseholdID").eq(household_id)}
+    while True:
+        result = table.query(**query_kwargs)
+        yield from result.get("Items", [])
+        if "LastEvaluatedKey" not in result:
+            break
+        query_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
+def rebuild_rollups(household_id):
+    """
+    Recomputes a household's rollups from its full bill history and replaces
+    the stored items. Used for backfill and to repair drift.
+    """
+    totals = {}
+    bill_count = 0
+    for bill in iter_bills(household_id):
+        bill_count += 1
+        for rollup_key, values in bill_contributions(bill).items():
+            entry = totals.setdefault(rollup_key, {field: Decimal("0") for field in ROLLUP_FIELDS})
+            for field, value in values.items():
+                entry[field] += value
+
+    stale_keys = []
+    query_kwargs = {
+        "KeyConditionExpression": Key("HouseholdID").eq(household_id),
+        "ProjectionExpression": "RollupKey"
+    }
+    while True:
+        result = rollups_table.query(**query_kwargs)
+        stale_keys.extend(item["RollupKey"] for item in result.get("Items", []) if item["RollupKey"] not in totals)
+        if "LastEvaluatedKey" not in result:
+            break
+        query_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
+    with rollups_table.batch_writer() as batch:
+        for rollup_key in stale_keys:
+            batch.delete_item(Key={"HouseholdID": household_id, "RollupKey": rollup_key})
+        for rollup_key, values in totals.items():
+            month, _, user = rollup_key.partition("#MEMBER#")
+            item = {"HouseholdID": household_id, "RollupKey": rollup_key, "Month": month, **values}
+            if user:
+                item["UserID"] = user
+            batch.put_item(Item=item)
+
+    return {"HouseholdID": household_id, "BillsRead": bill_count, "RollupItems": len(totals)}
+
+def parse_import_rows(body, content_type):
+    """
+    Yields (row_number, dict) from a CSV or NDJSON import body one row at a
+    time. Rows that are not valid JSON come through as (row_number, None).
+    """
+    if "csv" in content_type:
+        for row_number, row in enumerate(csv.DictReader(io.StringIO(body)), start=1):
+            yield row_number, row
+    else:
+        for row_number, line in enumerate(io.StringIO(body), start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line, parse_float=Decimal)
+            except json.JSONDecodeError:
+                yield row_number, None
+
+def split_list(value):
+    """CSV cells hold lists as 'a;b;c'; NDJSON rows send real arrays."""
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value or "").replace("|", ";").split(";") if v.strip()]
+
+def validate_import_row(row, household_id, created_at):
+    """
+    Turns one import row into a bill item, or returns the list of problems
+    with it. Splits are computed here so nothing needs a second pass.
+    """
+    if not isinstance(row, dict):
+        return None, ["Row is not a JSON object"]
+
+    errors = []
+    title = str(row.get("Title") or "").strip()
+    if not title:
+        errors.append("Title is required")
+
+    try:
+        total_amount = Decimal(str(row.get("TotalAmount", "")).strip())
+        if not total_amount.is_finite() or total_amount <= 0:
+            errors.append("TotalAmount must be a positive number")
+        elif total_amount.normalize().as_tuple().exponent < -2:
+            errors.append("TotalAmount must have at most 2 decimal places")
+    except (InvalidOperation, ValueError):
+        errors.append("Invalid TotalAmount value")
+
+    due_by = str(row.get("DueBy") or "").strip()
+    if due_by:
+        try:
+            datetime.strptime(due_by[:10], "%Y-%m-%d")
+        except ValueError:
+            errors.append("DueBy must be YYYY-MM-DD")
+
+    members = split_list(row.get("Members"))
+    paid_members = [user for user in split_list(row.get("PaidMembers")) if user in members]
+
+    if errors:
+        return None, errors
+
+    bill = {
+        "HouseholdID": household_id,
+        "BillID": str(uuid.uuid4()),
+        "Title": title,
+        "Description": str(row.get("Description") or ""),
+        "TotalAmount": str(total_amount),
+        "DueBy": due_by,
+        "Members": members,
+        "PaidMembers": paid_members,
+        "CreatedAt": created_at,
+        "Revision": 1
+    }
+    if members:
+        bill["Splits"] = equal_splits(total_amount, members)
+        for split in bill["Splits"]:
+            split["Paid"] = split["UserID"] in paid_members
+    return bill, []
+
+def batch_put_bills(bills):
+    """
+    Writes bills through BatchWriteItem, retrying unprocessed items with
+    backoff. Returns the BillIDs that still could not be written.
+    """
+    pending = [{"PutRequest": {"Item": bill}} for bill in bills]
+    attempt = 0
+    while pending and attempt < BATCH_WRITE_MAX_ATTEMPTS:
+        if attempt:
+            time.sleep(min(0.05 * (2 ** attempt), 2))
+        unprocessed = []
+        for start in range(0, len(pending), BATCH_WRITE_SIZE):
+            chunk = pending[start:start + BATCH_WRITE_SIZE]
+            result = dynamodb.batch_write_item(RequestItems={TABLE_NAME: chunk})
+            unprocessed.extend(result.get("UnprocessedItems", {}).get(TABLE_NAME, []))
+        pending = unprocessed
+        attempt += 1
+    return {request["PutRequest"]["Item"]["BillID"] for request in pending}
+
+def apply_rollup_totals(household_id, bills):
+    """
+    Adds the combined contributions of many new bills to the rollups with a
+    single update per rollup item rather than one per bill. These updates
+    are not in a transaction with the bill writes, so a failed one is
+    logged and its RollupKey returned rather than raised.
+    """
+    totals = {}
+    for bill in bills:
+        for rollup_key, values in bill_contributions(bill).items():
+            entry = totals.setdefault(rollup_key, {field: Decimal("0") for field in ROLLUP_FIELDS})
+            for field, value in values.items():
+                entry[field] += value
+    failed = []
+    for rollup_key, values in totals.items():
+        update = rollup_update(household_id, rollup_key, values)["Update"]
+        update.pop("TableName")
+        try:
+            rollups_table.update_item(**update)
+        except ClientError as e:
+            log.error("import rollup update failed", rollupKey=rollup_key, error=str(e))
+            failed.append(rollup_key)
+    return failed
 
+def import_bills(household_id, body, content_type):
+    """
+    Validates an import body row by row, batch-writes the good rows and
+    returns a per-row report. If some rollups could not be updated the
+    report says so under "rollups", and the summary stays wrong until
+    POST /bills/rollups/rebuild is run.
+    """
+    created_at = datetime.utcnow().isoformat() + "Z"
+    report = []
+    bills = []
+    for row_number, row in parse_import_rows(body, content_type):
+        if len(bills) + len(report) >= IMPORT_MAX_ROWS:
+            report.append({"Row": row_number, "Status": "error", "Errors": [f"Import is limited to {IMPORT_MAX_ROWS} rows"]})
+            break
+        bill, errors = validate_import_row(row, household_id, created_at)
+        if errors:
+            report.append({"Row": row_number, "Status": "error", "Errors": errors})
+        else:
+            bills.append((row_number, bill))
+
+    failed_ids = batch_put_bills([bill for _, bill in bills])
+    written = [bill for _, bill in bills if bill["BillID"] not in failed_ids]
+    failed_rollups = apply_rollup_totals(household_id, written)
+
+    for row_number, bill in bills:
+        if bill["BillID"] in failed_ids:
+            report.append({"Row": row_number, "Status": "error", "Errors": ["Write was throttled, please retry this row"]})
+        else:
+            report.append({"Row": row_number, "Status": "imported", "BillID": bill["BillID"]})
+    report.sort(key=lambda entry: entry["Row"])
+
+    result = {
+        "imported": len(written),
+        "failed": len(report) - len(written),
+        "rows": report
+    }
+    if failed_rollups:
+        result["rollups"] = {
+            "failed": sorted(failed_rollups),
+            "message": "The bills were imported but some summaries were not updated; "
+                       "run POST /bills/rollups/rebuild to recompute them"
+        }
+    return result
+
+def encode_export_rows(bills, export_format):
+    """
+    Encodes bills lazily as CSV or NDJSON, yielding one encoded row at a
+    time. CSV lists use the same 'a;b;c' form the import endpoint reads.
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for bill in bills:
+            row = []
+            for column in EXPORT_COLUMNS:
+                value = bill.get(column, "")
+                if column == "Splits":
+                    value = ";".join(f"{split.get('UserID')}:{split.get('Share')}" for split in value or [])
+                elif isinstance(value, list):
+                    value = ";".join(str(v) for v in value)
+                row.append(value)
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    else:
+        for bill in bills:
+            yield encoding.dumps(bill) + "\n"
+
+def export_bills(household_id, export_format):
+    """
+    Streams a household's bill history through the encoder. Small exports
+    are returned inline; once the output passes EXPORT_INLINE_BYTES it is
+    switched to an S3 multipart upload so memory stays at about one part.
+    """
+    extension = "csv" if export_format == "csv" else "ndjson"
+    content_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    key = f"exports/{household_id}/bills-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.{extension}"
+
+    buffer = io.BytesIO()
+    upload_id = None
+    parts = []
+    rows = 0
+
+    def counted(bills):
+        nonlocal rows
+        for bill in bills:
+            rows += 1
+            yield bill
+
+    def flush_part():
+        part_number = len(parts) + 1
+        result = s3_client.upload_part(
+            Bucket=BILLS_BUCKET, Key=key, UploadId=upload_id,
+            PartNumber=part_number, Body=buffer.getvalue()
+        )
+        parts.append({"ETag": result["ETag"], "PartNumber": part_number})
+        buffer.seek(0)
+        buffer.truncate()
+
+    try:
+        for chunk in encode_export_rows(counted(iter_bills(household_id)), export_format):
+            buffer.write(chunk.encode("utf-8"))
+            if upload_id is None and buffer.tell() > EXPORT_INLINE_BYTES:
+                upload_id = s3_client.create_multipart_upload(
+                    Bucket=BILLS_BUCKET, Key=key, ContentType=content_type
+                )["UploadId"]
+            if upload_id is not None and buffer.tell() >= EXPORT_PART_BYTES:
+                flush_part()
+
+        if upload_id is None:
+            return {"inline": True, "content_type": content_type, "body": buffer.getvalue().decode("utf-8"), "rows": rows}
+
+        if buffer.tell() or not parts:
+            flush_part()
+        s3_client.complete_multipart_upload(
+            Bucket=BILLS_BUCKET, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": parts}
+        )
+    except Exception:
+        if upload_id is not None:
+            s3_client.abort_multipart_upload(Bucket=BILLS_BUCKET, Key=key, UploadId=upload_id)
+        raise
+
+    url = s3_client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": BILLS_BUCKET, "Key": key},
+        ExpiresIn=EXPORT_LINK_SECONDS
+    )
+    return {"inline": False, "url": url, "rows": rows, "expiresIn": EXPORT_LINK_SECONDS}
+
+@metrics.invocation
+@idempotency.idempotent(routes={("POST", "/bills"), ("POST", "/bills/import")})
+def lambda_handler(event, context):
+    log.request(event, context)
+    
+    try:
         method = event.get("httpMethod", "")
         path_params = event.get("pathParameters") or {}
         query_params = event.get("queryStringParameters") or {}
         bill_id = path_params.get("id")
+        resource_path = event.get("resource", "")
+
+        if method == "POST" and resource_path == "/bills/import":
+            # Import bodies are CSV/NDJSON, so HouseholdID comes from the query string
+            household_id = query_params.get("HouseholdID")
+            if not household_id:
+                return respond(400, {"message": "Missing HouseholdID"})
+            body = event.get("body") or ""
+            if event.get("isBase64Encoded"):
+                body = base64.b64decode(body).decode("utf-8")
+            headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+            content_type = (query_params.get("format") or headers.get("content-type") or "").lower()
+            result = import_bills(household_id, body, content_type)
+            # 207: the bills were written but the summary totals are stale
+            return respond(207 if "rollups" in result else 200, result)
+
+        schema = REQUEST_SCHEMAS.get((method, resource_path))
+        if "body" not in event:
+            payload = event
+        elif schema:
+            payload = schema.parse(event)
+        else:
+            payload = json.loads(event.get("body") or "{}")
 
         household_id = query_params.get("HouseholdID") or payload.get("HouseholdID")
         if not household_id:
             return respond(400, {"message": "Missing HouseholdID"})
 
-        if method == "GET":
+        if method == "GET" and resource_path == "/bills/summary":
+            months = get_summary(household_id, query_params.get("from"), query_params.get("to"))
+            return respond(200, {"months": months})
+
+        elif method == "GET" and resource_path == "/bills/export":
+            export_format = (query_params.get("format") or "csv").lower()
+            if export_format not in ("csv", "ndjson"):
+                return respond(400, {"message": "format must be csv or ndjson"})
+            export = export_bills(household_id, export_format)
+            if export["inline"]:
+                return {
+                    "statusCode": 200,
+                    "headers": {
+                        **CORS_HEADERS,
+                        "Content-Type": export["content_type"],
+                        "Content-Disposition": f"attachment; filename=bills.{export_format}"
+                    },
+                    "body": export["body"]
+                }
+            return respond(200, {"url": export["url"], "rows": export["rows"], "expiresIn": export["expiresIn"]})
+
+        elif method == "POST" and resource_path == "/bills/rollups/rebuild":
+            return respond(200, rebuild_rollups(household_id))
+
+        elif method == "GET":
             if bill_id:
                 result = table.get_item(Key={"HouseholdID": household_id, "BillID": bill_id})
                 return respond(200, result.get("Item", {})) if "Item" in result else respond(404, {"message": "Bill not found"})
@@ -72,6 +646,7 @@ def lambda_handler(event, context):
             bill_id = str(uuid.uuid4())
             data["BillID"] = bill_id
             data["HouseholdID"] = household_id
+            data["CreatedAt"] = datetime.utcnow().isoformat() + "Z"
 
             if "ImageData" in data and "ImageContentType" in data:
                 image_url = upload_image_to_s3(data["ImageData"], data["ImageContentType"])
@@ -81,6 +656,9 @@ def lambda_handler(event, context):
                 data.pop("ImageContentType", None)
 
             data["Members"] = data.get("Members", [])
+            if "TotalAmount" in data:
+                # Stored as a string, as PUT and import do
+                data["TotalAmount"] = str(data["TotalAmount"])
 
             if "Splits" not in data:
                 try:
@@ -88,12 +666,11 @@ def lambda_handler(event, context):
                 except (InvalidOperation, ValueError):
                     return respond(400, {"message": "Invalid TotalAmount value"})
                 if data["Members"] and total_amount > 0:
-                    share = (total_amount / Decimal(len(data["Members"]))).quantize(Decimal("0.01"))
-                    data["Splits"] = [{"UserID": user, "Share": share, "Paid": False} for user in data["Members"]]
+                    data["Splits"] = equal_splits(total_amount, data["Members"])
 
             data["PaidMembers"] = data.get("PaidMembers", [])
 
-            table.put_item(Item=data)
+            write_bill_with_rollups(household_id, bill_id, new_bill=data)
             return respond(201, data)
 
         elif method == "PUT":
@@ -104,7 +681,9 @@ def lambda_handler(event, context):
             data["BillID"] = bill_id
             data["HouseholdID"] = household_id
 
-            existing_item = table.get_item(Key={"HouseholdID": household_id, "BillID": bill_id}).get("Item", {})
+            existing_item = table.get_item(Key={"HouseholdID": household_id, "BillID": bill_id}).get("Item")
+            if not existing_item:
+                return respond(404, {"message": "Bill not found"})
 
             if "ImageData" in data and "ImageContentType" in data:
                 image_url = upload_image_to_s3(data["ImageData"], data["ImageContentType"])
@@ -115,6 +694,8 @@ def lambda_handler(event, context):
 
             data["Members"] = data.get("Members", existing_item.get("Members", []))
             data["PaidMembers"] = data.get("PaidMembers", existing_item.get("PaidMembers", []))
+            if "CreatedAt" in existing_item:
+                data["CreatedAt"] = existing_item["CreatedAt"]
 
             if "TotalAmount" in data:
                 try:
@@ -128,30 +709,55 @@ def lambda_handler(event, context):
                             split["Share"] = Decimal(str(split["Share"]))
                         except (InvalidOperation, ValueError):
                             return respond(400, {"message": "Invalid Share value in splits"})
-            
-            table.put_item(Item=data)
+
+            try:
+                write_bill_with_rollups(household_id, bill_id, new_bill=data, old_bill=existing_item)
+            except ClientError as e:
+                if is_write_conflict(e):
+                    return respond(409, {"message": "Bill was modified concurrently, please retry"})
+                raise
             return respond(200, data)
 
         elif method == "DELETE":
             if not bill_id:
                 return respond(400, {"message": "Missing Bill ID in path"})
-            table.delete_item(Key={"HouseholdID": household_id, "BillID": bill_id})
+            existing_item = table.get_item(Key={"HouseholdID": household_id, "BillID": bill_id}).get("Item")
+            if not existing_item:
+                return respond(200, {"message": "Bill deleted"})
+            try:
+                write_bill_with_rollups(household_id, bill_id, old_bill=existing_item)
+            except ClientError as e:
+                if is_write_conflict(e):
+                    return respond(409, {"message": "Bill was modified concurrently, please retry"})
+                raise
             return respond(200, {"message": "Bill deleted"})
 
         else:
             return respond(405, {"message": "Method not allowed"})
 
+    except ValidationError as e:
+        log.info("request rejected", error=str(e))
+        return respond(e.status_code, {"message": str(e)})
     except Exception as e:
-        print("Error:", e)
+        log.error("unhandled error", error=str(e))
         return respond(500, {"message": str(e)})
 
-def respond(status_code, body):
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Credentials": "true"
-        },
-        "body": json.dumps(body, default=lambda o: float(o) if isinstance(o, Decimal) else o)
-    }
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild monthly bill rollups from the Bills table.")
+    parser.add_argument("household_ids", nargs="*", help="Households to rebuild (default: every household with bills)")
+    args = parser.parse_args()
+
+    household_ids = args.household_ids
+    if not household_ids:
+        seen = set()
+        scan_kwargs = {"ProjectionExpression": "HouseholdID"}
+        while True:
+            result = table.scan(**scan_kwargs)
+            seen.update(item["HouseholdID"] for item in result.get("Items", []))
+            if "LastEvaluatedKey" not in result:
+                break
+            scan_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+        household_ids = sorted(seen)
+
+    for hid in household_ids:
+        print(json.dumps(rebuild_rollups(hid)))
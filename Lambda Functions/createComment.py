@@ -1,40 +1,27 @@
 import json
-import boto3
 import uuid
 from datetime import datetime
+from flatchat.http import respond
+from flatchat import aws, idempotency, log, metrics
 
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table("SocialFeedComments")
+table = aws.table("SocialFeedComments")
 
+@metrics.invocation
+@idempotency.idempotent()
 def lambda_handler(event, context):
+    log.request(event, context)
     try:
         if "body" in event:
             body = json.loads(event["body"])
         else:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "POST, OPTIONS",
-                    "Access-Control-Allow-Headers": "Content-Type"
-                },
-                "body": json.dumps({"message": "Missing request body"})
-            }
+            return respond(400, {"message": "Missing request body"})
 
         post_id = body.get("PostID")
         user_id = body.get("UserID")
         content = body.get("Content")
 
         if not post_id or not user_id or not content:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "POST, OPTIONS",
-                    "Access-Control-Allow-Headers": "Content-Type"
-                },
-                "body": json.dumps({"message": "Missing required fields"})
-            }
+            return respond(400, {"message": "Missing required fields"})
 
         comment_id = str(uuid.uuid4())
 
@@ -48,23 +35,7 @@ def lambda_handler(event, context):
 
         table.put_item(Item=item)
 
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "POST, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type"
-            },
-            "body": json.dumps({"message": "Comment added successfully", "CommentID": comment_id})
-        }
+        return respond(200, {"message": "Comment added successfully", "CommentID": comment_id})
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "POST, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type"
-            },
-            "body": json.dumps({"message": "Error adding comment", "error": str(e)})
-        }
+        return respond(500, {"message": "Error adding comment", "error": str(e)})
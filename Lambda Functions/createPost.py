@@ -1,34 +1,33 @@
 import json
-import boto3
 import uuid
 from datetime import datetime
 from decimal import Decimal
+from flatchat.http import respond
+from flatchat import aws, fanout, idempotency, log, metrics, profiles
 
-dynamodb = boto3.resource("dynamodb")
-geo_client = boto3.client("location") 
+geo_client = aws.client("location")
 
-posts_table = dynamodb.Table("SocialFeedPosts")
-users_table = dynamodb.Table("UserDetails")
+posts_table = aws.table("SocialFeedPosts")
 
 GEOFENCE_COLLECTION = "student-post-geofences"
+FANOUT_TIMEOUT = 6
 
 def response(status_code, message, extra_data=None):
     body = {"message": message}
     if extra_data:
         body.update(extra_data)
-    
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "POST, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type"
-        },
-        "body": json.dumps(body)
-    }
+    return respond(status_code, body)
 
+def discard_geofence(geofence_id):
+    try:
+        geo_client.delete_geofence(CollectionName=GEOFENCE_COLLECTION, GeofenceId=geofence_id)
+    except Exception as e:
+        log.warning("deleting unused geofence failed", geofenceId=geofence_id, error=str(e))
+
+@metrics.invocation
+@idempotency.idempotent()
 def lambda_handler(event, context):
-    print("Received event:", json.dumps(event, indent=2)) 
+    log.request(event, context)
 
     try:
         body = event.get("body")
@@ -51,34 +50,44 @@ def lambda_handler(event, context):
         longitude = Decimal(str(longitude))
         geofence_radius = Decimal(str(geofence_radius))
 
-        user_data = users_table.get_item(Key={"UserID": user_id})
-        if "Item" not in user_data:
-            return response(404, "User not found")
-
-        display_name = user_data["Item"].get("Name", "Unknown User")
-
         post_id = str(uuid.uuid4())
 
-        print(f"Creating geofence for PostID: {post_id}, Lat: {latitude}, Long: {longitude}")
+        log.debug("creating geofence", postId=post_id, lat=latitude, long=longitude)
 
-        #Create a geofence in Amazon Location Service
+        #Create a geofence in Amazon Location Service while the author's
+        #profile is read; the geofence is removed again if the post can't go ahead
         geofence_id = f"post-{post_id}"
-        response_geo = geo_client.put_geofence(
-            CollectionName=GEOFENCE_COLLECTION,
-            GeofenceId=geofence_id,
-            Geometry={
-                "Polygon": [[
-                    [float(longitude) - 0.001, float(latitude) - 0.001],
-                    [float(longitude) + 0.001, float(latitude) - 0.001],
-                    [float(longitude) + 0.001, float(latitude) + 0.001],
-                    [float(longitude) - 0.001, float(latitude) + 0.001],
-                    [float(longitude) - 0.001, float(latitude) - 0.001]
-                ]]
-            }
-        )
+        try:
+            results = fanout.run({
+                "user": lambda: profiles.get(user_id),
+                "geofence": lambda: geo_client.put_geofence(
+                    CollectionName=GEOFENCE_COLLECTION,
+                    GeofenceId=geofence_id,
+                    Geometry={
+                        "Polygon": [[
+                            [float(longitude) - 0.001, float(latitude) - 0.001],
+                            [float(longitude) + 0.001, float(latitude) - 0.001],
+                            [float(longitude) + 0.001, float(latitude) + 0.001],
+                            [float(longitude) - 0.001, float(latitude) + 0.001],
+                            [float(longitude) - 0.001, float(latitude) - 0.001]
+                        ]]
+                    }
+                ),
+            }, timeout=FANOUT_TIMEOUT)
+        except fanout.FanOutError as e:
+            if "geofence" in e.results:
+                discard_geofence(geofence_id)
+            raise
+
+        user = results["user"]
+        if user is None:
+            discard_geofence(geofence_id)
+            return response(404, "User not found")
+
+        display_name = user.get("Name", "Unknown User")
 
         #Logs response from Location Service
-        print(f"Geofence created: {response_geo}")
+        log.debug("geofence created", postId=post_id)
 
         item = {
             "PostID": post_id,
@@ -98,5 +107,5 @@ def lambda_handler(event, context):
         return response(200, "Post created successfully", {"PostID": post_id})
 
     except Exception as e:
-        print(f"Error: {e}") 
+        log.error("unhandled error", error=str(e))
         return response(500, "Error creating post", {"error": str(e)})
@@ -1,31 +1,23 @@
 import json
-import boto3
 import uuid
 import datetime
+from flatchat.http import respond, preflight
+from flatchat import aws, log, metrics, profiles
 
-dynamodb = boto3.resource("dynamodb")
-households_table = dynamodb.Table("Households")
-users_table = dynamodb.Table("UserDetails")
+households_table = aws.table("Households")
+users_table = aws.table("UserDetails")
 
+@metrics.invocation
 def lambda_handler(event, context):
-    cors_headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "Content-Type,Authorization",
-        "Access-Control-Allow-Methods": "OPTIONS,POST"
-    }
-
+    log.request(event, context)
     if event.get("httpMethod") == "OPTIONS":
-        return {"statusCode": 200, "headers": cors_headers, "body": ""}
+        return preflight()
 
     body = json.loads(event.get("body", "{}"))
 
     household_name = body.get("HouseholdName")
     if not household_name:
-        return {
-            "statusCode": 400,
-            "headers": cors_headers,
-            "body": json.dumps({"message": "HouseholdName is required"})
-        }
+        return respond(400, {"message": "HouseholdName is required"})
 
     user_id = body.get("UserID")
     household_id = str(uuid.uuid4())[:8]
@@ -56,13 +48,10 @@ def lambda_handler(event, context):
             UpdateExpression="SET HouseholdID = :hid",
             ExpressionAttributeValues={":hid": household_id}
         )
+        profiles.invalidate(user_id)
 
-    return {
-        "statusCode": 200,
-        "headers": cors_headers,
-        "body": json.dumps({
-            "message": "Household created successfully",
-            "HouseholdID": household_id,
-            "JoinCode": join_code
-        })
-    }
+    return respond(200, {
+        "message": "Household created successfully",
+        "HouseholdID": household_id,
+        "JoinCode": join_code
+    })
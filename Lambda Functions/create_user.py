@@ -1,13 +1,14 @@
 from decimal import Decimal
 import json
-import boto3
 from datetime import datetime
+from flatchat.http import respond
+from flatchat import aws, log, metrics, profiles
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('UserDetails') 
+table = aws.table('UserDetails')
 
+@metrics.invocation
 def lambda_handler(event, context):
-    print("Received event:", json.dumps(event))
+    log.request(event, context)
     
     try:
         if "body" in event:
@@ -42,32 +43,17 @@ def lambda_handler(event, context):
         }
 
         table.put_item(Item=item)
-        print(f"User {user_id} saved to DynamoDB.")
+        profiles.invalidate(user_id)
+        log.info("user saved", userId=user_id)
 
     except Exception as e:
-        print(f"Error saving user to DynamoDB: {str(e)}")
+        log.error("saving user failed", error=str(e))
         if "triggerSource" in payload:
             raise e
         else:
-            return {
-                "statusCode": 500,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                    "Access-Control-Allow-Methods": "OPTIONS,POST,GET"
-                },
-                "body": json.dumps({"error": str(e)})
-            }
+            return respond(500, {"error": str(e)})
     
     if "triggerSource" in payload:
         return event
     else:
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,GET"
-            },
-            "body": json.dumps({"message": "User added", "user": item}, default=lambda o: float(o) if isinstance(o, Decimal) else o)
-        }
+        return respond(200, {"message": "User added", "user": item})
@@ -1,28 +1,33 @@
 import json
-import boto3
 from decimal import Decimal
+from flatchat.http import respond
+from flatchat import aws, fanout, log, metrics
 
-dynamodb = boto3.resource("dynamodb")
-posts_table = dynamodb.Table("SocialFeedPosts")
-geo_client = boto3.client("location")
+posts_table = aws.table("SocialFeedPosts")
+geo_client = aws.client("location")
 GEOFENCE_COLLECTION = "student-post-geofences"
+FANOUT_TIMEOUT = 6
+
+def delete_geofence(geofence_id):
+    """Best effort: a leftover geofence is harmless once its post is gone."""
+    try:
+        geo_client.delete_geofence(
+            CollectionName=GEOFENCE_COLLECTION,
+            GeofenceId=geofence_id
+        )
+        log.debug("deleted geofence", geofenceId=geofence_id)
+    except Exception as geo_err:
+        log.warning("deleting geofence failed", geofenceId=geofence_id, error=str(geo_err))
 
 def build_response(status_code, message, extra_data=None):
     body = {"message": message}
     if extra_data:
         body.update(extra_data)
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "DELETE, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type"
-        },
-        "body": json.dumps(body, default=str)
-    }
+    return respond(status_code, body)
 
+@metrics.invocation
 def lambda_handler(event, context):
-    print("Received event:", json.dumps(event, indent=2))
+    log.request(event, context)
     try:
         body = event.get("body")
         if not body:
@@ -41,25 +46,20 @@ def lambda_handler(event, context):
         if post.get("UserID") != requester_user_id:
             return build_response(403, "Unauthorized to delete this post")
         
+        calls = {
+            "post": lambda: posts_table.delete_item(
+                Key={"PostID": post_id},
+                ConditionExpression="UserID = :uid",
+                ExpressionAttributeValues={":uid": requester_user_id}
+            )
+        }
         geofence_id = post.get("GeofenceID")
         if geofence_id:
-            try:
-                geo_client.delete_geofence(
-                    CollectionName=GEOFENCE_COLLECTION,
-                    GeofenceId=geofence_id
-                )
-                print(f"Deleted geofence {geofence_id}")
-            except Exception as geo_err:
-                print(f"Warning: Unable to delete geofence {geofence_id}: {geo_err}")
-        
-        posts_table.delete_item(
-            Key={"PostID": post_id},
-            ConditionExpression="UserID = :uid",
-            ExpressionAttributeValues={":uid": requester_user_id}
-        )
+            calls["geofence"] = lambda: delete_geofence(geofence_id)
+        fanout.run(calls, timeout=FANOUT_TIMEOUT)
         
         return build_response(200, "Post deleted successfully")
     
     except Exception as e:
-        print("Error:", str(e))
+        log.error("unhandled error", error=str(e))
         return build_response(500, "Error deleting post", {"error": str(e)})
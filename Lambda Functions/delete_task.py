@@ -1,42 +1,38 @@
-import json
-import boto3
+from botocore.exceptions import ClientError
+from flatchat.http import respond
+from flatchat import log, metrics, versioning
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('Households')
+class TasksNotFound(Exception):
+    pass
 
+@metrics.invocation
 def lambda_handler(event, context):
+    log.request(event, context)
     try:
         task_id = event["pathParameters"]["taskID"]
         
         household_id = event["queryStringParameters"]["HouseholdID"]
 
-        response = table.get_item(Key={"HouseholdID": household_id})
-        household = response.get('Item')
+        # The deletion is recorded as a tombstone so "since" syncs learn about it
+        updated = {}
 
-        if not household or "Tasks" not in household:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps("Household or tasks not found")
-            }
+        def changes(household, version, now):
+            if "Tasks" not in household:
+                raise TasksNotFound()
+            updated["tasks"] = [task for task in household["Tasks"] if task["TaskID"] != task_id]
+            return {"sets": ["Tasks = :tasks"], "values": {":tasks": updated["tasks"]}}
 
-        updated_tasks = [task for task in household["Tasks"] if task["TaskID"] != task_id]
+        try:
+            versioning.TASKS.write(household_id, changes=changes, removed_id=task_id)
+        except TasksNotFound:
+            return respond(404, "Household or tasks not found")
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return respond(409, "Tasks changed concurrently, please retry")
 
-        table.update_item(
-            Key={"HouseholdID": household_id},
-            UpdateExpression="SET Tasks = :tasks",
-            ExpressionAttributeValues={":tasks": updated_tasks}
-        )
-
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Task deleted", "tasks": updated_tasks})
-        }
+        updated_tasks = updated["tasks"]
+        return respond(200, {"message": "Task deleted", "tasks": updated_tasks})
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps(f"Error: {str(e)}")
-        }
+        return respond(500, f"Error: {str(e)}")
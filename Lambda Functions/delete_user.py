@@ -1,25 +1,10 @@
-import json
-import boto3
-from decimal import Decimal
+from flatchat.http import respond
+from flatchat import aws, log, metrics, profiles
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('UserDetails')
-
-
-def convert_decimals(obj):
-    """
-    Recursively convert any Decimal to float in a dict or list.
-    """
-    if isinstance(obj, list):
-        return [convert_decimals(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_decimals(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        return float(obj) 
-    else:
-        return obj
+table = aws.table('UserDetails')
 
 
+@metrics.invocation
 def lambda_handler(event, context):
     """
     Expects JSON in event with:
@@ -27,6 +12,7 @@ def lambda_handler(event, context):
       "UserID": "12345-abcde"
     }
     """
+    log.request(event, context)
     user_id = event["UserID"]
     
     response = table.delete_item(
@@ -35,19 +21,12 @@ def lambda_handler(event, context):
         },
         ReturnValues="ALL_OLD" 
     )
+    profiles.invalidate(user_id)
 
     if "Attributes" not in response:
-        return {
-            "statusCode": 404,
-            "body": json.dumps({"message": "User not found or already deleted"})
-        }
-
-    deleted_item = convert_decimals(response["Attributes"])
+        return respond(404, {"message": "User not found or already deleted"})
 
-    return {
-        "statusCode": 200,
-        "body": json.dumps({
-            "message": "User deleted successfully",
-            "DeletedItem": deleted_item
-        })
-    }
+    return respond(200, {
+        "message": "User deleted successfully",
+        "DeletedItem": response["Attributes"]
+    })
@@ -0,0 +1,4 @@
+"""
+Local dev server: every handler behind one HTTP process, against a local
+DynamoDB/S3 stand-in. See `python -m devserver --help`.
+"""
@@ -0,0 +1,125 @@
+"""
+Serves every handler from one process on one port.
+
+    cd "Lambda Functions"
+    PYTHONPATH=layer/python python -m devserver                 # in-process moto stand-in
+    PYTHONPATH=layer/python python -m devserver --workers 8     # pre-forked, for load tests
+    PYTHONPATH=layer/python python -m devserver --endpoint http://localhost:8000   # DynamoDB Local
+    PYTHONPATH=layer/python python -m devserver --throttle-rate 0.2   # throttle 20% of DynamoDB calls
+    PYTHONPATH=layer/python python -m devserver --latency-ms 15       # add a service round trip to every call
+    PYTHONPATH=layer/python python -m devserver --routers    # through the per-domain router functions
+    PYTHONPATH=layer/python python -m devserver --dataset small    # seeded with synthetic data (devserver.dataset)
+
+Workers are forked after the handlers are imported and share the listening
+socket, so each is a single-threaded process like a Lambda container.
+Handlers create their AWS clients lazily, so no client crosses a fork; all
+workers talk to the same stand-in over HTTP and see the same data.
+"""
+import argparse
+import os
+import signal
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from devserver.standin import REGION, ThrottlingProxy, configure_environment, start_moto
+
+
+class QuietHandler(WSGIRequestHandler):
+    """Drops the per-request access line, which dominates CPU under load."""
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ListenServer(WSGIServer):
+    request_queue_size = 1024
+
+
+def serve_workers(server, workers):
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m devserver", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3001)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--stage", default="dev", help="path prefix to strip, as in the deployed URLs")
+    parser.add_argument("--endpoint", help="AWS endpoint of an already running stand-in")
+    parser.add_argument("--moto-port", type=int, default=5005)
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="fraction of DynamoDB calls to fail with a throttling error")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="delay added to every AWS call, to approximate deployed round trips")
+    parser.add_argument("--routers", action="store_true",
+                        help="call each handler through its domain's router function, as deployed")
+    parser.add_argument("--dataset", choices=("tiny", "small", "medium", "large"),
+                        help="fill the tables with a synthetic dataset of this scale first")
+    parser.add_argument("--seed", type=int, help="dataset seed (default devserver.dataset.SEED)")
+    args = parser.parse_args()
+
+    upstream = endpoint = args.endpoint or start_moto(args.moto_port)
+    if args.throttle_rate or args.latency_ms:
+        endpoint = ThrottlingProxy(upstream, args.throttle_rate, latency_ms=args.latency_ms).start().url
+    configure_environment(endpoint)
+
+    # Imported after the environment is set: the handlers read it at import
+    import boto3
+    from devserver import tables
+    from devserver.app import make_app
+    from devserver.routes import ROUTES, Router
+
+    session = boto3.session.Session()
+    created = tables.ensure(session.client("dynamodb", endpoint_url=upstream),
+                            session.client("s3", endpoint_url=upstream), REGION)
+    if created:
+        print(f"Created {', '.join(created)}")
+    if args.dataset:
+        from devserver import dataset
+        seed = dataset.SEED if args.seed is None else args.seed
+        counts = dataset.populate(upstream, seed=seed, **dataset.SCALES[args.dataset])
+        print(f"Loaded the {args.dataset} dataset (seed {seed}): {sum(counts.values())} items")
+
+    if args.routers:
+        from routers.dispatch import for_domain
+        from routers.routes import DOMAINS, domain_of
+        dispatchers = {domain: for_domain(domain) for domain in DOMAINS}
+        router = Router(load=lambda module: dispatchers[domain_of(module)])
+    else:
+        router = Router()
+    app = make_app(router, stage=args.stage)
+    server = make_server(args.host, args.port, app, server_class=ListenServer, handler_class=QuietHandler)
+    print(f"Serving {len(ROUTES)} routes on http://{args.host}:{args.port} "
+          f"({args.workers} worker{'s' if args.workers != 1 else ''}, AWS at {endpoint})")
+    if args.workers > 1:
+        serve_workers(server, args.workers)
+    else:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+WSGI front for the handlers: turns each HTTP request into an API Gateway
+proxy event, calls the routed lambda_handler and writes its response back.
+"""
+import base64
+import time
+import traceback
+import uuid
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+from flatchat.http import preflight, respond
+
+MAX_DURATION_MS = 30000
+
+
+class LambdaContext:
+    """The parts of the Lambda context object the handlers and flatchat use."""
+
+    def __init__(self, function_name):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self.memory_limit_in_mb = 1024
+        self._deadline = time.monotonic() + MAX_DURATION_MS / 1000
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def request_headers(environ):
+    headers = {}
+    for key, value in environ.items():
+        if key.startswith("HTTP_"):
+            headers[key[5:].replace("_", "-").title()] = value
+    for key in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+        if environ.get(key):
+            headers[key.replace("_", "-").title()] = environ[key]
+    return headers
+
+
+def build_event(environ, resource, path, path_parameters, request_id):
+    method = environ["REQUEST_METHOD"]
+    query = parse_qs(environ.get("QUERY_STRING", ""), keep_blank_values=True)
+    length = int(environ.get("CONTENT_LENGTH") or 0)
+    raw = environ["wsgi.input"].read(length) if length else b""
+    try:
+        body, is_base64 = raw.decode("utf-8"), False
+    except UnicodeDecodeError:
+        body, is_base64 = base64.b64encode(raw).decode("ascii"), True
+    return {
+        "resource": resource,
+        "path": path,
+        "httpMethod": method,
+        "headers": request_headers(environ),
+        "queryStringParameters": {k: v[-1] for k, v in query.items()} or None,
+        "multiValueQueryStringParameters": query or None,
+        "pathParameters": path_parameters,
+        "requestContext": {
+            "requestId": request_id,
+            "resourcePath": resource,
+            "httpMethod": method,
+            "stage": "local",
+        },
+        "body": body if raw else None,
+        "isBase64Encoded": is_base64,
+    }
+
+
+def make_app(router, stage=None):
+    """
+    WSGI application over `router`. A leading /<stage> is stripped, so the
+    frontend's deployed base URLs can be swapped for the local host as-is.
+    """
+    prefix = f"/{stage}" if stage else None
+
+    def application(environ, start_response):
+        path = environ.get("PATH_INFO") or "/"
+        if prefix and (path == prefix or path.startswith(prefix + "/")):
+            path = path[len(prefix):] or "/"
+        method = environ["REQUEST_METHOD"]
+
+        resource, path_parameters, module, handler = router.match(method, path)
+        if resource is None:
+            result = respond(404, {"message": "Not Found"})
+        elif handler is None:
+            result = preflight() if method == "OPTIONS" else respond(405, {"message": f"Method not allowed: {method}"})
+        else:
+            context = LambdaContext(module)
+            event = build_event(environ, resource, path, path_parameters, context.aws_request_id)
+            try:
+                result = handler(event, context)
+            except Exception:
+                # API Gateway answers an unhandled exception with a bare 502
+                traceback.print_exc()
+                result = respond(502, {"message": "Internal server error"})
+
+        status = int(result.get("statusCode", 200))
+        headers = [(k, str(v)) for k, v in (result.get("headers") or {}).items()]
+        for k, values in (result.get("multiValueHeaders") or {}).items():
+            headers.extend((k, str(v)) for v in values)
+        body = result.get("body") or ""
+        payload = base64.b64decode(body) if result.get("isBase64Encoded") else body.encode("utf-8")
+        start_response(f"{status} {HTTPStatus(status).phrase}", headers + [("Content-Length", str(len(payload)))])
+        return [payload]
+
+    return application
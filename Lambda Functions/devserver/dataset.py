@@ -0,0 +1,599 @@
+"""
+Reproducible synthetic data for every table, for scale and performance
+testing against the local stand-in.
+
+    cd "Lambda Functions"
+    PYTHONPATH=layer/python python -m devserver.dataset --endpoint http://127.0.0.1:5005   # a running devserver's stand-in
+    PYTHONPATH=layer/python python -m devserver.dataset --scale large --workers 32 --endpoint http://localhost:8000
+    PYTHONPATH=layer/python python -m devserver.dataset --users 20000 --posts 2000000 --tables SocialFeedPosts,UserDetails
+    PYTHONPATH=layer/python python -m devserver --dataset small     # seed the dev server's own stand-in
+
+Users cluster around campuses. Most share a household a short way from
+their campus, with household sizes skewed towards 2-5 and a long tail of
+large shared houses. Posts are written by Zipf-distributed authors, near
+home or on campus, and comments per post are heavy-tailed. Every
+household gets tasks, a year of bills with their rollups, bookings around
+the anchor date, notices and shopping lists. Items have the same shape,
+and the same bookkeeping items (slots, version markers, catalogues), that
+the handlers write. No geofences are created.
+
+The same scale, --seed and --anchor always give the same items and IDs,
+however many --workers write them. Users are user-<n>, households
+household-<n> and posts post-<n>, so benchmarks can address them directly.
+Items are generated in fixed-size shards, so millions of posts never sit
+in memory, and worker threads write shards in parallel with BatchWriteItem.
+Without --endpoint a moto stand-in is started, filled and kept running for
+benchmarks to use with --endpoint until Ctrl-C.
+"""
+import argparse
+import itertools
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import boto3
+
+import bills_handler
+import householdNotices
+import reservations
+import shopping_list
+from devserver import tables
+from devserver.standin import REGION, configure_environment, start_moto
+
+SCALES = {
+    "tiny": {"users": 200, "posts": 1_000},
+    "small": {"users": 5_000, "posts": 50_000},
+    "medium": {"users": 50_000, "posts": 500_000},
+    "large": {"users": 250_000, "posts": 5_000_000},
+}
+SEED = 50
+
+# (College, latitude, longitude, relative number of students)
+CAMPUSES = [
+    ("University College Dublin", 53.3067, -6.2210, 33),
+    ("Technological University Dublin", 53.3546, -6.2797, 25),
+    ("University College Cork", 51.8930, -8.4920, 22),
+    ("University of Galway", 53.2786, -9.0606, 19),
+    ("Trinity College Dublin", 53.3438, -6.2546, 18),
+    ("Dublin City University", 53.3862, -6.2565, 18),
+    ("University of Limerick", 52.6736, -8.5722, 17),
+    ("Maynooth University", 53.3837, -6.6000, 14),
+]
+KM_PER_DEGREE = 111.32
+HOUSEHOLD_SPREAD_KM = 1.5
+MEMBER_SPREAD_KM = 0.03
+UNHOUSED_SPREAD_KM = 2.5
+POST_SPREAD_KM = 0.4
+CAMPUS_SPREAD_KM = 0.3
+ON_CAMPUS_POSTS = 0.35
+
+# Household size: relative frequency, skewed to small houses with a long tail
+HOUSEHOLD_SIZES = {1: 6, 2: 20, 3: 24, 4: 21, 5: 13, 6: 7, 7: 4, 8: 2, 10: 2, 12: 1}
+HOUSED_SHARE = 0.85
+# Posting and commenting activity is Zipf over users
+ACTIVITY_EXPONENT = 1.1
+
+POST_DAYS = 180
+GEOFENCE_RADII = {50: 5, 100: 10, 250: 20, 500: 30, 1000: 20, 2000: 10, 5000: 5}
+BILL_MONTHS = 12
+BOOKING_DAYS_BEFORE = 14
+BOOKING_DAYS_AFTER = 28
+BOOKINGS_PER_MEMBER_WEEK = 0.5
+NOTICES_PER_MEMBER = 3
+
+USER_SHARD = 1000
+HOUSEHOLD_SHARD = 200
+POST_SHARD = 1000
+
+FIRST_NAMES = ["Aoife", "Sean", "Ciara", "Conor", "Niamh", "Jack", "Saoirse", "Darragh", "Emma", "Cian",
+               "Roisin", "Oisin", "Grace", "Liam", "Orla", "Fionn", "Amelia", "Eoin", "Sophie", "Tadhg",
+               "Chloe", "Adam", "Ella", "Luca", "Priya", "Wei", "Fatima", "Mateo", "Zofia", "Kofi"]
+LAST_NAMES = ["Murphy", "Kelly", "O'Sullivan", "Walsh", "Smith", "O'Brien", "Byrne", "Ryan", "O'Connor",
+              "O'Neill", "Doyle", "McCarthy", "Gallagher", "Lynch", "Quinn", "Nolan", "Kennedy", "Burke",
+              "Nowak", "Chen", "Patel", "Silva", "Okafor", "Rossi"]
+AREAS_OF_STUDY = ["Computer Science", "Medicine", "Law", "Engineering", "Business", "Psychology", "History",
+                  "Physics", "Nursing", "Architecture", "Economics", "English", "Biology", "Music"]
+STREETS = ["Main Street", "Church Road", "College Road", "Park Avenue", "Mill Lane", "Station Road",
+           "Green Terrace", "Harbour View", "Orchard Close", "Castle Street"]
+POST_LINES = ["Anyone up for five-a-side later?", "Lost a black umbrella near the library",
+              "Free sofa, collection only", "Study group for the stats exam?", "Quiz night tonight, need a team",
+              "Best cheap lunch around here?", "Selling second-hand textbooks", "Room going in a 4-bed from September",
+              "Bike stolen outside the sports centre, keep an eye out", "Sunset from the bridge was unreal"]
+COMMENT_LINES = ["I'm in!", "Sent you a message", "Still available?", "Seen one near the canteen", "Same here",
+                 "Count me in", "Thanks for the heads up", "What time?", "+1", "Great idea"]
+TAGS = ["events", "sport", "lost-and-found", "for-sale", "housing", "study", "food", "music", "free"]
+TASK_TITLES = ["Take out the bins", "Clean the kitchen", "Hoover the living room", "Clean the bathroom",
+               "Do the recycling", "Wipe down the fridge", "Mop the floors", "Buy toilet roll",
+               "Water the plants", "Descale the kettle", "Clean the oven", "Empty the dishwasher"]
+TASK_FREQUENCIES = ["Daily", "Weekly", "Fortnightly", "Monthly", ""]
+# (Title, low, high, chance in a month, charged per member)
+BILL_KINDS = [
+    ("Rent", 450, 850, 1.0, True),
+    ("Electricity", 60, 180, 0.5, False),
+    ("Gas", 40, 140, 0.5, False),
+    ("Internet", 35, 60, 1.0, False),
+    ("Bins", 15, 35, 1.0, False),
+    ("Groceries", 40, 220, 0.8, False),
+    ("Cleaning supplies", 8, 40, 0.3, False),
+]
+SPACES = ["Kitchen", "Living Room", "Laundry", "Bathroom", "Garden", "Study Room"]
+BOOKING_MINUTES = [30, 45, 60, 90, 120, 180]
+PURPOSES = ["Dinner party", "Study session", "Laundry", "Movie night", "Birthday", "Meal prep", "Video call"]
+NOTICE_LINES = [("Bin day", "Bins go out Wednesday night"), ("Landlord visit", "Inspection on Friday morning"),
+                ("Wi-Fi", "Router restarted, new password on the fridge"), ("Quiet week", "Exams all week, please keep it down"),
+                ("Boiler", "Hot water is on a timer now"), ("Party", "Small gathering Saturday, all welcome")]
+LIST_TITLES = ["Weekly shop", "Household bits", "Party", "Cleaning", "Breakfast"]
+PRODUCTS = ["Milk", "Bread", "Eggs", "Butter", "Cheese", "Rice", "Pasta", "Tinned tomatoes", "Onions", "Garlic",
+            "Potatoes", "Carrots", "Apples", "Bananas", "Chicken", "Mince", "Tea bags", "Coffee", "Sugar", "Cereal",
+            "Yoghurt", "Orange juice", "Toilet roll", "Washing-up liquid", "Bin bags", "Sponges", "Laundry detergent",
+            "Hand soap", "Kitchen roll", "Olive oil", "Salt", "Pepper", "Frozen peas", "Pizza", "Crisps", "Biscuits",
+            "Tinfoil", "Batteries", "Lightbulbs", "Shampoo"]
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _epoch(moment):
+    return int(moment.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _coordinate(value):
+    return Decimal(f"{value:.6f}")
+
+
+def _jitter(rng, lat, lon, km):
+    return (lat + rng.gauss(0, km) / KM_PER_DEGREE,
+            lon + rng.gauss(0, km) / (KM_PER_DEGREE * math.cos(math.radians(lat))))
+
+
+class World:
+    """Who lives where: the per-user facts every shard needs, built once from the seed."""
+
+    def __init__(self, users, seed):
+        rng = random.Random(f"{seed}:world")
+        campus_weights = [weight for *_, weight in CAMPUSES]
+        sizes, size_weights = zip(*HOUSEHOLD_SIZES.items())
+        self.names = []
+        self.campus = []
+        self.location = []
+        self.household = []
+        # (first member's index, size, campus)
+        self.households = []
+        while len(self.names) < users:
+            campus = rng.choices(range(len(CAMPUSES)), weights=campus_weights)[0]
+            _, lat, lon, _ = CAMPUSES[campus]
+            if rng.random() < HOUSED_SHARE:
+                size = min(rng.choices(sizes, weights=size_weights)[0], users - len(self.names))
+                home = _jitter(rng, lat, lon, HOUSEHOLD_SPREAD_KM)
+                self.households.append((len(self.names), size, campus))
+                for _ in range(size):
+                    self._add(rng, campus, _jitter(rng, *home, MEMBER_SPREAD_KM), len(self.households) - 1)
+            else:
+                self._add(rng, campus, _jitter(rng, lat, lon, UNHOUSED_SPREAD_KM), None)
+
+        ranks = list(range(users))
+        rng.shuffle(ranks)
+        self.activity = list(itertools.accumulate(1 / (rank + 1) ** ACTIVITY_EXPONENT for rank in ranks))
+
+    def _add(self, rng, campus, location, household):
+        self.names.append(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+        self.campus.append(campus)
+        self.location.append(location)
+        self.household.append(household)
+
+    def active_user(self, rng):
+        return rng.choices(range(len(self.names)), cum_weights=self.activity)[0]
+
+
+def user_items(world, start, stop, rng, anchor):
+    items = []
+    for i in range(start, stop):
+        first, _, last = world.names[i].partition(" ")
+        lat, lon = world.location[i]
+        household = world.household[i]
+        items.append({
+            "UserID": f"user-{i}",
+            "Name": world.names[i],
+            "Email": f"{first}.{last}.{i}@example.com".lower().replace("'", ""),
+            "AreaOfStudy": rng.choice(AREAS_OF_STUDY),
+            "College": CAMPUSES[world.campus[i]][0],
+            "CreatedAt": (anchor - timedelta(days=rng.uniform(30, 400))).isoformat(),
+            "DoNotDisturb": rng.random() < 0.1,
+            "HouseholdID": None if household is None else f"household-{household}",
+            "Latitude": _coordinate(lat),
+            "Longitude": _coordinate(lon),
+        })
+    return {"UserDetails": items}
+
+
+def household_items(world, start, stop, rng, anchor):
+    items = {}
+    for index in range(start, stop):
+        first, size, _ = world.households[index]
+        household_id = f"household-{index}"
+        members = [f"user-{i}" for i in range(first, first + size)]
+        names = world.names[first:first + size]
+        for generate in (_household, _bills, _reservations, _notices, _shopping_lists):
+            for table_name, table_items in generate(rng, anchor, household_id, members, names).items():
+                items.setdefault(table_name, []).extend(table_items)
+    return items
+
+
+def _household(rng, anchor, household_id, members, names):
+    tasks = []
+    for version, title in enumerate(rng.sample(TASK_TITLES, rng.randint(0, min(len(TASK_TITLES), 2 + 2 * len(members)))), 1):
+        tasks.append({
+            "TaskID": _uuid(rng),
+            "Title": title,
+            "AssignedTo": rng.choice(members),
+            "Frequency": rng.choice(TASK_FREQUENCIES),
+            "DueDate": (anchor + timedelta(days=rng.randint(-7, 21))).date().isoformat(),
+            "Completed": rng.random() < 0.3,
+            "Version": version,
+        })
+    admins = members[:1 + (len(members) > 3 and rng.random() < 0.3)]
+    return {"Households": [{
+        "HouseholdID": household_id,
+        "Name": f"{rng.randint(1, 200)} {rng.choice(STREETS)}",
+        "JoinCode": str(rng.randrange(100000, 1000000)),
+        "CreatedAt": (anchor - timedelta(days=rng.uniform(BILL_MONTHS * 31, 500))).isoformat(),
+        "Admins": admins,
+        "Members": members,
+        "Tasks": tasks,
+        "TasksVersion": len(tasks),
+        "TasksModifiedAt": _epoch(anchor),
+    }]}
+
+
+def _bills(rng, anchor, household_id, members, names):
+    bills = []
+    for months_back in range(BILL_MONTHS, -1, -1):
+        month = date(anchor.year, anchor.month, 1)
+        for _ in range(months_back):
+            month = (month - timedelta(days=1)).replace(day=1)
+        for title, low, high, chance, per_member in BILL_KINDS:
+            if rng.random() >= chance:
+                continue
+            billed = members if title != "Groceries" or len(members) < 3 else rng.sample(members, rng.randint(2, len(members)))
+            total = Decimal(f"{rng.uniform(low, high):.2f}") * (len(billed) if per_member else 1)
+            due_by = month.replace(day=rng.randint(1, 28))
+            paid_chance = 0.9 if due_by < anchor.date() else 0.3
+            splits = bills_handler.equal_splits(total, billed)
+            for split in splits:
+                split["Paid"] = rng.random() < paid_chance
+            bills.append({
+                "HouseholdID": household_id,
+                "BillID": _uuid(rng),
+                "Title": title,
+                "Description": f"{title} for {month:%B %Y}",
+                "TotalAmount": str(total),
+                "DueBy": due_by.isoformat(),
+                "Members": billed,
+                "PaidMembers": [split["UserID"] for split in splits if split["Paid"]],
+                "Splits": splits,
+                "CreatedAt": datetime.combine(due_by - timedelta(days=14), datetime.min.time()).isoformat(),
+                "Revision": 1,
+            })
+
+    # The same sums rebuild_rollups stores
+    totals = {}
+    for bill in bills:
+        for rollup_key, values in bills_handler.bill_contributions(bill).items():
+            entry = totals.setdefault(rollup_key, {field: Decimal("0") for field in bills_handler.ROLLUP_FIELDS})
+            for field, value in values.items():
+                entry[field] += value
+    rollups = []
+    for rollup_key, values in totals.items():
+        month, _, user = rollup_key.partition("#MEMBER#")
+        item = {"HouseholdID": household_id, "RollupKey": rollup_key, "Month": month, **values}
+        if user:
+            item["UserID"] = user
+        rollups.append(item)
+    return {bills_handler.TABLE_NAME: bills, bills_handler.ROLLUPS_TABLE_NAME: rollups}
+
+
+def _reservations(rng, anchor, household_id, members, names):
+    items = []
+    mean_gap_hours = 24 * 7 / (BOOKINGS_PER_MEMBER_WEEK * len(members))
+    window_end = anchor + timedelta(days=BOOKING_DAYS_AFTER)
+    for space_name in rng.sample(SPACES, min(len(members), rng.randint(1, 3))):
+        bookings = 0
+        moment = anchor - timedelta(days=BOOKING_DAYS_BEFORE)
+        while True:
+            moment += timedelta(hours=rng.expovariate(1 / mean_gap_hours))
+            moment = moment.replace(minute=moment.minute - moment.minute % 15, second=0, microsecond=0)
+            if moment >= window_end:
+                break
+            end = moment + timedelta(minutes=rng.choice(BOOKING_MINUTES))
+            start_text = moment.strftime(reservations.TIME_FORMAT)
+            reservation = {
+                "HouseholdID": household_id,
+                "ReservationID": _uuid(rng),
+                "SpaceName": space_name,
+                "ReservedBy": rng.choice(members),
+                "Purpose": rng.choice(PURPOSES),
+                "StartTime": start_text,
+                "EndTime": end.strftime(reservations.TIME_FORMAT),
+                "ApprovalStatus": rng.choices(["Approved", "Pending", "Rejected"],
+                                              weights=[80, 10, 10] if end < anchor else [45, 50, 5])[0],
+            }
+            if reservation["ApprovalStatus"] != "Pending":
+                reservation["Approvers"] = {rng.choice(members)}
+            if reservation["ApprovalStatus"] != "Rejected":
+                reservation["SlotID"] = reservations.slot_id(space_name, start_text, reservation["ReservationID"])
+                items.append({
+                    "HouseholdID": household_id,
+                    "ReservationID": reservation["SlotID"],
+                    "RecordType": "Slot",
+                    "SpaceName": space_name,
+                    "StartTime": start_text,
+                    "EndTime": reservation["EndTime"],
+                    "ReservationRef": reservation["ReservationID"],
+                })
+            items.append(reservation)
+            bookings += 1
+            moment = end
+        if bookings:
+            items.append({
+                "HouseholdID": household_id,
+                "ReservationID": reservations.SPACE_PREFIX + reservations.space_key(space_name),
+                "Version": bookings,
+                "SpaceName": space_name,
+                "RecordType": "Space",
+            })
+    return {reservations.TABLE_NAME: items}
+
+
+def _notices(rng, anchor, household_id, members, names):
+    count = int(rng.expovariate(1 / (NOTICES_PER_MEMBER * len(members))))
+    created = sorted(anchor - timedelta(days=rng.uniform(0, 120)) for _ in range(count))
+    notices = []
+    for moment in created:
+        title, content = rng.choice(NOTICE_LINES)
+        notice = {
+            "HouseholdID": household_id,
+            "NoticeID": _uuid(rng),
+            "Title": title,
+            "Content": content,
+            "CreatedBy": rng.choice(names),
+            "CreatedAt": moment.isoformat() + "Z",
+            "Pinned": rng.random() < 0.08,
+        }
+        if rng.random() < 0.25:
+            notice["ExpiresAt"] = _epoch(moment + timedelta(days=rng.randint(7, 150)))
+            if notice["ExpiresAt"] <= _epoch(anchor):
+                continue  # TTL would already have deleted it
+        notice["Version"] = len(notices) + 1
+        notices.append(notice)
+    if not notices:
+        return {}
+
+    pinned = [n["NoticeID"] for n in notices if n["Pinned"]][-householdNotices.MAX_PINNED:]
+    for notice in notices:
+        notice["Pinned"] = notice["NoticeID"] in pinned
+    marker = {
+        "HouseholdID": household_id,
+        "NoticeID": householdNotices.VERSION_ID,
+        "HouseholdVersion": len(notices),
+        "ModifiedAt": _epoch(created[-1]),
+    }
+    expiry_times = {n["ExpiresAt"] for n in notices if "ExpiresAt" in n}
+    if expiry_times:
+        marker["ExpiryTimes"] = expiry_times
+    items = notices + [marker]
+    if pinned:
+        items.append({"HouseholdID": household_id, "NoticeID": householdNotices.PINNED_ID, "NoticeIDs": set(pinned)})
+    return {householdNotices.TABLE_NAME: items}
+
+
+def _shopping_lists(rng, anchor, household_id, members, names):
+    lists = []
+    catalog = {"Names": {}, "Added": Counter(), "Purchased": Counter()}
+    for version in range(1, rng.choices([0, 1, 2, 3], weights=[1, 4, 3, 2])[0] + 1):
+        products = [{
+            "ProductID": _uuid(rng),
+            "Name": name,
+            "Purchased": rng.random() < 0.35,
+            "Quantity": rng.randint(1, 4),
+            "addedBy": rng.choice(names),
+        } for name in rng.sample(PRODUCTS, rng.randint(3, 30))]
+        written = anchor - timedelta(days=rng.uniform(0, 30))
+        clock = {}
+        product_map = shopping_list.to_product_map(products, clock, shopping_list.server_stamp(_epoch(written) * 1000))
+        for product in product_map.values():
+            product["Version"] = version
+            key = shopping_list.normalize_name(product["Name"])
+            catalog["Names"][key] = product["Name"]
+            catalog["Added"][key] += 1
+            catalog["Purchased"][key] += product["Purchased"]
+        lists.append({
+            "HouseholdID": household_id,
+            "ListID": _uuid(rng),
+            "Title": rng.choice(LIST_TITLES),
+            "ProductMap": product_map,
+            "Clock": clock,
+            "Version": version,
+            "PrunedVersion": version,
+        })
+    if not lists:
+        return {}
+    return {shopping_list.TABLE_NAME: lists + [
+        {"HouseholdID": household_id, "ListID": shopping_list.VERSION_ID,
+         "HouseholdVersion": len(lists), "ModifiedAt": _epoch(anchor)},
+        {"HouseholdID": household_id, "ListID": shopping_list.CATALOG_ID,
+         "Names": catalog["Names"], "Added": dict(catalog["Added"]),
+         "Purchased": {key: count for key, count in catalog["Purchased"].items() if count}},
+    ]}
+
+
+def post_items(world, start, stop, rng, anchor):
+    posts, comments = [], []
+    radii, radius_weights = zip(*GEOFENCE_RADII.items())
+    for i in range(start, stop):
+        author = world.active_user(rng)
+        if rng.random() < ON_CAMPUS_POSTS:
+            _, lat, lon, _ = CAMPUSES[world.campus[author]]
+            lat, lon = _jitter(rng, lat, lon, CAMPUS_SPREAD_KM)
+        else:
+            lat, lon = _jitter(rng, *world.location[author], POST_SPREAD_KM)
+        created = anchor - timedelta(days=rng.uniform(0, POST_DAYS))
+        post_id = f"post-{i}"
+        posts.append({
+            "PostID": post_id,
+            "UserID": f"user-{author}",
+            "UserName": world.names[author],
+            "Content": rng.choice(POST_LINES),
+            "Tags": rng.sample(TAGS, rng.choice([0, 0, 1, 1, 2, 3])),
+            "GeofenceRadius": rng.choices(radii, weights=radius_weights)[0],
+            "Latitude": _coordinate(lat),
+            "Longitude": _coordinate(lon),
+            "GeofenceID": f"post-{post_id}",
+            "CreatedAt": created.isoformat(),
+            "Likes": min(int(rng.paretovariate(1.2)) - 1, 5000),
+        })
+        for _ in range(min(int(rng.paretovariate(1.8)) - 1, 500)):
+            commented = min(created + timedelta(hours=rng.expovariate(1 / 6)), anchor)
+            comments.append({
+                "CommentID": _uuid(rng),
+                "PostID": post_id,
+                "UserID": f"user-{world.active_user(rng)}",
+                "Content": rng.choice(COMMENT_LINES),
+                "CreatedAt": commented.isoformat(),
+            })
+    return {"SocialFeedPosts": posts, "SocialFeedComments": comments}
+
+
+class Loader:
+    """Writes shards with BatchWriteItem, through one boto3 session per worker thread."""
+
+    def __init__(self, endpoint, only=None):
+        self.endpoint = endpoint
+        self.only = only
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _table(self, name):
+        if not hasattr(self._local, "resource"):
+            self._local.resource = boto3.session.Session().resource(
+                "dynamodb", endpoint_url=self.endpoint, region_name=REGION)
+        return self._local.resource.Table(name)
+
+    def write(self, items_by_table):
+        written = Counter()
+        for name, items in items_by_table.items():
+            if not items or (self.only and name not in self.only):
+                continue
+            with self._table(name).batch_writer() as batch:
+                for item in items:
+                    batch.put_item(Item=item)
+            written[name] += len(items)
+        with self._lock:
+            self.counts.update(written)
+
+
+def shards(world, posts):
+    users = len(world.names)
+    for generate, total, size in ((user_items, users, USER_SHARD),
+                                  (household_items, len(world.households), HOUSEHOLD_SHARD),
+                                  (post_items, posts, POST_SHARD)):
+        for start in range(0, total, size):
+            yield generate, start, min(start + size, total)
+
+
+def default_anchor():
+    return datetime.now(timezone.utc).replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+
+
+def populate(endpoint, users, posts, seed=SEED, anchor=None, workers=8, only=None, progress=None):
+    """
+    Generates and writes a dataset; returns {table: items written}. Times
+    are laid out around `anchor` (a naive UTC datetime, default today at
+    midnight). `only` limits writing to those table names; `progress` is
+    called with the running counts after each shard.
+    """
+    anchor = anchor or default_anchor()
+    world = World(users, seed)
+    loader = Loader(endpoint, only)
+
+    def run(generate, start, stop):
+        rng = random.Random(f"{seed}:{generate.__name__}:{start}")
+        loader.write(generate(world, start, stop, rng, anchor))
+        if progress:
+            progress(loader.counts)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dataset") as pool:
+        pending = set()
+        for shard in shards(world, posts):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(pool.submit(run, *shard))
+        for future in pending:
+            future.result()
+    return dict(loader.counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m devserver.dataset", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--users", type=int, help="overrides the scale's user count")
+    parser.add_argument("--posts", type=int, help="overrides the scale's post count")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--anchor", type=date.fromisoformat, help="date the data is laid out around (default today)")
+    parser.add_argument("--tables", help="comma-separated tables to write (default all)")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--endpoint", help="AWS endpoint of an already running stand-in")
+    parser.add_argument("--moto-port", type=int, default=5005)
+    args = parser.parse_args()
+
+    endpoint = args.endpoint or start_moto(args.moto_port)
+    configure_environment(endpoint)
+    session = boto3.session.Session()
+    tables.ensure(session.client("dynamodb", endpoint_url=endpoint, region_name=REGION),
+                  session.client("s3", endpoint_url=endpoint, region_name=REGION), REGION)
+
+    scale = dict(SCALES[args.scale])
+    scale["users"] = args.users if args.users is not None else scale["users"]
+    scale["posts"] = args.posts if args.posts is not None else scale["posts"]
+    anchor = datetime.combine(args.anchor, datetime.min.time()) if args.anchor else None
+    only = set(args.tables.split(",")) if args.tables else None
+
+    started = time.monotonic()
+    last_report = [started]
+
+    def progress(counts):
+        now = time.monotonic()
+        if now - last_report[0] >= 5:
+            last_report[0] = now
+            print(f"  {sum(counts.values()):>10} items, {now - started:6.0f} s")
+
+    counts = populate(endpoint, seed=args.seed, anchor=anchor, workers=args.workers, only=only,
+                      progress=progress, **scale)
+    elapsed = time.monotonic() - started
+    for name, count in sorted(counts.items()):
+        print(f"{name:<20} {count:>10}")
+    total = sum(counts.values())
+    print(f"{total} items in {elapsed:.1f} s ({total / max(elapsed, 1e-9):.0f}/s), "
+          f"seed {args.seed}, {scale['users']} users, {scale['posts']} posts, at {endpoint}")
+
+    if not args.endpoint:
+        print("Keeping the stand-in up for --endpoint; Ctrl-C to stop")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
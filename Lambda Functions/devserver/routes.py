@@ -0,0 +1,45 @@
+"""
+Path matching for the dev server over the route table in routers.routes.
+API Gateway resolves paths to {param} resources in AWS; locally the
+Router does it, so the handlers see the same `resource` and
+`pathParameters`.
+"""
+from routers.routes import ANY, ROUTES, load_handler
+
+
+class Router:
+    """Resolves (method, path) to a route, preferring literal segments as API Gateway does."""
+
+    def __init__(self, routes=ROUTES, load=load_handler):
+        handlers = {}
+        self.routes = []
+        for method, resource, module in routes:
+            if module not in handlers:
+                handlers[module] = load(module)
+            segments = resource.strip("/").split("/")
+            self.routes.append((method, resource, segments, module, handlers[module]))
+        # {param} segments sort after literals, so /bills/summary beats /bills/{id}
+        self.routes.sort(key=lambda route: [segment.startswith("{") for segment in route[2]])
+
+    def match(self, method, path):
+        """
+        Returns (resource, path_parameters, module, handler) for the first
+        matching route. When the path exists under other methods only, the
+        handler is None; when it does not exist at all, resource is None.
+        """
+        parts = path.strip("/").split("/")
+        found = None
+        for route_method, resource, segments, module, handler in self.routes:
+            if len(segments) != len(parts):
+                continue
+            params = {}
+            for segment, part in zip(segments, parts):
+                if segment.startswith("{"):
+                    params[segment[1:-1]] = part
+                elif segment != part:
+                    break
+            else:
+                if route_method in (ANY, method):
+                    return resource, params or None, module, handler
+                found = found or (resource, params or None, module, None)
+        return found or (None, None, None, None)
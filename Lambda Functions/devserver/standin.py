@@ -0,0 +1,125 @@
+"""
+The local AWS stand-in: moto's threaded server by default, or any emulator
+already listening (DynamoDB Local, LocalStack) when an endpoint is given,
+optionally behind a proxy that injects DynamoDB throttling.
+"""
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+REGION = "eu-west-1"
+
+
+def start_moto(port):
+    try:
+        from moto.server import ThreadedMotoServer
+    except ImportError:
+        sys.exit("The default stand-in needs moto: pip install 'moto[server]', "
+                 "or pass --endpoint for DynamoDB Local or another emulator.")
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    return f"http://127.0.0.1:{port}"
+
+
+def configure_environment(endpoint):
+    os.environ["AWS_ENDPOINT_URL"] = endpoint
+    os.environ.setdefault("AWS_DEFAULT_REGION", REGION)
+    os.environ.setdefault("AWS_REGION", REGION)
+    # Emulators accept any credentials; never pick up real ones by accident
+    os.environ["AWS_ACCESS_KEY_ID"] = "local"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "local"
+    os.environ.pop("AWS_SESSION_TOKEN", None)
+    os.environ.pop("AWS_PROFILE", None)
+
+
+THROTTLE_ERROR = json.dumps({
+    "__type": "com.amazonaws.dynamodb.v20120810#ProvisionedThroughputExceededException",
+    "message": "The level of configured provisioned throughput for the table was exceeded.",
+}).encode("utf-8")
+
+HOP_BY_HOP = {"connection", "keep-alive", "transfer-encoding", "content-length"}
+
+
+class ThrottlingProxy:
+    """
+    Forwards to `upstream`, answering a fraction `rate` of DynamoDB calls
+    with ProvisionedThroughputExceededException, so handlers and client
+    retry settings can be exercised against a throttled table locally.
+    `latency_ms` delays every call by about a real service round trip.
+    """
+
+    def __init__(self, upstream, rate, port=0, latency_ms=0):
+        self.upstream = urlsplit(upstream)
+        self.rate = rate
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _forward(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if proxy.latency:
+                    time.sleep(proxy.latency)
+                throttle = (self.headers.get("X-Amz-Target", "").startswith("DynamoDB_")
+                            and random.random() < proxy.rate)
+                with proxy._lock:
+                    proxy.requests += 1
+                    proxy.throttled += throttle
+                if throttle:
+                    status, headers, payload = 400, [("Content-Type", "application/x-amz-json-1.0")], THROTTLE_ERROR
+                else:
+                    status, headers, payload = proxy.send_upstream(self.command, self.path, self.headers, body)
+                self.send_response(status)
+                for name, value in headers:
+                    if name.lower() not in HOP_BY_HOP:
+                        self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _forward
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def send_upstream(self, method, path, headers, body):
+        for attempt in range(2):
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                connection = self._local.connection = http.client.HTTPConnection(
+                    self.upstream.hostname, self.upstream.port, timeout=30)
+            try:
+                connection.request(method, path, body=body, headers={
+                    k: v for k, v in headers.items() if k.lower() not in HOP_BY_HOP
+                })
+                response = connection.getresponse()
+                return response.status, response.getheaders(), response.read()
+            except (ConnectionError, http.client.HTTPException):
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def reset_counts(self):
+        with self._lock:
+            self.requests = self.throttled = 0
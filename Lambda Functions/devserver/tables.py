@@ -0,0 +1,88 @@
+"""
+Tables and buckets the handlers expect, created on the local stand-in.
+Keys and indexes mirror the deployed tables; names honour the same
+environment overrides the handlers read.
+"""
+import os
+
+S = "S"
+N = "N"
+
+
+def _table(name, hash_key, range_key=None, indexes=(), ttl=None):
+    return {"name": name, "keys": (hash_key, range_key), "indexes": indexes, "ttl": ttl}
+
+
+TABLES = [
+    _table("Households", ("HouseholdID", S)),
+    _table("UserDetails", ("UserID", S)),
+    _table("SocialFeedPosts", ("PostID", S)),
+    _table("SocialFeedComments", ("CommentID", S)),
+    _table(os.environ.get("IDEMPOTENCY_TABLE", "IdempotencyKeys"), ("IdempotencyKey", S), ttl="ExpiresAt"),
+    _table(os.environ.get("BILLS_TABLE", "Bills"), ("HouseholdID", S), ("BillID", S)),
+    _table(os.environ.get("BILL_ROLLUPS_TABLE", "BillRollups"), ("HouseholdID", S), ("RollupKey", S)),
+    _table("ReservedSpaces", ("HouseholdID", S), ("ReservationID", S)),
+    _table(
+        "HouseholdNotices", ("HouseholdID", S), ("NoticeID", S),
+        indexes=(
+            (os.environ.get("NOTICES_CREATED_AT_INDEX", "HouseholdID-CreatedAt-index"), ("HouseholdID", S), ("CreatedAt", S)),
+            (os.environ.get("NOTICES_VERSION_INDEX", "HouseholdID-Version-index"), ("HouseholdID", S), ("Version", N)),
+        ),
+        ttl="ExpiresAt",
+    ),
+    _table(
+        os.environ.get("SHOPPING_LISTS_TABLE", "ShoppingLists"), ("HouseholdID", S), ("ListID", S),
+        indexes=(
+            (os.environ.get("SHOPPING_LISTS_VERSION_INDEX", "HouseholdID-Version-index"), ("HouseholdID", S), ("Version", N)),
+        ),
+    ),
+]
+
+BUCKETS = [os.environ.get("BILLS_BUCKET", "my-bills-bucket-flatchat")]
+
+
+def _key_schema(hash_key, range_key):
+    schema = [{"AttributeName": hash_key[0], "KeyType": "HASH"}]
+    if range_key:
+        schema.append({"AttributeName": range_key[0], "KeyType": "RANGE"})
+    return schema
+
+
+def create_table(client, spec):
+    hash_key, range_key = spec["keys"]
+    attributes = {hash_key, range_key} - {None}
+    params = {
+        "TableName": spec["name"],
+        "KeySchema": _key_schema(hash_key, range_key),
+        "BillingMode": "PAY_PER_REQUEST",
+    }
+    if spec["indexes"]:
+        params["GlobalSecondaryIndexes"] = [
+            {"IndexName": name, "KeySchema": _key_schema(h, r), "Projection": {"ProjectionType": "ALL"}}
+            for name, h, r in spec["indexes"]
+        ]
+        attributes.update(key for _, h, r in spec["indexes"] for key in (h, r))
+    params["AttributeDefinitions"] = [{"AttributeName": a, "AttributeType": t} for a, t in sorted(attributes)]
+    client.create_table(**params)
+    client.get_waiter("table_exists").wait(TableName=spec["name"])
+    if spec["ttl"]:
+        client.update_time_to_live(
+            TableName=spec["name"],
+            TimeToLiveSpecification={"Enabled": True, "AttributeName": spec["ttl"]},
+        )
+
+
+def ensure(dynamodb_client, s3_client, region):
+    """Creates whatever tables and buckets are missing; returns the names created."""
+    existing = set(dynamodb_client.list_tables()["TableNames"])
+    created = []
+    for spec in TABLES:
+        if spec["name"] not in existing:
+            create_table(dynamodb_client, spec)
+            created.append(spec["name"])
+    buckets = {b["Name"] for b in s3_client.list_buckets().get("Buckets", [])}
+    for bucket in BUCKETS:
+        if bucket not in buckets:
+            s3_client.create_bucket(Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": region})
+            created.append(bucket)
+    return created
@@ -1,20 +1,11 @@
-import json
-import boto3
-from decimal import Decimal
+from flatchat.http import respond
+from flatchat import aws, log, metrics
 
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table("SocialFeedPosts")
-
-def convert_decimal(obj):
-    if isinstance(obj, Decimal):
-        return float(obj)  # Convert Decimal to float
-    if isinstance(obj, list):
-        return [convert_decimal(i) for i in obj]
-    if isinstance(obj, dict):
-        return {k: convert_decimal(v) for k, v in obj.items()}
-    return obj
+table = aws.table("SocialFeedPosts")
 
+@metrics.invocation
 def lambda_handler(event, context):
+    log.request(event, context)
     try:
         post_id = event["pathParameters"]["postID"]
 
@@ -22,35 +13,9 @@ def lambda_handler(event, context):
 
         # Check if post exists
         if "Item" not in response:
-            return {
-                "statusCode": 404,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, OPTIONS",
-                    "Access-Control-Allow-Headers": "Content-Type"
-                },
-                "body": json.dumps({"message": "Post not found"})
-            }
-
-        post_data = convert_decimal(response["Item"])
+            return respond(404, {"message": "Post not found"})
 
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type"
-            },
-            "body": json.dumps(post_data)
-        }
+        return respond(200, response["Item"])
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type"
-            },
-            "body": json.dumps({"message": "Error fetching post", "error": str(e)})
-        }
+        return respond(500, {"message": "Error fetching post", "error": str(e)})
@@ -1,21 +1,17 @@
-import json
 import boto3
+from flatchat.http import respond
+from flatchat import aws, log, metrics
 
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table("SocialFeedComments")
+table = aws.table("SocialFeedComments")
 
+@metrics.invocation
 def lambda_handler(event, context):
+    log.request(event, context)
     try:
         post_id = event.get("pathParameters", {}).get("postID")
 
         if not post_id:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*"
-                },
-                "body": json.dumps({"message": "Missing postID in request"})
-            }
+            return respond(400, {"message": "Missing postID in request"})
 
         response = table.scan(
             FilterExpression=boto3.dynamodb.conditions.Attr("PostID").eq(post_id)
@@ -23,19 +19,7 @@ def lambda_handler(event, context):
 
         comments = response.get("Items", [])
 
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({"comments": comments})
-        }
+        return respond(200, {"comments": comments})
 
     except Exception as e:
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*"
-            },
-            "body": json.dumps({"message": "Error fetching comments", "error": str(e)})
-        }
+        return respond(500, {"message": "Error fetching comments", "error": str(e)})
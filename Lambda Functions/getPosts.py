@@ -1,11 +1,9 @@
-import json
-import boto3
 import math
 from decimal import Decimal
+from flatchat.http import respond
+from flatchat import aws, log, metrics, profiles
 
-dynamodb = boto3.resource("dynamodb")
-posts_table = dynamodb.Table("SocialFeedPosts")
-users_table = boto3.client("dynamodb") 
+posts_table = aws.table("SocialFeedPosts")
 
 GEOFENCE_COLLECTION = "student-post-geofences"
 
@@ -13,15 +11,7 @@ def build_response(status_code, message, extra_data=None):
     body = {"message": message}
     if extra_data:
         body.update(extra_data)
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type"
-        },
-        "body": json.dumps(body, default=str)
-    }
+    return respond(status_code, body)
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     """
@@ -37,8 +27,9 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     r = 6371000  # Earth radius in meters
     return c * r
 
+@metrics.invocation
 def lambda_handler(event, context):
-    print("Received event:", json.dumps(event, indent=2))
+    log.request(event, context)
     try:
 
         query_params = event.get("queryStringParameters", {}) or {}
@@ -46,15 +37,14 @@ def lambda_handler(event, context):
         user_long = query_params.get("Longitude")
 
         if not user_lat or not user_long:
-            print("No user location provided; returning empty posts.")
+            log.info("no user location; returning no posts")
             return build_response(200, "Posts fetched successfully", {"posts": []})
 
         try:
             user_lat = float(user_lat)
             user_long = float(user_long)
-            print(f"User location: {user_lat}, {user_long}")
         except Exception as e:
-            print("Error converting user location:", e)
+            log.warning("invalid user location", error=str(e))
             return build_response(200, "Posts fetched successfully", {"posts": []})
 
         dynamodb_response = posts_table.scan()
@@ -66,35 +56,29 @@ def lambda_handler(event, context):
                 post_lat = float(post.get("Latitude"))
                 post_long = float(post.get("Longitude"))
             except Exception as e:
-                print(f"Skipping post {post.get('PostID')} due to conversion error: {e}")
+                log.debug("skipping post without coordinates", postId=post.get("PostID"), error=str(e))
                 continue
 
-            user_id = post.get("UserID")
-            if user_id and not post.get("Author"):
-                user_response = users_table.get_item(
-                    TableName="UserDetails",
-                    Key={"UserID": {"S": user_id}}
-                )
-                if "Item" in user_response:
-                    post["Author"] = user_response["Item"].get("Name", {}).get("S", "Unknown User")
-                else:
-                    post["Author"] = "Unknown User"
-
             try:
                 allowed_radius = float(post.get("GeofenceRadius", 0))
             except Exception as e:
-                print(f"Error converting GeofenceRadius for post {post.get('PostID')}: {e}")
+                log.debug("invalid geofence radius", postId=post.get("PostID"), error=str(e))
                 allowed_radius = 0
 
             distance = haversine_distance(user_lat, user_long, post_lat, post_long)
-            print(f"Post {post.get('PostID')}: distance = {distance:.2f} m, allowed radius = {allowed_radius} m")
             if distance <= allowed_radius:
                 filtered_posts.append(post)
 
+        # Names for older posts saved without an Author, in one cached lookup
+        unnamed = [post for post in filtered_posts if post.get("UserID") and not post.get("Author")]
+        authors = profiles.get_many(post["UserID"] for post in unnamed)
+        for post in unnamed:
+            post["Author"] = authors.get(post["UserID"], {}).get("Name", "Unknown User")
+
         filtered_posts.sort(key=lambda p: p.get("CreatedAt", ""), reverse=True)
 
         return build_response(200, "Posts fetched successfully", {"posts": filtered_posts})
     
     except Exception as e:
-        print(f"Error: {e}")
+        log.error("unhandled error", error=str(e))
         return build_response(500, "Error fetching posts", {"error": str(e)})
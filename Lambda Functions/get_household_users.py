@@ -1,39 +1,34 @@
-import json
-import boto3
-from decimal import Decimal
+from flatchat.http import respond
+from flatchat import aws, log, metrics, profiles
 
-dynamodb = boto3.resource("dynamodb")
-table = dynamodb.Table("UserDetails") 
+households_table = aws.table("Households")
 
+@metrics.invocation
 def lambda_handler(event, context):
-    print("Received event:", json.dumps(event))
+    log.request(event, context)
     try:
         qs = event.get("queryStringParameters") or {}
         household_id = qs.get("HouseholdID")
-        
+
         if not household_id:
-            return {
-                "statusCode": 400,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"error": "Missing HouseholdID query param"})
-            }
-        
-        scan_response = table.scan(
-            FilterExpression="HouseholdID = :hid",
-            ExpressionAttributeValues={":hid": household_id}
-        )
-        members = scan_response.get("Items", [])
-        
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"users": members}, default=lambda o: float(o) if isinstance(o, Decimal) else o)
-        }
-        
+            return respond(400, {"error": "Missing HouseholdID query param"})
+
+        # The household lists its members, so their profiles are batch-read
+        # instead of scanning UserDetails. Fresh reads: a member who just
+        # joined must already carry the HouseholdID checked below.
+        household = households_table.get_item(
+            Key={"HouseholdID": household_id},
+            ProjectionExpression="Members"
+        ).get("Item") or {}
+        member_ids = household.get("Members", [])
+        found = profiles.get_many(member_ids, fresh=True)
+        members = [
+            found[user_id] for user_id in dict.fromkeys(member_ids)
+            if user_id in found and found[user_id].get("HouseholdID") == household_id
+        ]
+
+        return respond(200, {"users": members})
+
     except Exception as e:
-        print("Error:", e)
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"error": str(e)})
-        }
+        log.error("unhandled error", error=str(e))
+        return respond(500, {"error": str(e)})
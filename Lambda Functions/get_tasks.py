@@ -1,46 +1,48 @@
-import json
-import boto3
+from flatchat.http import respond, not_modified, validator_headers
+from flatchat import aws, log, metrics
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('Households')
+table = aws.table('Households')
 
+@metrics.invocation
 def lambda_handler(event, context):
+    log.request(event, context)
     try:
-        print("📡 Event received:", json.dumps(event))  
-        
-        household_id = event.get('queryStringParameters', {}).get('HouseholdID')
+        query_params = event.get('queryStringParameters') or {}
+        household_id = query_params.get('HouseholdID')
 
         if not household_id:
-            return {
-                "statusCode": 400,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps("Missing HouseholdID")
-            }
+            return respond(400, "Missing HouseholdID")
 
-        print("🔍 Fetching tasks for HouseholdID:", household_id)  
+        since = query_params.get('since')
+        if since is not None and not since.isdigit():
+            return respond(400, "since must be a task version number")
 
         response = table.get_item(Key={"HouseholdID": household_id})
         household = response.get('Item')
 
         if not household or "Tasks" not in household:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps({"message": "No tasks found"})
-            }
-
-        print("Tasks retrieved successfully:", household["Tasks"])  
-
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"tasks": household["Tasks"]})
-        }
+            return respond(404, {"message": "No tasks found"})
+
+        # TasksVersion/TasksModifiedAt are bumped by every task write
+        version = int(household.get("TasksVersion", 0))
+        modified = int(household.get("TasksModifiedAt", 0))
+        validators = validator_headers(f'"{version}"', modified)
+        if not_modified(event, validators["ETag"], modified):
+            return respond(304, None, validators)
+
+        if since is not None:
+            since = int(since)
+            # Tombstones older than the floor were dropped, and tasks written
+            # before versioning have no Version, so a sync from 0 gets everything
+            full = since == 0 or since < int(household.get("TaskTombstoneFloor", 0))
+            if full:
+                since = 0
+            changed = household["Tasks"] if full else [t for t in household["Tasks"] if int(t.get("Version", 0)) > since]
+            deleted = [tid for tid, v in (household.get("TaskTombstones") or {}).items() if int(v) > since]
+            return respond(200, {"version": version, "full": full, "tasks": changed, "deleted": deleted}, validators)
+
+        return respond(200, {"tasks": household["Tasks"], "version": version}, validators)
 
     except Exception as e:
-        print("🚨 Error:", str(e))  
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps(f"Error: {str(e)}")
-        }
+        log.error("unhandled error", error=str(e))
+        return respond(500, f"Error: {str(e)}")
@@ -1,15 +1,207 @@
+import os
 import json
+import time
 import uuid
-import boto3
-from boto3.dynamodb.conditions import Key
-from datetime import datetime
+import base64
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+from datetime import datetime, timezone
+from flatchat.http import respond, not_modified, validator_headers
+from flatchat import aws, log, metrics, versioning
 
-dynamodb = boto3.resource("dynamodb", region_name="eu-west-1")
+dynamodb = aws.resource("dynamodb", region_name="eu-west-1")
 TABLE_NAME = "HouseholdNotices"
-table = dynamodb.Table(TABLE_NAME)
+table = aws.table(TABLE_NAME, region_name="eu-west-1")
 
+# GSI (HouseholdID, CreatedAt) used to read notices newest first.
+# ExpiresAt (epoch seconds) is the table's TTL attribute.
+CREATED_AT_INDEX = os.environ.get("NOTICES_CREATED_AT_INDEX", "HouseholdID-CreatedAt-index")
+# Pinned notice IDs live in one small string set per household
+PINNED_ID = "#PINNED"
+MAX_PINNED = 10
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Every write bumps the household's version marker and stamps the notice
+# with the new Version; the sparse (HouseholdID, Version) GSI then serves
+# "changes since" reads. Deletions are remembered as tombstones on the
+# marker, the oldest being dropped past MAX_TOMBSTONES (TombstoneFloor
+# records where the history starts).
+VERSION_ID = "#VERSION"
+VERSION_INDEX = os.environ.get("NOTICES_VERSION_INDEX", "HouseholdID-Version-index")
+MAX_TOMBSTONES = 100
+MAX_WRITE_ATTEMPTS = 3
+
+class PinLimitReached(Exception):
+    pass
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+def decode_cursor(text):
+    return json.loads(base64.urlsafe_b64decode(text.encode("ascii")))
+
+def parse_expires_at(value):
+    """
+    ExpiresAt may be sent as epoch seconds or an ISO date/time. It is stored
+    as epoch seconds so DynamoDB TTL can delete the notice.
+    """
+    if isinstance(value, (int, float, Decimal)) or str(value).isdigit():
+        expires_at = int(value)
+    else:
+        text = str(value).strip()
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        parsed = datetime.fromisoformat(text)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        expires_at = int(parsed.timestamp())
+    if expires_at <= time.time():
+        raise ValueError("ExpiresAt must be in the future")
+    return expires_at
+
+def is_live(notice, now):
+    """TTL deletes lazily (up to a couple of days late), so expired notices are filtered on read too."""
+    return "ExpiresAt" not in notice or notice["ExpiresAt"] > now
+
+def pinned_key(household_id):
+    return {"HouseholdID": household_id, "NoticeID": PINNED_ID}
+
+def pinned_update(household_id, notice_id, pinned):
+    """Transaction item that adds a notice to (or drops it from) the household's pinned set."""
+    if pinned:
+        return {"Update": {
+            "TableName": TABLE_NAME,
+            "Key": pinned_key(household_id),
+            "UpdateExpression": "ADD NoticeIDs :ids",
+            "ConditionExpression": "attribute_not_exists(NoticeIDs) OR size(NoticeIDs) < :max OR contains(NoticeIDs, :id)",
+            "ExpressionAttributeValues": {":ids": {notice_id}, ":max": MAX_PINNED, ":id": notice_id}
+        }}
+    return {"Update": {
+        "TableName": TABLE_NAME,
+        "Key": pinned_key(household_id),
+        "UpdateExpression": "DELETE NoticeIDs :ids",
+        "ExpressionAttributeValues": {":ids": {notice_id}}
+    }}
+
+def get_pinned(household_id, now):
+    """Loads the pinned notices, forgetting any that have expired or been removed."""
+    pinned_ids = table.get_item(Key=pinned_key(household_id)).get("Item", {}).get("NoticeIDs") or set()
+    if not pinned_ids:
+        return []
+    result = dynamodb.batch_get_item(RequestItems={
+        TABLE_NAME: {"Keys": [{"HouseholdID": household_id, "NoticeID": nid} for nid in pinned_ids]}
+    })
+    notices = [n for n in result.get("Responses", {}).get(TABLE_NAME, []) if is_live(n, now)]
+    stale = set(pinned_ids) - {n["NoticeID"] for n in notices} - {k["NoticeID"] for k in result.get("UnprocessedKeys", {}).get(TABLE_NAME, {}).get("Keys", [])}
+    if stale:
+        table.update_item(
+            Key=pinned_key(household_id),
+            UpdateExpression="DELETE NoticeIDs :ids",
+            ExpressionAttributeValues={":ids": stale}
+        )
+    notices.sort(key=lambda n: n.get("CreatedAt", ""), reverse=True)
+    return notices
+
+VERSIONS = versioning.Marker(TABLE_NAME, marker_key={"NoticeID": VERSION_ID}, region_name="eu-west-1",
+                             max_tombstones=MAX_TOMBSTONES, max_attempts=MAX_WRITE_ATTEMPTS)
+
+def read_version(household_id, consistent=False):
+    return VERSIONS.read(household_id, consistent=consistent)
+
+def write_versioned(household_id, build_actions, expires_at=None, removed_id=None):
+    """
+    Runs build_actions(version) in one transaction with the marker bump
+    (see flatchat.versioning). Returns the new version.
+    """
+    def changes(marker, version, now):
+        # Pending expiry times let readers notice a notice expiring without a write
+        expiry_times = {int(t) for t in marker.get("ExpiryTimes", set()) if t > now}
+        if expires_at:
+            expiry_times.add(int(expires_at))
+        if expiry_times:
+            return {"sets": ["ExpiryTimes = :expiry"], "values": {":expiry": expiry_times}}
+        if "ExpiryTimes" in marker:
+            return {"removes": ["ExpiryTimes"]}
+        return None
+
+    return VERSIONS.write(household_id, build_actions, removed_id=removed_id, changes=changes)
+
+def write_notice(notice, pin_change=None):
+    """Puts a notice under a new household version, updating the pinned set when its pin changes."""
+    household_id = notice["HouseholdID"]
+
+    def build_actions(version):
+        notice["Version"] = version
+        actions = [{"Put": {"TableName": TABLE_NAME, "Item": notice}}]
+        if pin_change is not None:
+            actions.append(pinned_update(household_id, notice["NoticeID"], pin_change))
+        return actions
+
+    try:
+        return write_versioned(household_id, build_actions, expires_at=notice.get("ExpiresAt"))
+    except ClientError as e:
+        reasons = e.response.get("CancellationReasons") or []
+        if pin_change and len(reasons) > 1 and reasons[1].get("Code") == "ConditionalCheckFailed":
+            raise PinLimitReached()
+        raise
+
+def delete_notice(household_id, notice_id, pinned):
+    def build_actions(version):
+        actions = [{"Delete": {"TableName": TABLE_NAME, "Key": {"HouseholdID": household_id, "NoticeID": notice_id}}}]
+        if pinned:
+            actions.append(pinned_update(household_id, notice_id, False))
+        return actions
+    return write_versioned(household_id, build_actions, removed_id=notice_id)
+
+def household_state(marker, now):
+    """
+    Validator pair for the household's notices: an ETag combining the
+    version with the last expiry that has passed, and the matching
+    Last-Modified time (epoch seconds).
+    """
+    version = int(marker.get("HouseholdVersion", 0))
+    modified = int(marker.get("ModifiedAt", 0))
+    expired = [int(t) for t in marker.get("ExpiryTimes", set()) if t <= now]
+    last_expired = max(expired) if expired else 0
+    return f'"{version}-{last_expired}"', max(modified, last_expired)
+
+def changes_since(household_id, marker, since):
+    """Notices written after version `since`, plus the IDs deleted since then."""
+    if since == 0 or since < int(marker.get("TombstoneFloor", 0)):
+        since, full = 0, True
+    else:
+        full = False
+    changed = []
+    if full:
+        # Older notices may predate versioning, so resend the whole partition
+        query_kwargs = {
+            "KeyConditionExpression": Key("HouseholdID").eq(household_id),
+            "FilterExpression": Attr("CreatedAt").exists()
+        }
+    else:
+        query_kwargs = {
+            "IndexName": VERSION_INDEX,
+            "KeyConditionExpression": Key("HouseholdID").eq(household_id) & Key("Version").gt(since)
+        }
+    while True:
+        response = table.query(**query_kwargs)
+        changed.extend(response.get("Items", []))
+        if "LastEvaluatedKey" not in response:
+            break
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    deleted = [nid for nid, version in (marker.get("Tombstones") or {}).items() if version > since]
+    return {
+        "version": int(marker.get("HouseholdVersion", 0)),
+        "full": full,
+        "notices": changed,
+        "deleted": deleted
+    }
+
+@metrics.invocation
 def lambda_handler(event, context):
-    print("Received event:", json.dumps(event))
+    log.request(event, context)
 
     method = event.get("httpMethod", "")
     path_parameters = event.get("pathParameters") or {}
@@ -24,18 +216,58 @@ def lambda_handler(event, context):
             body_data = json.loads(event.get("body") or "{}")
             household_id = body_data.get("HouseholdID")
         except Exception as e:
-            print("Error parsing body for HouseholdID:", e)
+            log.warning("invalid request body", error=str(e))
 
     if not household_id:
         return respond(400, {"message": "Missing HouseholdID"})
 
     try:
         if method == "GET":
-            response = table.query(
-                KeyConditionExpression=Key('HouseholdID').eq(household_id)
-            )
-            notices = response.get('Items', [])
-            return respond(200, {"notices": notices})
+            try:
+                limit = min(int(query_params.get("limit") or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+                since = int(query_params["since"]) if query_params.get("since") else None
+            except ValueError:
+                return respond(400, {"message": "limit and since must be numbers"})
+            cursor = query_params.get("cursor")
+            now = int(time.time())
+
+            # One small read answers polls from idle households with a 304
+            marker = read_version(household_id)
+            etag, modified = household_state(marker, now)
+            validators = validator_headers(etag, modified)
+            if not_modified(event, etag, modified):
+                return respond(304, None, validators)
+            if since is not None:
+                return respond(200, changes_since(household_id, marker, since), validators)
+
+            query_kwargs = {
+                "IndexName": CREATED_AT_INDEX,
+                "KeyConditionExpression": Key('HouseholdID').eq(household_id),
+                "FilterExpression": Attr('ExpiresAt').not_exists() | Attr('ExpiresAt').gt(now),
+                "ScanIndexForward": False,
+                "Limit": limit
+            }
+            if cursor:
+                try:
+                    start_key = decode_cursor(cursor)
+                except ValueError:
+                    return respond(400, {"message": "Invalid cursor"})
+                if not isinstance(start_key, dict) or start_key.get("HouseholdID") != household_id:
+                    return respond(400, {"message": "Invalid cursor"})
+                query_kwargs["ExclusiveStartKey"] = start_key
+            response = table.query(**query_kwargs)
+            last_key = response.get("LastEvaluatedKey")
+
+            # Pinned notices are shown separately, above the first page
+            pinned = get_pinned(household_id, now) if not cursor else []
+            pinned_ids = {n["NoticeID"] for n in pinned}
+            notices = [n for n in response.get('Items', []) if n["NoticeID"] not in pinned_ids and not n.get("Pinned")]
+            return respond(200, {
+                "notices": notices,
+                "pinned": pinned,
+                "cursor": encode_cursor(last_key) if last_key else None,
+                "version": int(marker.get("HouseholdVersion", 0))
+            }, validators)
 
         elif method == "POST":
             data = json.loads(event.get('body') or "{}")
@@ -45,7 +277,19 @@ def lambda_handler(event, context):
             
             data['CreatedAt'] = datetime.utcnow().isoformat() + "Z"
 
-            table.put_item(Item=data)
+            if data.get('ExpiresAt'):
+                try:
+                    data['ExpiresAt'] = parse_expires_at(data['ExpiresAt'])
+                except ValueError as e:
+                    return respond(400, {"message": f"Invalid ExpiresAt: {e}"})
+            else:
+                data.pop('ExpiresAt', None)
+
+            data['Pinned'] = bool(data.get('Pinned'))
+            try:
+                write_notice(data, pin_change=True if data['Pinned'] else None)
+            except PinLimitReached:
+                return respond(409, {"message": f"A household can pin at most {MAX_PINNED} notices"})
             return respond(201, data)
 
         elif method == "PUT":
@@ -67,7 +311,20 @@ def lambda_handler(event, context):
             if "CreatedAt" not in data:
                 data["CreatedAt"] = existing_item.get("CreatedAt", datetime.utcnow().isoformat() + "Z")
 
-            table.put_item(Item=data)
+            if data.get("ExpiresAt"):
+                try:
+                    data["ExpiresAt"] = existing_item["ExpiresAt"] if data["ExpiresAt"] == existing_item.get("ExpiresAt") else parse_expires_at(data["ExpiresAt"])
+                except ValueError as e:
+                    return respond(400, {"message": f"Invalid ExpiresAt: {e}"})
+            else:
+                data.pop("ExpiresAt", None)
+
+            data["Pinned"] = bool(data.get("Pinned", existing_item.get("Pinned", False)))
+            pin_change = data["Pinned"] if data["Pinned"] != bool(existing_item.get("Pinned")) else None
+            try:
+                write_notice(data, pin_change=pin_change)
+            except PinLimitReached:
+                return respond(409, {"message": f"A household can pin at most {MAX_PINNED} notices"})
             return respond(200, data)
 
         elif method == "DELETE":
@@ -81,30 +338,12 @@ def lambda_handler(event, context):
             if not existing_item:
                 return respond(404, {"message": "Notice not found"})
 
-            table.delete_item(
-                Key={
-                    "HouseholdID": household_id,
-                    "NoticeID": notice_id
-                }
-            )
+            delete_notice(household_id, notice_id, bool(existing_item.get("Pinned")))
             return respond(200, {"message": "Notice deleted"})
 
         else:
             return respond(405, {"message": f"Method not allowed: {method}"})
 
     except Exception as e:
-        print("Error:", e)
+        log.error("unhandled error", error=str(e))
         return respond(500, {"message": str(e)})
-
-def respond(status_code, body):
-    """Return a JSON response with CORS headers."""
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",        
-            "Access-Control-Allow-Credentials": "true",
-            "Access-Control-Allow-Methods": "OPTIONS,GET,POST,PUT,DELETE",
-        },
-        "body": json.dumps(body)
-    }
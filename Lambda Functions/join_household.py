@@ -1,25 +1,18 @@
 import json
-import boto3
+from flatchat.http import respond, preflight
+from flatchat import aws, fanout, log, metrics, profiles
 
-dynamodb = boto3.resource("dynamodb")
-households_table = dynamodb.Table("Households")
-users_table = dynamodb.Table("UserDetails")
+households_table = aws.table("Households")
+users_table = aws.table("UserDetails")
 
+FANOUT_TIMEOUT = 6
+
+@metrics.invocation
 def lambda_handler(event, context):
-    cors_headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "Content-Type,Authorization",
-        "Access-Control-Allow-Methods": "OPTIONS,POST"
-    }
-    
+    log.request(event, context)
     if event.get("httpMethod") == "OPTIONS":
-        return {
-            "statusCode": 200,
-            "headers": cors_headers,
-            "body": ""
-        }
+        return preflight()
     
-    print("Received event:", json.dumps(event))
     body = json.loads(event.get("body", "{}"))
     
     join_code = body.get("JoinCode")
@@ -27,11 +20,7 @@ def lambda_handler(event, context):
     household_id = body.get("HouseholdID")
 
     if not user_id:
-        return {
-            "statusCode": 400,
-            "headers": cors_headers,
-            "body": json.dumps({"message": "Missing UserID"})
-        }
+        return respond(400, {"message": "Missing UserID"})
     
     if join_code:
         response = households_table.scan(
@@ -40,45 +29,36 @@ def lambda_handler(event, context):
         )
         items = response.get("Items", [])
         if not items:
-            return {
-                "statusCode": 404,
-                "headers": cors_headers,
-                "body": json.dumps({"message": "Invalid Join Code"})
-            }
+            return respond(404, {"message": "Invalid Join Code"})
         household = items[0]
         household_id = household["HouseholdID"]
         
         updated_members = household.get("Members", [])
         if user_id not in updated_members:
             updated_members.append(user_id)
-            households_table.update_item(
-                Key={"HouseholdID": household_id},
-                UpdateExpression="SET Members = :members",
-                ExpressionAttributeValues={":members": updated_members}
-            )
-            users_table.update_item(
-                Key={"UserID": user_id},
-                UpdateExpression="SET HouseholdID = :hid",
-                ExpressionAttributeValues={":hid": household_id}
-            )
+            fanout.run({
+                "household": lambda: households_table.update_item(
+                    Key={"HouseholdID": household_id},
+                    UpdateExpression="SET Members = :members",
+                    ExpressionAttributeValues={":members": updated_members}
+                ),
+                "user": lambda: users_table.update_item(
+                    Key={"UserID": user_id},
+                    UpdateExpression="SET HouseholdID = :hid",
+                    ExpressionAttributeValues={":hid": household_id}
+                ),
+            }, timeout=FANOUT_TIMEOUT)
+            profiles.invalidate(user_id)
             message = "User added to household"
         else:
             message = "User is already part of the household"
     else:
         if not household_id:
-            return {
-                "statusCode": 400,
-                "headers": cors_headers,
-                "body": json.dumps({"message": "HouseholdID is required if no JoinCode is provided"})
-            }
+            return respond(400, {"message": "HouseholdID is required if no JoinCode is provided"})
         response = households_table.get_item(Key={"HouseholdID": household_id})
         household = response.get("Item")
         if not household:
-            return {
-                "statusCode": 404,
-                "headers": cors_headers,
-                "body": json.dumps({"message": "Household not found"})
-            }
+            return respond(404, {"message": "Household not found"})
         message = "Household retrieved"
     
     household_name = household.get("Name", "Unknown")
@@ -87,14 +67,10 @@ def lambda_handler(event, context):
     
     join_code_val = household.get("JoinCode", "")
     
-    return {
-        "statusCode": 200,
-        "headers": cors_headers,
-        "body": json.dumps({
-            "message": message,
-            "HouseholdID": household.get("HouseholdID"),
-            "HouseholdName": household_name,
-            "JoinCode": join_code_val,
-            "Admins": household.get("Admins", []) 
-        })
-    }
+    return respond(200, {
+        "message": message,
+        "HouseholdID": household.get("HouseholdID"),
+        "HouseholdName": household_name,
+        "JoinCode": join_code_val,
+        "Admins": household.get("Admins", []) 
+    })
@@ -0,0 +1,95 @@
+"""
+Cold-start budget check: imports every handler in a fresh interpreter and
+compares the median init time against cold_start_budget.json. Exits 1 when
+a handler goes over budget, so it can gate a deploy.
+
+    PYTHONPATH=layer/python python layer/benchmarks/bench_cold_start.py
+    PYTHONPATH=layer/python python layer/benchmarks/bench_cold_start.py --record
+
+--record rewrites the budgets from this run plus HEADROOM. Only record on
+the machine class the check runs on; the numbers are not portable.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HANDLERS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "cold_start_budget.json")
+HEADROOM = 1.25
+
+# Runs in the child: the interpreter is already up, so this is the part of
+# Lambda's INIT phase the handler module itself is responsible for.
+PROBE = """
+import importlib.util, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("handler", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def handler_files():
+    return sorted(name for name in os.listdir(HANDLERS_DIR) if name.endswith(".py"))
+
+
+def measure(path, runs):
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE, path],
+            capture_output=True, text=True, env=os.environ, check=False,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{os.path.basename(path)} failed to import:\n{result.stderr}")
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def load_budget():
+    if not os.path.exists(BUDGET_FILE):
+        return {"default_ms": None, "handlers": {}}
+    with open(BUDGET_FILE) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--record", action="store_true")
+    args = parser.parse_args()
+
+    budget = load_budget()
+    measured = {}
+    over = []
+    for name in handler_files():
+        ms = measure(os.path.join(HANDLERS_DIR, name), args.runs)
+        measured[name] = ms
+        limit = budget["handlers"].get(name, budget.get("default_ms"))
+        status = "" if limit is None else ("OVER" if ms > limit else "ok")
+        if status == "OVER":
+            over.append(name)
+        print(f"{name:<32} {ms:8.1f} ms   budget {'-' if limit is None else f'{limit:.0f}':>6}  {status}")
+
+    if args.record:
+        budget = {
+            "default_ms": round(max(measured.values()) * HEADROOM),
+            "handlers": {name: round(ms * HEADROOM) for name, ms in measured.items()},
+        }
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budget, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Recorded budgets to {BUDGET_FILE}")
+        return 0
+
+    if over:
+        print(f"Over cold-start budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
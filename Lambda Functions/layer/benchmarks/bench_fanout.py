@@ -0,0 +1,90 @@
+"""
+Sequential against fanned-out independent calls: join_household's two
+UpdateItems and createPost's profile read plus a second write, through the
+stand-in with a simulated service round trip on every call. The calls go
+to the first household of a devserver.dataset world and its first member.
+
+    cd "Lambda Functions"
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_fanout.py
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_fanout.py --latency-ms 25 --requests 100 --users 5000
+
+Needs boto3 and moto[server], or --endpoint for an emulator already running.
+"""
+import argparse
+import os
+import statistics
+import time
+
+import boto3
+
+from devserver import tables
+from devserver.standin import REGION, ThrottlingProxy, configure_environment, start_moto
+
+
+def populate(endpoint, users):
+    """Writes the dataset's users and households; returns (household ID, its first member's ID)."""
+    session = boto3.session.Session()
+    tables.ensure(session.client("dynamodb", endpoint_url=endpoint, region_name=REGION),
+                  session.client("s3", endpoint_url=endpoint, region_name=REGION), REGION)
+    # The handler modules dataset builds on read the environment at import
+    from devserver import dataset
+    dataset.populate(endpoint, users=users, posts=0, only={"Households", "UserDetails"})
+    first, _, _ = dataset.World(users, dataset.SEED).households[0]
+    return "household-0", f"user-{first}"
+
+
+def timed(fn, requests):
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return statistics.median(latencies), statistics.quantiles(latencies, n=100)[94]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint")
+    parser.add_argument("--latency-ms", type=float, default=15)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    upstream = args.endpoint or start_moto(5009)
+    configure_environment(upstream)
+    household_id, user_id = populate(upstream, args.users)
+    proxy = ThrottlingProxy(upstream, 0.0, latency_ms=args.latency_ms).start()
+    configure_environment(proxy.url)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("PROFILE_CACHE_SECONDS", "0")
+
+    from flatchat import aws, fanout, profiles
+    households = aws.table("Households")
+    users = aws.table("UserDetails")
+    members = households.get_item(Key={"HouseholdID": household_id})["Item"]["Members"]
+
+    def update_household():
+        households.update_item(Key={"HouseholdID": household_id}, UpdateExpression="SET Members = :m",
+                               ExpressionAttributeValues={":m": members})
+
+    def update_user():
+        users.update_item(Key={"UserID": user_id}, UpdateExpression="SET HouseholdID = :h",
+                          ExpressionAttributeValues={":h": household_id})
+
+    cases = {
+        "join_household, 2 updates": {"household": update_household, "user": update_user},
+        "profile read + a write": {"user": lambda: profiles.get(user_id), "household": update_household},
+    }
+    update_household()
+    update_user()  # connect and load the model before timing
+
+    print(f"{args.requests} requests each, {args.latency_ms:g} ms added to every call")
+    for name, calls in cases.items():
+        sequential = timed(lambda: [call() for call in calls.values()], args.requests)
+        parallel = timed(lambda: fanout.run(calls, timeout=5), args.requests)
+        print(f"{name:<28} sequential p50 {sequential[0]:6.1f} ms  p95 {sequential[1]:6.1f}"
+              f"   fan-out p50 {parallel[0]:6.1f} ms  p95 {parallel[1]:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
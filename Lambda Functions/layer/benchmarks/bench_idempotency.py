@@ -0,0 +1,89 @@
+"""
+Client retries against the create endpoints, with and without an
+Idempotency-Key: records written per logical create and the latency of a
+first attempt against a replayed retry. Comments go on devserver.dataset
+posts (post-0, then post-1) from the dataset's users.
+
+    cd "Lambda Functions"
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_idempotency.py
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_idempotency.py --creates 200 --retries 3 --users 5000
+
+Needs boto3 and moto[server], or --endpoint for an emulator already running.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import uuid
+
+import boto3
+
+from devserver import tables
+from devserver.standin import REGION, configure_environment, start_moto
+
+
+def populate(endpoint, users):
+    session = boto3.session.Session()
+    tables.ensure(session.client("dynamodb", endpoint_url=endpoint, region_name=REGION),
+                  session.client("s3", endpoint_url=endpoint, region_name=REGION), REGION)
+    # The handler modules dataset builds on read the environment at import
+    from devserver import dataset
+    # The dataset's own comments are left out so only the benchmark's are counted
+    dataset.populate(endpoint, users=users, posts=2, only={"SocialFeedPosts", "UserDetails"})
+
+
+def comment_count(endpoint, post_id):
+    table = boto3.resource("dynamodb", endpoint_url=endpoint, region_name=REGION).Table("SocialFeedComments")
+    count = 0
+    kwargs = {"FilterExpression": "PostID = :post", "ExpressionAttributeValues": {":post": post_id}, "Select": "COUNT"}
+    while True:
+        result = table.scan(**kwargs)
+        count += result["Count"]
+        if "LastEvaluatedKey" not in result:
+            return count
+        kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
+
+def run(handler, endpoint, post_id, users, creates, retries, with_key):
+    first, replayed = [], []
+    for i in range(creates):
+        headers = {"Idempotency-Key": str(uuid.uuid4())} if with_key else {}
+        event = {
+            "httpMethod": "POST", "resource": "/create-comment", "headers": headers,
+            "body": json.dumps({"PostID": post_id, "UserID": f"user-{i % users}", "Content": f"Comment {i}"}),
+        }
+        for attempt in range(1 + retries):
+            started = time.perf_counter()
+            handler(event, None)
+            (first if attempt == 0 else replayed).append((time.perf_counter() - started) * 1000)
+    return comment_count(endpoint, post_id), first, replayed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint")
+    parser.add_argument("--creates", type=int, default=100)
+    parser.add_argument("--retries", type=int, default=2, help="times each create is sent again")
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    endpoint = args.endpoint or start_moto(5008)
+    configure_environment(endpoint)
+    populate(endpoint, args.users)
+
+    # Keep the per-invocation log and metric lines out of the report
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("DYNAMODB_METRICS", "0")
+    import createComment
+
+    print(f"{args.creates} comments, each sent {1 + args.retries} times")
+    for post_id, (name, with_key) in enumerate((("no key", False), ("Idempotency-Key", True))):
+        written, first, replayed = run(createComment.lambda_handler, endpoint, f"post-{post_id}", args.users,
+                                       args.creates, args.retries, with_key)
+        print(f"{name:<16} comments written {written:>5} ({written / args.creates:.1f} per create)"
+              f"  first p50 {statistics.median(first):6.2f} ms  retry p50 {statistics.median(replayed):6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Response encoding benchmark: the old convert_decimals() walk followed by
+json.dumps against flatchat.encoding.dumps, on DynamoDB-shaped items.
+
+    PYTHONPATH=layer/python python layer/benchmarks/bench_json.py
+"""
+import json
+import random
+import timeit
+from decimal import Decimal
+
+from flatchat import encoding
+
+
+def convert_decimals(obj):
+    """The per-handler helper the layer replaces."""
+    if isinstance(obj, list):
+        return [convert_decimals(i) for i in obj]
+    elif isinstance(obj, dict):
+        return {k: convert_decimals(v) for k, v in obj.items()}
+    elif isinstance(obj, Decimal):
+        return float(obj)
+    else:
+        return obj
+
+
+def make_items(count):
+    rng = random.Random(400)
+    items = []
+    for i in range(count):
+        items.append({
+            "HouseholdID": "household-1",
+            "BillID": f"bill-{i}",
+            "Title": f"Electricity {i}",
+            "Amount": Decimal(rng.randint(100, 50000)) / 100,
+            "CreatedAt": Decimal(1700000000 + i),
+            "Version": Decimal(i),
+            "Splits": [
+                {"UserID": f"user-{j}", "Share": Decimal(rng.randint(1, 9999)) / 100, "Paid": bool(j % 2)}
+                for j in range(4)
+            ],
+        })
+    return items
+
+
+def main():
+    print(f"backend: {encoding.BACKEND}")
+    for count in (10, 100, 1000):
+        body = {"items": make_items(count)}
+        runs = max(3, 2000 // count)
+        old = min(timeit.repeat(lambda: json.dumps(convert_decimals(body)), number=runs, repeat=5)) / runs
+        new = min(timeit.repeat(lambda: encoding.dumps(body), number=runs, repeat=5)) / runs
+        print(f"{count:>5} items  convert+json.dumps {old * 1e3:8.3f} ms   dumps {new * 1e3:8.3f} ms   x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    main()
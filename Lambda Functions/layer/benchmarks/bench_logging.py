@@ -0,0 +1,62 @@
+"""
+Per-request logging cost: the old print("Received event:", json.dumps(event))
+against flatchat.log.request(), on an API Gateway event carrying a base64
+bill image. Reports bytes written and CPU time per request.
+
+    PYTHONPATH=layer/python python layer/benchmarks/bench_logging.py
+"""
+import base64
+import contextlib
+import io
+import json
+import os
+import random
+import timeit
+
+from flatchat import log
+
+
+def make_event(image_bytes):
+    image = base64.b64encode(random.Random(400).randbytes(image_bytes)).decode("ascii")
+    body = {"HouseholdID": "household-1", "Title": "Electricity", "TotalAmount": 84.2,
+            "ImageData": image, "ImageContentType": "image/jpeg"}
+    return {
+        "resource": "/bills", "path": "/bills", "httpMethod": "POST",
+        "headers": {"Authorization": "Bearer " + "x" * 900, "Content-Type": "application/json"},
+        "queryStringParameters": None, "pathParameters": None,
+        "requestContext": {"requestId": "c6af9ac6-7b61-11e6-9a41-93e8deadbeef", "stage": "prod"},
+        "body": json.dumps(body),
+    }
+
+
+def old(event):
+    print("Received event:", json.dumps(event))
+
+
+def new(event):
+    log.request(event)
+
+
+def measure(fn, event, runs):
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        fn(event)
+    size = len(sink.getvalue().encode("utf-8"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        seconds = min(timeit.repeat(lambda: fn(event), number=runs, repeat=5)) / runs
+    return size, seconds
+
+
+def main():
+    print(f"LOG_LEVEL={os.environ.get('LOG_LEVEL', 'INFO')}")
+    for image_bytes in (0, 200_000, 2_000_000):
+        event = make_event(image_bytes)
+        runs = 20 if image_bytes > 1_000_000 else 200
+        old_size, old_time = measure(old, event, runs)
+        new_size, new_time = measure(new, event, runs)
+        print(f"image {image_bytes // 1000:>5} KB   print+json.dumps {old_size:>9} B {old_time * 1e6:9.1f} us"
+              f"   log.request {new_size:>6} B {new_time * 1e6:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Profile cache: DynamoDB reads and latency for getPosts-style author lookups
+(a page of posts by Zipf-distributed authors) with the per-container
+cache off, and on.
+
+    cd "Lambda Functions"
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_profiles.py
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_profiles.py --users 5000 --requests 500
+
+Needs boto3 and moto[server], or --endpoint for an emulator already running.
+"""
+import argparse
+import random
+import statistics
+import time
+
+import boto3
+
+from devserver import tables
+from devserver.standin import REGION, configure_environment, start_moto
+
+
+def populate(endpoint, users):
+    session = boto3.session.Session()
+    tables.ensure(session.client("dynamodb", endpoint_url=endpoint, region_name=REGION),
+                  session.client("s3", endpoint_url=endpoint, region_name=REGION), REGION)
+    # The handler modules dataset builds on read the environment at import
+    from devserver import dataset
+    dataset.populate(endpoint, users=users, posts=0, only={"UserDetails"})
+
+
+def run(profiles, pages, users, page_size, seed):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(users)]
+    before = profiles.stats()["dynamodb"]
+    latencies = []
+    for _ in range(pages):
+        authors = [f"user-{i}" for i in rng.choices(range(users), weights=weights, k=page_size)]
+        started = time.perf_counter()
+        profiles.get_many(authors)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return profiles.stats()["dynamodb"] - before, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    endpoint = args.endpoint or start_moto(5007)
+    configure_environment(endpoint)
+    populate(endpoint, args.users)
+
+    from flatchat import profiles
+
+    print(f"{args.requests} pages of {args.page_size} posts, {args.users} authors (Zipf)")
+    for name, seconds in (("no cache", 0), (f"{profiles.LOCAL_SECONDS:g} s local cache", profiles.LOCAL_SECONDS)):
+        profiles.LOCAL_SECONDS = seconds
+        profiles.clear()
+        reads, latencies = run(profiles, args.requests, args.users, args.page_size, seed=46)
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(f"{name:<20} DynamoDB reads/page {reads / args.requests:6.1f}"
+              f"  p50 {quantiles[49]:6.2f} ms  p95 {quantiles[94]:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
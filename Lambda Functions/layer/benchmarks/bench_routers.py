@@ -0,0 +1,152 @@
+"""
+Cold starts with one function per handler against one router function per
+domain (routers/), replaying the same simulated user sessions through a
+simple Lambda container model: a request reuses an idle warm container of
+its function, or starts a new one; containers are reclaimed after
+--idle-minutes without a request.
+
+    cd "Lambda Functions"
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_routers.py
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_routers.py --sessions-per-hour 20 --measure
+
+Without --measure every cold start costs --init-ms. With it, each
+handler's import time is measured in a fresh interpreter (as in
+bench_cold_start.py, so boto3 must be installed). A cold start then costs
+--runtime-ms plus the import of the handler its first request needs; a
+router imports its other handlers later, in the warm process.
+
+In production, the ColdStart metric flatchat.metrics emits per Function
+and Route gives the same numbers for whichever layout is deployed.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+
+from routers.routes import ANY, HANDLERS_DIR, ROUTES, domain_of
+
+# What users do in one visit, from the frontend's pages: (weight, requests)
+JOURNEYS = [
+    (3, [("GET", "/tasks"), ("PUT", "/tasks/{taskID}"), ("GET", "/tasks")]),
+    (1, [("GET", "/tasks"), ("POST", "/tasks"), ("GET", "/tasks")]),
+    (3, [("GET", "/get-posts"), ("GET", "/get-comments/{postID}"), ("POST", "/like-post")]),
+    (1, [("GET", "/get-posts"), ("POST", "/create-post"), ("GET", "/get-posts")]),
+    (1, [("GET", "/get-posts"), ("GET", "/get-comments/{postID}"), ("POST", "/create-comment")]),
+    (2, [("GET", "/bills"), ("GET", "/bills/summary"), ("PUT", "/bills/{id}")]),
+    (1, [("GET", "/bills"), ("POST", "/bills")]),
+    (2, [("GET", "/shopping-lists"), ("PATCH", "/shopping-lists/{id}"), ("PATCH", "/shopping-lists/{id}")]),
+    (2, [("GET", "/reservations"), ("GET", "/reservations/availability"), ("POST", "/reservations")]),
+    (1, [("GET", "/notices"), ("POST", "/notices")]),
+    (1, [("POST", "/read-user"), ("PUT", "/update-user")]),
+    (1, [("GET", "/household-users"), ("POST", "/household-users")]),
+]
+# Every visit starts by loading the profile, household and home page
+OPENING = [("POST", "/read-user"), ("GET", "/household-users"), ("GET", "/tasks"), ("GET", "/get-posts")]
+
+MODULES = {(method, resource): module for method, resource, module in ROUTES}
+
+
+def module_for(method, resource):
+    return MODULES.get((method, resource)) or MODULES[(ANY, resource)]
+
+
+def simulate_requests(hours, sessions_per_hour, think_seconds, seed):
+    """(time in seconds, module) for every request, in time order."""
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in JOURNEYS]
+    requests = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(sessions_per_hour / 3600)
+        if t > hours * 3600:
+            break
+        steps = list(OPENING)
+        for journey in rng.choices([steps for _, steps in JOURNEYS], weights=weights, k=rng.randint(1, 3)):
+            steps.extend(journey)
+        at = t
+        for method, resource in steps:
+            requests.append((at, module_for(method, resource)))
+            at += rng.expovariate(1 / think_seconds)
+    requests.sort()
+    return requests
+
+
+def replay(requests, function_of, idle_seconds, duration_ms, first_cost, later_cost):
+    """
+    Replays requests against per-function container pools. Returns the
+    number of cold starts and the init ms each request waited for.
+    """
+    pools = {}
+    cold_starts = 0
+    added = []
+    for at, module in requests:
+        pool = pools.setdefault(function_of(module), [])
+        pool[:] = [c for c in pool if at - c["last"] < idle_seconds or c["busy"] > at]
+        container = next((c for c in pool if c["busy"] <= at), None)
+        if container is None:
+            cold_starts += 1
+            container = {"loaded": {module}, "busy": at, "last": at}
+            pool.append(container)
+            extra = first_cost(module)
+        elif module not in container["loaded"]:
+            container["loaded"].add(module)
+            extra = later_cost(module)
+        else:
+            extra = 0.0
+        finish = at + (duration_ms + extra) / 1000
+        container["busy"] = container["last"] = finish
+        added.append(extra)
+    return cold_starts, added
+
+
+def measure_imports(runs):
+    sys.path.insert(0, os.path.dirname(__file__))
+    from bench_cold_start import measure
+    modules = sorted({module for _, _, module in ROUTES})
+    return {module: measure(os.path.join(HANDLERS_DIR, f"{module}.py"), runs) for module in modules}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--sessions-per-hour", type=float, default=60)
+    parser.add_argument("--think-seconds", type=float, default=8)
+    parser.add_argument("--idle-minutes", type=float, default=10)
+    parser.add_argument("--duration-ms", type=float, default=80, help="handler time once warm")
+    parser.add_argument("--init-ms", type=float, default=350, help="cold start cost without --measure")
+    parser.add_argument("--measure", action="store_true", help="measure each handler's import time")
+    parser.add_argument("--runtime-ms", type=float, default=150, help="runtime start before imports, with --measure")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=48)
+    args = parser.parse_args()
+
+    requests = simulate_requests(args.hours, args.sessions_per_hour, args.think_seconds, args.seed)
+    if args.measure:
+        imports = measure_imports(args.runs)
+        # The runtime itself starts in both layouts; only handler imports differ
+        first_cost = lambda module: args.runtime_ms + imports[module]
+        later_cost = lambda module: imports[module]
+    else:
+        first_cost = lambda module: args.init_ms
+        later_cost = lambda module: 0.0
+
+    layouts = {
+        "function per handler": lambda module: module,
+        "router per domain": domain_of,
+    }
+    print(f"{len(requests)} requests in {args.hours:g} h, {args.sessions_per_hour:g} sessions/h, "
+          f"containers idle out after {args.idle_minutes:g} min")
+    for name, function_of in layouts.items():
+        cold_starts, added = replay(requests, function_of, args.idle_minutes * 60, args.duration_ms,
+                                    first_cost, later_cost)
+        functions = len({function_of(module) for _, module in requests})
+        slow = sorted(added)
+        p99 = statistics.quantiles(slow, n=100)[98] if len(slow) > 1 else 0.0
+        print(f"{name:<22} {functions:>2} functions  cold starts {cold_starts:>6} "
+              f"({cold_starts / len(requests):6.1%} of requests)  init ms total {sum(added):10.0f}  "
+              f"p99 added {p99:6.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
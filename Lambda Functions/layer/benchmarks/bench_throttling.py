@@ -0,0 +1,94 @@
+"""
+Client settings under throttling: concurrent GetItem calls through the dev
+server's ThrottlingProxy, with botocore's defaults (legacy retries, pool of
+10, 60 s timeouts) against flatchat.aws.CONFIG. Reports latency percentiles,
+calls that still failed after retries and attempts per call. The item
+read is household-0 from devserver.dataset, with its embedded tasks.
+
+    cd "Lambda Functions"
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_throttling.py
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_throttling.py --throttle-rate 0.4 --threads 32 --users 5000
+
+Needs boto3 and moto[server], or --endpoint for an emulator already running.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from devserver import tables
+from devserver.standin import REGION, ThrottlingProxy, configure_environment, start_moto
+from flatchat import aws
+
+TABLE = "Households"
+KEY = {"HouseholdID": {"S": "household-0"}}
+
+
+def populate(endpoint, users):
+    session = boto3.session.Session()
+    tables.ensure(session.client("dynamodb", endpoint_url=endpoint, region_name=REGION),
+                  session.client("s3", endpoint_url=endpoint, region_name=REGION), REGION)
+    # The handler modules dataset builds on read the environment at import
+    from devserver import dataset
+    dataset.populate(endpoint, users=users, posts=0, only={TABLE})
+
+
+def run(config, proxy, requests, threads):
+    client = boto3.client("dynamodb", endpoint_url=proxy.url, region_name=REGION, config=config)
+    client.get_item(TableName=TABLE, Key=KEY)  # connect and load the model
+    proxy.reset_counts()
+
+    def call(_):
+        start = time.perf_counter()
+        try:
+            client.get_item(TableName=TABLE, Key=KEY)
+            failed = False
+        except ClientError:
+            failed = True
+        return (time.perf_counter() - start) * 1000, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(call, range(requests)))
+    wall = time.perf_counter() - started
+    latencies = sorted(ms for ms, _ in results)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "p50": quantiles[49], "p95": quantiles[94], "p99": quantiles[98], "max": latencies[-1],
+        "failed": sum(failed for _, failed in results),
+        "attempts": proxy.requests / requests,
+        "throughput": requests / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint")
+    parser.add_argument("--throttle-rate", type=float, default=0.25)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    upstream = args.endpoint or start_moto(5006)
+    configure_environment(upstream)
+    populate(upstream, args.users)
+    proxy = ThrottlingProxy(upstream, args.throttle_rate).start()
+
+    configs = {
+        "botocore defaults": Config(region_name=REGION),
+        "flatchat.aws.CONFIG": aws.CONFIG,
+    }
+    print(f"{args.requests} GetItem calls, {args.threads} threads, {args.throttle_rate:.0%} throttled")
+    for name, config in configs.items():
+        r = run(config, proxy, args.requests, args.threads)
+        print(f"{name:<22} p50 {r['p50']:7.1f} ms  p95 {r['p95']:7.1f}  p99 {r['p99']:7.1f}  max {r['max']:7.1f}"
+              f"  failed {r['failed']:>4}  attempts/call {r['attempts']:.2f}  {r['throughput']:7.1f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Request validation overhead: json.loads alone against Schema.parse (size
+check, decode and compiled validators) on the bodies the frontend sends,
+plus how quickly an oversized body is turned away and what compiling a
+schema costs at import.
+
+    cd "Lambda Functions"
+    PYTHONPATH=layer/python:. python layer/benchmarks/bench_validation.py
+
+Imports the handlers for their schemas, so needs boto3 (no AWS calls are made).
+"""
+import json
+import timeit
+
+import bills_handler
+import reservations
+import shopping_list
+import update_user
+from flatchat.validation import ValidationError
+
+
+def event(method, resource, body):
+    return {"httpMethod": method, "resource": resource, "body": json.dumps(body)}
+
+
+CASES = [
+    ("update-user", update_user.USER_UPDATE, event("PUT", "/update-user", {
+        "UserID": "user-1", "Name": "Aoife", "Email": "aoife@example.com", "College": "UCC",
+        "AreaOfStudy": "Computer Science", "CreatedAt": "2025-01-01T00:00:00Z", "DoNotDisturb": False,
+        "HouseholdID": "household-1", "Latitude": 51.8985, "Longitude": -8.4756,
+    })),
+    ("bill, 6 splits", bills_handler.BILL_CREATE, event("POST", "/bills", {
+        "HouseholdID": "household-1", "Title": "Electricity", "Description": "March", "TotalAmount": "120.00",
+        "DueBy": "2025-03-31", "Members": [f"user-{i}" for i in range(6)],
+        "Splits": [{"UserID": f"user-{i}", "Share": 20, "Paid": False} for i in range(6)],
+    })),
+    ("reservation, weekly", reservations.REQUEST_SCHEMAS[("POST", "/reservations")], event("POST", "/reservations", {
+        "HouseholdID": "household-1", "SpaceName": "Kitchen", "ReservedBy": "user-1", "Purpose": "Dinner",
+        "StartTime": "2025-03-01T18:00", "EndTime": "2025-03-01T20:00", "ApprovalStatus": "Pending",
+        "Approvers": [], "Recurrence": {"Frequency": "WEEKLY", "Interval": 1},
+    })),
+    ("shopping list, 100 products", shopping_list.LIST_WRITE, event("POST", "/shopping-lists", {
+        "HouseholdID": "household-1", "Title": "Weekly shop",
+        "Products": [{"ProductID": f"p-{i}", "Name": f"Product {i}", "Purchased": bool(i % 3), "Quantity": i % 5 + 1,
+                      "addedBy": "Aoife"} for i in range(100)],
+    })),
+]
+
+
+def per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main():
+    print(f"{'body':<30}{'bytes':>8}{'json.loads':>14}{'Schema.parse':>16}{'overhead':>12}")
+    for name, schema, request in CASES:
+        number = 2000
+        loads = per_call(lambda: json.loads(request["body"]), number)
+        parse = per_call(lambda: schema.parse(request), number)
+        print(f"{name:<30}{len(request['body']):>8}{loads * 1e6:>11.1f} µs{parse * 1e6:>13.1f} µs"
+              f"{(parse - loads) * 1e6:>9.1f} µs")
+
+    oversized = event("POST", "/bills", {"Title": "x", "ImageData": "A" * (7 * 1024 * 1024)})
+
+    def reject():
+        try:
+            bills_handler.BILL_CREATE.parse(oversized)
+        except ValidationError:
+            pass
+    print(f"\n7 MB bill body rejected in {per_call(reject, 200) * 1e6:.1f} µs "
+          f"(json.loads alone takes {per_call(lambda: json.loads(oversized['body']), 20) * 1e3:.1f} ms)")
+
+    compile_bill = per_call(lambda: bills_handler.BILL_UPDATE.extend(required=("Title",)), 2000)
+    print(f"compiling the bill schema: {compile_bill * 1e6:.1f} µs once per container")
+
+
+if __name__ == "__main__":
+    main()
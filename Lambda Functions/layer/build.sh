@@ -0,0 +1,13 @@
+#!/bin/sh
+# Builds flatchat-runtime.zip for `aws lambda publish-layer-version`.
+# orjson is a compiled wheel, so fetch the one matching the Lambda runtime.
+set -e
+cd "$(dirname "$0")"
+rm -rf build flatchat-runtime.zip
+mkdir -p build/python
+cp -r python/flatchat build/python/
+pip install -r requirements.txt -t build/python \
+    --platform manylinux2014_x86_64 --only-binary=:all: --python-version 3.11
+(cd build && zip -qr ../flatchat-runtime.zip python -x '*/__pycache__/*')
+rm -rf build
+echo "Built $(pwd)/flatchat-runtime.zip"
@@ -0,0 +1,5 @@
+"""
+Shared runtime for the Flatchat Lambda handlers, deployed as a Lambda
+layer (this directory's parent is the layer's python/ root, so handlers
+simply `from flatchat.http import respond`).
+"""
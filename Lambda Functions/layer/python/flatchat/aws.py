@@ -0,0 +1,128 @@
+"""
+Shared, lazily created AWS clients and resources.
+
+Handlers declare their tables and clients at module level as before, but
+get proxies back: nothing touches botocore until the first attribute
+access, and every handler in the container shares one session, one
+botocore Config and one client per (service, region). A code path that
+never reaches S3 or Amazon Location never pays for loading their models.
+"""
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+from flatchat import metrics
+
+REGION = os.environ.get("AWS_REGION") or os.environ.get("AWS_DEFAULT_REGION")
+
+
+def _env_number(name, default):
+    return type(default)(os.environ.get(name, default))
+
+
+# One botocore Config for every client in the container:
+# - the pool is sized for thread fan-out; botocore's default of 10 makes
+#   parallel reads queue on connections
+# - keep-alive stops idle pooled connections from being dropped between
+#   invocations of a warm container
+# - adaptive retries rate-limit the client once DynamoDB starts throttling,
+#   instead of legacy mode's fixed backoff schedule against a busy table
+# - timeouts bound a stuck call well inside API Gateway's 29 s limit
+CONFIG = Config(
+    region_name=REGION,
+    max_pool_connections=_env_number("AWS_MAX_POOL_CONNECTIONS", 32),
+    tcp_keepalive=True,
+    retries={"mode": "adaptive", "max_attempts": _env_number("AWS_MAX_ATTEMPTS", 4)},
+    connect_timeout=_env_number("AWS_CONNECT_TIMEOUT", 2.0),
+    read_timeout=_env_number("AWS_READ_TIMEOUT", 5.0),
+)
+
+# Per-service adjustments merged over CONFIG: S3 part uploads of several
+# MB need longer reads than a DynamoDB call should ever take.
+SERVICE_CONFIG = {
+    "s3": Config(read_timeout=_env_number("AWS_S3_READ_TIMEOUT", 30.0)),
+}
+
+_lock = threading.RLock()
+_session = None
+_clients = {}
+_resources = {}
+
+
+class _Lazy:
+    """Stands in for a boto3 object and builds it on first use."""
+
+    __slots__ = ("_factory", "_target")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+
+    def __getattr__(self, name):
+        target = self._target
+        if target is None:
+            target = self._target = self._factory()
+        return getattr(target, name)
+
+
+def session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = boto3.session.Session()
+                metrics.install(_session)
+    return _session
+
+
+def _cached(cache, key, build):
+    found = cache.get(key)
+    if found is None:
+        with _lock:
+            found = cache.get(key)
+            if found is None:
+                found = cache[key] = build()
+    return found
+
+
+def endpoint_url(service):
+    """
+    AWS_ENDPOINT_URL_<SERVICE> or AWS_ENDPOINT_URL, for pointing handlers at
+    a local stand-in such as DynamoDB Local. Read here rather than left to
+    botocore so older runtimes honour it too.
+    """
+    return (os.environ.get(f"AWS_ENDPOINT_URL_{service.upper()}")
+            or os.environ.get("AWS_ENDPOINT_URL"))
+
+
+def config_for(service):
+    override = SERVICE_CONFIG.get(service)
+    return CONFIG.merge(override) if override else CONFIG
+
+
+def get_client(service, region_name=None):
+    """The container's client for `service`, created on first call."""
+    return _cached(_clients, (service, region_name), lambda: session().client(
+        service, region_name=region_name, endpoint_url=endpoint_url(service),
+        config=config_for(service)))
+
+
+def get_resource(service, region_name=None):
+    """The container's resource for `service`, created on first call."""
+    return _cached(_resources, (service, region_name), lambda: session().resource(
+        service, region_name=region_name, endpoint_url=endpoint_url(service),
+        config=config_for(service)))
+
+
+def client(service, region_name=None):
+    return _Lazy(lambda: get_client(service, region_name))
+
+
+def resource(service, region_name=None):
+    return _Lazy(lambda: get_resource(service, region_name))
+
+
+def table(name, region_name=None):
+    return _Lazy(lambda: get_resource("dynamodb", region_name).Table(name))
@@ -0,0 +1,42 @@
+"""
+Single-pass JSON encoding for DynamoDB items.
+
+boto3 returns numbers as Decimal and string/number sets as Python sets.
+Rather than deep-copying an item to convert them before json.dumps, the
+encoder converts them as it meets them. orjson is used when the layer
+ships it; the standard library is the fallback.
+"""
+import json
+import base64
+from decimal import Decimal
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the layer build
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+
+def encode_default(obj):
+    """Converts the non-JSON types found in DynamoDB items and our handlers."""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj) if all(isinstance(v, str) for v in obj) else list(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode("ascii")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson:
+    def dumps(obj):
+        return orjson.dumps(obj, default=encode_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+else:
+    _encoder = json.JSONEncoder(default=encode_default, separators=(",", ":"))
+
+    def dumps(obj):
+        return _encoder.encode(obj)
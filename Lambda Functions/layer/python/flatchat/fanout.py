@@ -0,0 +1,85 @@
+"""
+Runs independent AWS calls side by side on a per-container thread pool.
+
+    results = fanout.run({
+        "household": lambda: households_table.update_item(...),
+        "user": lambda: users_table.update_item(...),
+    }, timeout=3)
+    results["household"]
+
+Every call starts at once, so a handler waits for the slowest call rather
+than the sum of them. The clients from flatchat.aws are thread-safe, and
+their connection pool (AWS_MAX_POOL_CONNECTIONS) is sized for this, so
+parallel calls reuse pooled connections instead of opening new ones.
+
+run() always waits for every call to finish or overrun its timeout, then
+raises FanOutError if any of them failed. The error holds each failure by
+name, and the results of the calls that succeeded. A call that overruns is
+reported as a CallTimeout. It cannot be stopped and keeps running in the
+background, bounded by the client's own read timeout. Only use fan-out for
+calls that are safe if they finish late. Calls made from inside a fanned-out
+call run one after another, so the pool cannot deadlock on itself.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+MAX_WORKERS = int(os.environ.get("FANOUT_MAX_WORKERS", "16"))
+
+_lock = threading.Lock()
+_pool = None
+_worker = threading.local()
+
+
+class CallTimeout(Exception):
+    pass
+
+
+class FanOutError(Exception):
+    def __init__(self, errors, results):
+        super().__init__("; ".join(f"{name}: {error}" for name, error in errors.items()))
+        self.errors = errors
+        self.results = results
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fanout",
+                                           initializer=setattr, initargs=(_worker, "active", True))
+    return _pool
+
+
+def run(calls, timeout=None, timeouts=None):
+    """
+    Runs {name: callable} concurrently and returns {name: result}. `timeout`
+    is the default limit in seconds for each call; `timeouts` overrides it
+    per name. Raises FanOutError if any call raised or timed out.
+    """
+    timeouts = timeouts or {}
+    results = {}
+    errors = {}
+    if getattr(_worker, "active", False) or len(calls) < 2:
+        for name, call in calls.items():
+            try:
+                results[name] = call()
+            except Exception as e:
+                errors[name] = e
+    else:
+        started = time.monotonic()
+        futures = {name: _executor().submit(call) for name, call in calls.items()}
+        for name, future in futures.items():
+            limit = timeouts.get(name, timeout)
+            remaining = None if limit is None else max(0.0, started + limit - time.monotonic())
+            try:
+                results[name] = future.result(timeout=remaining)
+            except TimeoutError:
+                errors[name] = CallTimeout(f"no result after {limit} s")
+            except Exception as e:
+                errors[name] = e
+    if errors:
+        raise FanOutError(errors, results)
+    return results
@@ -0,0 +1,59 @@
+"""API Gateway proxy responses with one set of CORS headers for every handler."""
+from email.utils import formatdate, parsedate_to_datetime
+
+from flatchat.encoding import dumps
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,Authorization,Idempotency-Key,If-None-Match,If-Modified-Since",
+    "Access-Control-Allow-Methods": "OPTIONS,GET,POST,PUT,PATCH,DELETE",
+    "Access-Control-Expose-Headers": "ETag,Last-Modified,Idempotent-Replayed,Retry-After",
+}
+
+
+def respond(status_code, body, headers=None):
+    """
+    Builds a proxy response. `body` is JSON-encoded in one pass (Decimals
+    and sets included); None gives an empty body, as for 304s and
+    preflights. `headers` are added to the standard ones.
+    """
+    response_headers = {"Content-Type": "application/json", **CORS_HEADERS}
+    if headers:
+        response_headers.update(headers)
+    return {
+        "statusCode": status_code,
+        "headers": response_headers,
+        "body": "" if body is None else dumps(body),
+    }
+
+
+def preflight():
+    return respond(200, None)
+
+
+def validator_headers(etag, last_modified):
+    """
+    ETag/Last-Modified for a conditional GET. Cache-Control: no-cache makes
+    clients revalidate, which is what turns polling into 304s.
+    """
+    return {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+
+
+def not_modified(event, etag, last_modified):
+    """If-None-Match takes precedence over If-Modified-Since, as in RFC 9110."""
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    if_none_match = headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
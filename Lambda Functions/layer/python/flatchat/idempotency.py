@@ -0,0 +1,165 @@
+"""
+Idempotency-Key support for create endpoints.
+
+    @metrics.invocation
+    @idempotency.idempotent(routes={("POST", "/bills")})
+    def lambda_handler(event, context):
+        ...
+
+A request carrying an Idempotency-Key header first claims the key in the
+IdempotencyKeys table with a conditional put. The first request runs the
+handler and stores its response against the key; a retry with the same
+key and request gets that stored response back (with Idempotent-Replayed:
+true) without the handler running again, so nothing is written twice.
+
+- the same key with a different body, query string or path parameters
+  is a client bug: 422
+- a retry that arrives while the first attempt is still running: 409,
+  with Retry-After
+- 5xx responses and exceptions release the key, so the retry runs again
+- records expire through the table's TTL on ExpiresAt
+
+Requests without the header, and routes not listed in `routes`, pass
+straight through. Keys are scoped to the function and route.
+
+Settings (environment):
+    IDEMPOTENCY_TABLE            table name (default IdempotencyKeys)
+    IDEMPOTENCY_TTL_SECONDS      how long a response is replayed (default 24 h)
+    IDEMPOTENCY_LOCK_SECONDS     how long an unfinished claim blocks retries (default 60)
+"""
+import functools
+import hashlib
+import json
+import os
+import time
+
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+
+from flatchat import aws, log
+from flatchat.encoding import dumps
+from flatchat.http import respond
+
+TABLE_NAME = os.environ.get("IDEMPOTENCY_TABLE", "IdempotencyKeys")
+TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+LOCK_SECONDS = int(os.environ.get("IDEMPOTENCY_LOCK_SECONDS", "60"))
+MAX_KEY_LENGTH = 255
+# Stay well inside DynamoDB's 400 KB item limit
+MAX_RESPONSE_BYTES = 350 * 1024
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+
+table = aws.table(TABLE_NAME)
+_deserializer = TypeDeserializer()
+
+
+def _header(event, name):
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _fingerprint(event):
+    # The query string counts too: /bills/import takes its HouseholdID there
+    digest = hashlib.sha256((event.get("body") or "").encode("utf-8"))
+    for params in ("queryStringParameters", "pathParameters"):
+        digest.update(b"\0" + json.dumps(event.get(params) or {}, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _claim(record_key, fingerprint):
+    """Claims the key; returns None if it is ours, else the record already holding it."""
+    now = int(time.time())
+    try:
+        table.put_item(
+            Item={"IdempotencyKey": record_key, "Status": IN_PROGRESS,
+                  "Fingerprint": fingerprint, "ExpiresAt": now + LOCK_SECONDS},
+            ConditionExpression="attribute_not_exists(IdempotencyKey) OR ExpiresAt < :now",
+            ExpressionAttributeValues={":now": now},
+            ReturnValuesOnConditionCheckFailure="ALL_OLD",
+        )
+        return None
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+            raise
+        item = e.response.get("Item") or {}
+        return {key: _deserializer.deserialize(value) for key, value in item.items()}
+
+
+def _complete(record_key, fingerprint, response):
+    stored = dumps(response)
+    if len(stored) > MAX_RESPONSE_BYTES:
+        log.warning("response too large to store for idempotency", bytes=len(stored))
+        _release(record_key)
+        return
+    try:
+        table.put_item(Item={
+            "IdempotencyKey": record_key, "Status": COMPLETED, "Fingerprint": fingerprint,
+            "Response": stored, "ExpiresAt": int(time.time()) + TTL_SECONDS,
+        })
+    except ClientError as e:
+        # The write already happened; the claim blocks retries until it expires
+        log.warning("storing idempotent response failed", error=str(e))
+
+
+def _release(record_key):
+    try:
+        table.delete_item(Key={"IdempotencyKey": record_key})
+    except ClientError as e:
+        log.warning("releasing idempotency key failed", error=str(e))
+
+
+def _replay(record, fingerprint):
+    if record.get("Fingerprint") != fingerprint:
+        return respond(422, {"message": "Idempotency-Key was already used for a different request"})
+    if record.get("Status") != COMPLETED:
+        return respond(409, {"message": "A request with this Idempotency-Key is still in progress"},
+                       headers={"Retry-After": "1"})
+    response = json.loads(record["Response"])
+    response["headers"] = {**(response.get("headers") or {}), "Idempotent-Replayed": "true"}
+    return response
+
+
+def idempotent(routes=None):
+    """
+    Decorates a lambda_handler. `routes` is a set of (httpMethod, resource)
+    pairs to cover; None covers every request that sends the header.
+    """
+    def decorate(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            key = _header(event, "idempotency-key")
+            route = (event.get("httpMethod"), event.get("resource"))
+            if not key or (routes is not None and route not in routes):
+                return handler(event, context)
+
+            if len(key) > MAX_KEY_LENGTH:
+                log.request(event, context)
+                return respond(400, {"message": f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"})
+
+            function_name = (getattr(context, "function_name", None)
+                             or os.environ.get("AWS_LAMBDA_FUNCTION_NAME") or handler.__module__)
+            record_key = f"{function_name}#{route[0]} {route[1]}#{key}"
+            fingerprint = _fingerprint(event)
+
+            record = _claim(record_key, fingerprint)
+            if record is not None:
+                log.request(event, context)
+                log.info("idempotent replay", status=record.get("Status"))
+                return _replay(record, fingerprint)
+
+            try:
+                response = handler(event, context)
+            except Exception:
+                _release(record_key)
+                raise
+            if isinstance(response, dict) and response.get("statusCode", 500) < 500:
+                _complete(record_key, fingerprint, response)
+            else:
+                _release(record_key)
+            return response
+
+        return wrapper
+    return decorate
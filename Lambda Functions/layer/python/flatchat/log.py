@@ -0,0 +1,137 @@
+"""
+Structured, sampled logging for the handlers.
+
+Each record is one JSON line on stdout, which CloudWatch ingests as-is:
+
+    {"level": "INFO", "msg": "request", "requestId": "...", "method": "GET", ...}
+
+log.request(event, context) starts an invocation. It logs a summary of the
+API Gateway event (method, route, body size) instead of the event itself
+and draws the sampling decision for the whole request, so a sampled request
+keeps all of its lines. The full event is only dumped at DEBUG, with
+credentials and image payloads redacted and long strings truncated.
+
+Settings (environment):
+    LOG_LEVEL          DEBUG, INFO (default), WARNING or ERROR
+    LOG_SAMPLE_RATES   per-level fractions, e.g. "DEBUG=0.05,INFO=0.2";
+                       unlisted levels are always logged
+    LOG_MAX_CHARS      longest string kept in a record (default 256)
+"""
+import os
+import random
+import time
+
+from flatchat.encoding import dumps
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+REDACTED_FIELDS = frozenset({
+    "authorization", "cookie", "password", "token", "idtoken", "accesstoken",
+    "image", "imagedata",
+})
+MAX_ITEMS = 20
+MAX_DEPTH = 6
+
+
+def _sample_rates(text):
+    rates = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        level, _, rate = part.partition("=")
+        try:
+            rates[level.strip().upper()] = float(rate)
+        except ValueError:
+            pass
+    return rates
+
+
+LEVEL = LEVELS.get(os.environ.get("LOG_LEVEL", "INFO").upper(), LEVELS["INFO"])
+SAMPLE_RATES = _sample_rates(os.environ.get("LOG_SAMPLE_RATES", ""))
+MAX_CHARS = int(os.environ.get("LOG_MAX_CHARS", "256"))
+
+# Per-invocation state; Lambda runs one invocation per container at a time
+_request = {"requestId": None, "draw": 0.0, "start": None}
+
+
+def enabled(level):
+    """Whether a record at `level` would be written for the current request."""
+    if LEVELS[level] < LEVEL:
+        return False
+    return _request["draw"] < SAMPLE_RATES.get(level, 1.0)
+
+
+def scrub(value, depth=0):
+    """Redacts sensitive keys and bounds strings, lists and nesting for logging."""
+    if isinstance(value, str):
+        if len(value) > MAX_CHARS:
+            return f"{value[:MAX_CHARS]}...(+{len(value) - MAX_CHARS} chars)"
+        return value
+    if depth >= MAX_DEPTH:
+        return "..."
+    if isinstance(value, dict):
+        return {
+            k: "[redacted]" if str(k).lower() in REDACTED_FIELDS else scrub(v, depth + 1)
+            for k, v in list(value.items())[:MAX_ITEMS]
+        }
+    if isinstance(value, (list, tuple, set)):
+        items = [scrub(v, depth + 1) for v in list(value)[:MAX_ITEMS]]
+        if len(value) > MAX_ITEMS:
+            items.append(f"...(+{len(value) - MAX_ITEMS} items)")
+        return items
+    return value
+
+
+def _write(level, message, fields):
+    record = {"level": level, "msg": message}
+    if _request["requestId"]:
+        record["requestId"] = _request["requestId"]
+    if fields:
+        record.update(scrub(fields))
+    print(dumps(record))
+
+
+def debug(message, **fields):
+    if enabled("DEBUG"):
+        _write("DEBUG", message, fields)
+
+
+def info(message, **fields):
+    if enabled("INFO"):
+        _write("INFO", message, fields)
+
+
+def warning(message, **fields):
+    if enabled("WARNING"):
+        _write("WARNING", message, fields)
+
+
+def error(message, **fields):
+    if enabled("ERROR"):
+        _write("ERROR", message, fields)
+
+
+def request(event, context=None):
+    """Starts an invocation: draws its sample and logs an event summary."""
+    request_context = event.get("requestContext") or {}
+    _request["requestId"] = (
+        getattr(context, "aws_request_id", None) or request_context.get("requestId")
+    )
+    _request["draw"] = random.random()
+    _request["start"] = time.perf_counter()
+    if enabled("INFO"):
+        body = event.get("body")
+        _write("INFO", "request", {
+            "method": event.get("httpMethod"),
+            "resource": event.get("resource") or event.get("path"),
+            "pathParameters": event.get("pathParameters"),
+            "query": sorted((event.get("queryStringParameters") or {}).keys()),
+            "bodyBytes": len(body) if isinstance(body, str) else 0,
+        })
+    if enabled("DEBUG"):
+        _write("DEBUG", "event", {"event": event})
+
+
+def elapsed_ms():
+    """Milliseconds since log.request() for the current invocation."""
+    if _request["start"] is None:
+        return None
+    return round((time.perf_counter() - _request["start"]) * 1000, 1)
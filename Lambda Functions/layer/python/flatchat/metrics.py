@@ -0,0 +1,189 @@
+"""
+Per-invocation DynamoDB accounting, emitted as CloudWatch embedded metrics.
+
+install() hooks botocore's event system on the shared session, so every
+table, resource and client from flatchat.aws is covered without touching
+call sites. Each call records its operation, latency, items scanned versus
+returned and ConsumedCapacity (requested with ReturnConsumedCapacity=TOTAL
+unless the caller asked for more). @invocation wraps a lambda_handler and
+writes one EMF line when it returns:
+
+    {"_aws": {...}, "Function": "getPosts", "Route": "GET /get-posts",
+     "DynamoDBCalls": 2, "DynamoDBLatency": 41.7, "ConsumedCapacity": 128.5,
+     "ItemsScanned": 1020, "ItemsReturned": 1020, "Scans": 1, "ColdStart": 0, ...}
+
+CloudWatch turns the metric fields into metrics under METRICS_NAMESPACE
+(dimensions Function and Route); the per-operation breakdown stays in the
+log line for Logs Insights. Set DYNAMODB_METRICS=0 to switch it off.
+"""
+import functools
+import os
+import threading
+import time
+
+from flatchat.encoding import dumps
+
+NAMESPACE = os.environ.get("METRICS_NAMESPACE", "Flatchat")
+ENABLED = os.environ.get("DYNAMODB_METRICS", "1") != "0"
+
+CAPACITY_OPERATIONS = frozenset({
+    "GetItem", "PutItem", "UpdateItem", "DeleteItem", "Query", "Scan",
+    "BatchGetItem", "BatchWriteItem", "TransactGetItems", "TransactWriteItems",
+})
+
+METRICS = [
+    ("DynamoDBCalls", "Count"),
+    ("DynamoDBLatency", "Milliseconds"),
+    ("ConsumedCapacity", "Count"),
+    ("ItemsScanned", "Count"),
+    ("ItemsReturned", "Count"),
+    ("Scans", "Count"),
+    ("Duration", "Milliseconds"),
+    ("ColdStart", "Count"),
+]
+
+_lock = threading.Lock()
+_operations = {}
+# The first invocation in this process is the container's cold start
+_cold_start = True
+
+
+def _table_names(params):
+    if "TableName" in params:
+        return [params["TableName"]]
+    if "RequestItems" in params:
+        return sorted(params["RequestItems"])
+    if "TransactItems" in params:
+        return sorted({
+            action["TableName"] for item in params["TransactItems"] for action in item.values()
+        })
+    return []
+
+
+def _capacity_units(parsed):
+    consumed = parsed.get("ConsumedCapacity")
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(float(c.get("CapacityUnits", 0)) for c in consumed or [])
+
+
+def _items_returned(parsed):
+    if "Count" in parsed:
+        return parsed["Count"]
+    if "Items" in parsed:
+        return len(parsed["Items"])
+    responses = parsed.get("Responses")
+    if isinstance(responses, dict):
+        return sum(len(items) for items in responses.values())
+    if isinstance(responses, list):
+        return sum(1 for response in responses if response.get("Item"))
+    return 1 if parsed.get("Item") else 0
+
+
+def _request_capacity(params, model, context, **kwargs):
+    # Only this hook sees the API parameters; before-call gets the serialised request
+    context["flatchat_tables"] = _table_names(params)
+    if model.name in CAPACITY_OPERATIONS and "ReturnConsumedCapacity" not in params:
+        params["ReturnConsumedCapacity"] = "TOTAL"
+
+
+def _before_call(model, params, context, **kwargs):
+    context["flatchat_started"] = time.perf_counter()
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    started = context.get("flatchat_started")
+    if started is None:
+        return
+    elapsed = (time.perf_counter() - started) * 1000
+    returned = _items_returned(parsed)
+    scanned = parsed.get("ScannedCount", returned)
+    with _lock:
+        entry = _operations.setdefault(model.name, {
+            "calls": 0, "ms": 0.0, "maxMs": 0.0, "scanned": 0, "returned": 0,
+            "capacity": 0.0, "errors": 0, "tables": set(),
+        })
+        entry["calls"] += 1
+        entry["ms"] += elapsed
+        entry["maxMs"] = max(entry["maxMs"], elapsed)
+        entry["scanned"] += int(scanned)
+        entry["returned"] += int(returned)
+        entry["capacity"] += _capacity_units(parsed)
+        entry["errors"] += 1 if "Error" in parsed else 0
+        entry["tables"].update(context.get("flatchat_tables", ()))
+
+
+def install(session):
+    """Registers the DynamoDB hooks on a boto3 session (done by flatchat.aws)."""
+    if not ENABLED:
+        return
+    session.events.register("provide-client-params.dynamodb", _request_capacity)
+    session.events.register("before-call.dynamodb", _before_call)
+    session.events.register("after-call.dynamodb", _after_call)
+
+
+def _reset():
+    with _lock:
+        _operations.clear()
+
+
+def emit(function_name, route, duration_ms, status_code=None, cold_start=False):
+    """Writes the EMF line for the invocation and clears the counters."""
+    with _lock:
+        operations = {
+            name: {**entry, "ms": round(entry["ms"], 1), "maxMs": round(entry["maxMs"], 1),
+                   "tables": sorted(entry["tables"])}
+            for name, entry in _operations.items()
+        }
+        _operations.clear()
+    totals = {
+        "DynamoDBCalls": sum(e["calls"] for e in operations.values()),
+        "DynamoDBLatency": round(sum(e["ms"] for e in operations.values()), 1),
+        "ConsumedCapacity": round(sum(e["capacity"] for e in operations.values()), 2),
+        "ItemsScanned": sum(e["scanned"] for e in operations.values()),
+        "ItemsReturned": sum(e["returned"] for e in operations.values()),
+        "Scans": operations.get("Scan", {}).get("calls", 0),
+        "Duration": round(duration_ms, 1),
+        "ColdStart": 1 if cold_start else 0,
+    }
+    print(dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": [["Function", "Route"]],
+                "Metrics": [{"Name": name, "Unit": unit} for name, unit in METRICS],
+            }],
+        },
+        "Function": function_name,
+        "Route": route,
+        "StatusCode": status_code,
+        **totals,
+        "DynamoDBOperations": operations,
+    }))
+
+
+def invocation(handler):
+    """Decorates a lambda_handler so each invocation emits its DynamoDB metrics."""
+    if not ENABLED:
+        return handler
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        global _cold_start
+        _reset()
+        cold_start, _cold_start = _cold_start, False
+        started = time.perf_counter()
+        status_code = None
+        try:
+            response = handler(event, context)
+            if isinstance(response, dict):
+                status_code = response.get("statusCode")
+            return response
+        finally:
+            function_name = (getattr(context, "function_name", None)
+                             or os.environ.get("AWS_LAMBDA_FUNCTION_NAME") or handler.__module__)
+            route = f'{event.get("httpMethod", "-")} {event.get("resource") or event.get("path") or "-"}'
+            emit(function_name, route, (time.perf_counter() - started) * 1000, status_code, cold_start)
+
+    return wrapper
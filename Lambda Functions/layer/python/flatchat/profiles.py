@@ -0,0 +1,219 @@
+"""
+Read-through cache for UserDetails items.
+
+    profile = profiles.get(user_id)              # item or None
+    found = profiles.get_many(author_ids)        # {UserID: item}, misses left out
+    profiles.invalidate(user_id)                 # after any write to the user
+    profiles.get(user_id, fresh=True)            # straight from DynamoDB
+
+Reads go to a per-container LRU first, then to an optional shared tier,
+and only then to DynamoDB (BatchGetItem for get_many); whatever DynamoDB
+returns is written back to both tiers. Cached items are shared between
+callers, so copy one before changing it. Every handler that writes a
+UserDetails item calls invalidate() (or store() with the new item), which
+clears this container's LRU and the shared tier. Other warm containers
+keep their local copy until PROFILE_CACHE_SECONDS runs out, so that TTL
+bounds how stale a profile can be anywhere; the shared tier is kept for
+PROFILE_SHARED_CACHE_SECONDS and is always invalidated on write.
+
+Cached reads are only for display names (post authors, comment authors).
+Reads whose answer must reflect a write that may have just happened in
+another function, such as read-user right after creating a household or
+the membership check in get_household_users, pass fresh=True: they go to
+DynamoDB and refresh both tiers with what they read.
+
+The shared tier is pluggable: set PROFILE_CACHE_URL=redis://... to use
+Redis (needs the redis package in the layer), or pass any object with
+get_many / set_many / delete to configure(). Shared tier errors are logged
+and the read falls through to DynamoDB.
+
+Settings (environment):
+    PROFILE_CACHE_SECONDS          local LRU TTL (default 30, 0 disables)
+    PROFILE_CACHE_SIZE             local LRU entries (default 2048)
+    PROFILE_SHARED_CACHE_SECONDS   shared tier TTL (default 300)
+    PROFILE_CACHE_URL              redis:// URL of the shared tier
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+from flatchat import aws, log
+from flatchat.encoding import dumps
+
+TABLE_NAME = os.environ.get("USER_DETAILS_TABLE", "UserDetails")
+LOCAL_SECONDS = float(os.environ.get("PROFILE_CACHE_SECONDS", "30"))
+LOCAL_SIZE = int(os.environ.get("PROFILE_CACHE_SIZE", "2048"))
+SHARED_SECONDS = int(os.environ.get("PROFILE_SHARED_CACHE_SECONDS", "300"))
+BATCH_GET_SIZE = 100
+BATCH_GET_MAX_ATTEMPTS = 4
+
+dynamodb = aws.resource("dynamodb")
+table = aws.table(TABLE_NAME)
+
+_lock = threading.Lock()
+_local = OrderedDict()
+_shared = None
+_stats = {"local": 0, "shared": 0, "dynamodb": 0}
+
+
+class RedisTier:
+    """Shared tier on Redis; keys are "profile:<UserID>", values the item as JSON."""
+
+    prefix = "profile:"
+
+    def __init__(self, url):
+        import redis  # optional: only needed when PROFILE_CACHE_URL is set
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+
+    def get_many(self, user_ids):
+        values = self.client.mget([self.prefix + user_id for user_id in user_ids])
+        return {
+            user_id: json.loads(value, parse_float=Decimal)
+            for user_id, value in zip(user_ids, values) if value is not None
+        }
+
+    def set_many(self, items, ttl):
+        pipeline = self.client.pipeline(transaction=False)
+        for user_id, item in items.items():
+            pipeline.set(self.prefix + user_id, dumps(item), ex=ttl)
+        pipeline.execute()
+
+    def delete(self, user_ids):
+        self.client.delete(*(self.prefix + user_id for user_id in user_ids))
+
+
+def configure(shared=None):
+    """Sets the shared tier (None for local only) and clears the local cache."""
+    global _shared
+    _shared = shared
+    clear()
+
+
+def clear():
+    with _lock:
+        _local.clear()
+
+
+def stats():
+    """Where reads were served from since the container started."""
+    return dict(_stats)
+
+
+def _local_get(user_ids):
+    found = {}
+    if LOCAL_SECONDS <= 0:
+        return found
+    now = time.monotonic()
+    with _lock:
+        for user_id in user_ids:
+            cached = _local.get(user_id)
+            if cached and now - cached[0] < LOCAL_SECONDS:
+                _local.move_to_end(user_id)
+                found[user_id] = cached[1]
+    return found
+
+
+def _local_put(items):
+    if LOCAL_SECONDS <= 0:
+        return
+    now = time.monotonic()
+    with _lock:
+        for user_id, item in items.items():
+            _local[user_id] = (now, item)
+            _local.move_to_end(user_id)
+        while len(_local) > LOCAL_SIZE:
+            _local.popitem(last=False)
+
+
+def _shared_call(action, *args):
+    if _shared is None:
+        return None
+    try:
+        return getattr(_shared, action)(*args)
+    except Exception as e:
+        log.warning("profile cache unavailable", action=action, error=str(e))
+        return None
+
+
+def _batch_get(user_ids):
+    found = {}
+    pending = [{"UserID": user_id} for user_id in user_ids]
+    for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+        if not pending:
+            break
+        if attempt:
+            time.sleep(0.05 * (2 ** attempt))
+        unprocessed = []
+        for start in range(0, len(pending), BATCH_GET_SIZE):
+            result = dynamodb.batch_get_item(RequestItems={TABLE_NAME: {"Keys": pending[start:start + BATCH_GET_SIZE]}})
+            for item in result.get("Responses", {}).get(TABLE_NAME, []):
+                found[item["UserID"]] = item
+            unprocessed.extend(result.get("UnprocessedKeys", {}).get(TABLE_NAME, {}).get("Keys", []))
+        pending = unprocessed
+    if pending:
+        log.warning("profiles left unread", count=len(pending))
+    return found
+
+
+def get_many(user_ids, fresh=False):
+    """
+    UserDetails items for `user_ids` as {UserID: item}; unknown users are
+    left out. fresh=True skips both cache tiers for the read.
+    """
+    wanted = list(dict.fromkeys(user_id for user_id in user_ids if user_id))
+    found = {} if fresh else _local_get(wanted)
+    _stats["local"] += len(found)
+
+    missing = [user_id for user_id in wanted if user_id not in found]
+    if missing and not fresh:
+        shared = _shared_call("get_many", missing) or {}
+        if shared:
+            _stats["shared"] += len(shared)
+            _local_put(shared)
+            found.update(shared)
+            missing = [user_id for user_id in missing if user_id not in shared]
+
+    if missing:
+        if len(missing) == 1:
+            item = table.get_item(Key={"UserID": missing[0]}).get("Item")
+            loaded = {missing[0]: item} if item else {}
+        else:
+            loaded = _batch_get(missing)
+        _stats["dynamodb"] += len(missing)
+        if loaded:
+            _local_put(loaded)
+            _shared_call("set_many", loaded, SHARED_SECONDS)
+            found.update(loaded)
+    return found
+
+
+def get(user_id, fresh=False):
+    """The UserDetails item for `user_id`, or None."""
+    return get_many([user_id], fresh=fresh).get(user_id)
+
+
+def store(item):
+    """Replaces a cached profile with the item a writer has just saved (e.g. from ReturnValues=ALL_NEW)."""
+    _local_put({item["UserID"]: item})
+    _shared_call("set_many", {item["UserID"]: item}, SHARED_SECONDS)
+
+
+def invalidate(*user_ids):
+    """Drops profiles after they were written; the next read goes back to DynamoDB."""
+    user_ids = [user_id for user_id in user_ids if user_id]
+    if not user_ids:
+        return
+    with _lock:
+        for user_id in user_ids:
+            _local.pop(user_id, None)
+    _shared_call("delete", user_ids)
+
+
+if os.environ.get("PROFILE_CACHE_URL"):
+    try:
+        _shared = RedisTier(os.environ["PROFILE_CACHE_URL"])
+    except ImportError:
+        log.warning("PROFILE_CACHE_URL is set but redis is not installed; using the local cache only")
@@ -0,0 +1,189 @@
+"""
+Declarative request schemas, compiled once per container into plain
+closures and checked before a handler makes any AWS call.
+
+    BILL = Schema({
+        "Title": String(max_length=200, required=True),
+        "TotalAmount": Number(minimum=0),
+        "Members": List(String(max_length=128), max_items=50),
+    }, max_bytes=64 * 1024)
+
+    payload = BILL.parse(event)    # raises ValidationError
+
+Unknown fields are dropped, so a client cannot write attributes such as
+HouseholdID or ApprovalStatus it was never meant to set. A field of the
+wrong type or over its limits is rejected with a message naming it,
+rather than silently truncated. Null optional fields are dropped too.
+"""
+import base64
+import copy
+import json
+import re
+from decimal import Decimal, InvalidOperation
+
+
+class ValidationError(ValueError):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class Field:
+    def __init__(self, required=False, nullable=False):
+        self.required = required
+        self.nullable = nullable
+
+    def replace(self, **options):
+        field = copy.copy(self)
+        field.__dict__.update(options)
+        return field
+
+    def compile(self, path):
+        """Returns check(value) -> value for this field at `path`."""
+        raise NotImplementedError
+
+
+class String(Field):
+    def __init__(self, max_length=256, min_length=0, choices=None, pattern=None, **kwargs):
+        super().__init__(**kwargs)
+        self.max_length = max_length
+        self.min_length = min_length
+        self.choices = frozenset(choices) if choices else None
+        self.pattern = re.compile(pattern) if pattern else None
+
+    def compile(self, path):
+        max_length, min_length, choices, pattern = self.max_length, self.min_length, self.choices, self.pattern
+
+        def check(value):
+            if not isinstance(value, str):
+                raise ValidationError(f"{path} must be a string")
+            if len(value) > max_length:
+                raise ValidationError(f"{path} must be at most {max_length} characters")
+            if len(value) < min_length:
+                raise ValidationError(f"{path} must be at least {min_length} characters")
+            if choices is not None and value not in choices:
+                raise ValidationError(f"{path} must be one of {', '.join(sorted(choices))}")
+            if pattern is not None and not pattern.fullmatch(value):
+                raise ValidationError(f"{path} is not in the expected format")
+            return value
+        return check
+
+
+class Number(Field):
+    """Accepts numbers and numeric strings (form inputs send both) and returns them as Decimal for boto3."""
+
+    def __init__(self, minimum=None, maximum=None, integer=False, places=None, **kwargs):
+        super().__init__(**kwargs)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.integer = integer
+        self.places = places
+
+    def compile(self, path):
+        minimum, maximum, integer, places = self.minimum, self.maximum, self.integer, self.places
+
+        def check(value):
+            if isinstance(value, bool) or not isinstance(value, (int, float, Decimal, str)):
+                raise ValidationError(f"{path} must be a number")
+            try:
+                number = Decimal(str(value).strip())
+            except InvalidOperation:
+                raise ValidationError(f"{path} must be a number") from None
+            if not number.is_finite():
+                raise ValidationError(f"{path} must be a number")
+            if integer and number != number.to_integral_value():
+                raise ValidationError(f"{path} must be a whole number")
+            if places is not None and number.normalize().as_tuple().exponent < -places:
+                raise ValidationError(f"{path} must have at most {places} decimal places")
+            if minimum is not None and number < minimum:
+                raise ValidationError(f"{path} must be at least {minimum}")
+            if maximum is not None and number > maximum:
+                raise ValidationError(f"{path} must be at most {maximum}")
+            return number
+        return check
+
+
+class Boolean(Field):
+    def compile(self, path):
+        def check(value):
+            if not isinstance(value, bool):
+                raise ValidationError(f"{path} must be true or false")
+            return value
+        return check
+
+
+class List(Field):
+    def __init__(self, item, max_items=100, **kwargs):
+        super().__init__(**kwargs)
+        self.item = item
+        self.max_items = max_items
+
+    def compile(self, path):
+        check_item = self.item.compile(f"{path}[]")
+        max_items = self.max_items
+
+        def check(value):
+            if not isinstance(value, list):
+                raise ValidationError(f"{path} must be a list")
+            if len(value) > max_items:
+                raise ValidationError(f"{path} must have at most {max_items} items")
+            return [check_item(item) for item in value]
+        return check
+
+
+class Object(Field):
+    def __init__(self, fields, **kwargs):
+        super().__init__(**kwargs)
+        self.fields = fields
+
+    def compile(self, path):
+        checks = tuple(
+            (name, field.compile(f"{path}.{name}" if path else name), field.required, field.nullable)
+            for name, field in self.fields.items()
+        )
+        label = path or "Request body"
+
+        def check(value):
+            if not isinstance(value, dict):
+                raise ValidationError(f"{label} must be an object")
+            cleaned = {}
+            for name, check_field, required, nullable in checks:
+                field_value = value.get(name)
+                if field_value is None:
+                    if name in value and nullable:
+                        cleaned[name] = None
+                    elif required:
+                        raise ValidationError(f"{path + '.' if path else ''}{name} is required")
+                    continue
+                cleaned[name] = check_field(field_value)
+            return cleaned
+        return check
+
+
+class Schema:
+    """A request body schema: an Object at the top level plus a size limit."""
+
+    def __init__(self, fields, max_bytes=64 * 1024):
+        self.fields = fields
+        self.max_bytes = max_bytes
+        self.validate = Object(fields).compile("")
+
+    def extend(self, fields=None, required=(), max_bytes=None):
+        """A copy with extra or replaced fields and/or more required ones, e.g. create vs update."""
+        merged = dict(self.fields, **(fields or {}))
+        for name in required:
+            merged[name] = merged[name].replace(required=True)
+        return Schema(merged, max_bytes=max_bytes or self.max_bytes)
+
+    def parse(self, event):
+        """Size-checks, decodes and validates an API Gateway event's JSON body."""
+        body = event.get("body") or "{}"
+        if event.get("isBase64Encoded"):
+            body = base64.b64decode(body).decode("utf-8")
+        if len(body) > self.max_bytes:
+            raise ValidationError(f"Request body must be at most {self.max_bytes} bytes", 413)
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError:
+            raise ValidationError("Request body must be valid JSON") from None
+        return self.validate(payload)
@@ -0,0 +1,142 @@
+"""
+Per-household version markers for "changes since" reads.
+
+    NOTICES = versioning.Marker("HouseholdNotices", marker_key={"NoticeID": "#VERSION"})
+    marker = NOTICES.read(household_id)
+    version = NOTICES.write(household_id, lambda version: [put_action], removed_id=None)
+
+Every write to a versioned collection bumps the household's marker in the
+same transaction, and stamps what it writes with the new version. The
+marker update is guarded on the version that was read. If another writer
+moved the marker first, the transaction is cancelled, and write() reads
+the marker again and retries. Versions are therefore handed out in commit
+order.
+
+A deletion is recorded as a tombstone on the marker ({id: version}). Only
+the newest max_tombstones are kept. The floor attribute holds the version
+of the newest tombstone dropped, so a client syncing from before the
+floor needs a full resync.
+
+The marker can also be an attribute set on the collection's own item, as
+with the Tasks list embedded in each Households item. Pass no marker_key
+and build no actions. `changes` then returns the item's own SET clauses,
+and write() applies them together with the bump in one guarded
+UpdateItem.
+
+When the last attempt still loses, its ClientError is raised: a
+TransactionCanceledException, or a ConditionalCheckFailedException for a
+plain update.
+"""
+import time
+
+from botocore.exceptions import ClientError
+
+from flatchat import aws
+
+
+class Marker:
+    def __init__(self, table_name, marker_key=None, partition_key="HouseholdID", region_name=None,
+                 version="HouseholdVersion", modified="ModifiedAt", tombstones="Tombstones",
+                 floor="TombstoneFloor", max_tombstones=100, max_attempts=3):
+        self.table_name = table_name
+        self.marker_key = marker_key or {}
+        self.partition_key = partition_key
+        self.version = version
+        self.modified = modified
+        self.tombstones = tombstones
+        self.floor = floor
+        self.max_tombstones = max_tombstones
+        self.max_attempts = max_attempts
+        self.table = aws.table(table_name, region_name=region_name)
+        self.dynamodb = aws.resource("dynamodb", region_name=region_name)
+
+    def key(self, household_id):
+        return {self.partition_key: household_id, **self.marker_key}
+
+    def read(self, household_id, consistent=False, projection=None):
+        kwargs = {"ProjectionExpression": projection} if projection else {}
+        return self.table.get_item(Key=self.key(household_id), ConsistentRead=consistent, **kwargs).get("Item") or {}
+
+    def current(self, marker):
+        return int(marker.get(self.version, 0))
+
+    def update(self, household_id, marker, now, removed_id=None, changes=None):
+        """
+        Returns the next version and the UpdateItem parameters (with
+        TableName) that move the marker to it. `changes` holds extra
+        "sets", "removes", "names" and "values" for the same update.
+        """
+        changes = changes or {}
+        current = self.current(marker)
+        next_version = current + 1
+        sets = [f"{self.version} = :next", f"{self.modified} = :now", *changes.get("sets", ())]
+        removes = list(changes.get("removes", ()))
+        names = dict(changes.get("names") or {})
+        values = {":next": next_version, ":now": now, **(changes.get("values") or {})}
+
+        if removed_id:
+            tombstones = marker.get(self.tombstones)
+            if tombstones is None:
+                sets.append(f"{self.tombstones} = :tombstones")
+                values[":tombstones"] = {removed_id: next_version}
+            else:
+                sets.append(f"{self.tombstones}.#removed = :next")
+                names["#removed"] = removed_id
+                overflow = sorted(tombstones.items(), key=lambda kv: kv[1])[:max(0, len(tombstones) + 1 - self.max_tombstones)]
+                for i, (old_id, old_version) in enumerate(overflow):
+                    removes.append(f"{self.tombstones}.#old{i}")
+                    names[f"#old{i}"] = old_id
+                if overflow:
+                    sets.append(f"{self.floor} = :floor")
+                    values[":floor"] = overflow[-1][1]
+
+        update = {
+            "TableName": self.table_name,
+            "Key": self.key(household_id),
+            "UpdateExpression": "SET " + ", ".join(sets) + (" REMOVE " + ", ".join(removes) if removes else ""),
+            "ExpressionAttributeValues": values
+        }
+        if self.version in marker:
+            update["ConditionExpression"] = f"{self.version} = :current"
+            values[":current"] = current
+        else:
+            update["ConditionExpression"] = f"attribute_not_exists({self.version})"
+        if names:
+            update["ExpressionAttributeNames"] = names
+        return next_version, update
+
+    def write(self, household_id, build_actions=None, removed_id=None, changes=None, projection=None):
+        """
+        Runs build_actions(version) in one transaction with the marker bump,
+        re-reading the marker when another writer got there first.
+        changes(marker, version, now), if given, returns extra clauses for
+        the marker update (see update()); `projection` limits what is read
+        of the marker's item. Returns the new version.
+        """
+        for attempt in range(self.max_attempts):
+            marker = self.read(household_id, consistent=True, projection=projection)
+            now = int(time.time())
+            version = self.current(marker) + 1
+            extra = changes(marker, version, now) if changes else None
+            next_version, update = self.update(household_id, marker, now, removed_id=removed_id, changes=extra)
+            actions = build_actions(next_version) if build_actions else []
+            try:
+                if actions:
+                    self.dynamodb.meta.client.transact_write_items(TransactItems=actions + [{"Update": update}])
+                else:
+                    update.pop("TableName")
+                    self.table.update_item(**update)
+                return next_version
+            except ClientError as e:
+                if actions:
+                    reasons = e.response.get("CancellationReasons") or []
+                    lost = len(reasons) == len(actions) + 1 and reasons[-1].get("Code") == "ConditionalCheckFailed"
+                else:
+                    lost = e.response["Error"]["Code"] == "ConditionalCheckFailedException"
+                if not lost or attempt == self.max_attempts - 1:
+                    raise
+
+
+# The Tasks list embedded in each Households item is versioned on the item itself
+TASKS = Marker("Households", version="TasksVersion", modified="TasksModifiedAt",
+               tombstones="TaskTombstones", floor="TaskTombstoneFloor")
@@ -1,19 +1,15 @@
 import json
-import boto3
 import uuid
+from flatchat.http import respond, preflight
+from flatchat import aws, log, metrics
 
-dynamodb = boto3.resource("dynamodb")
-households_table = dynamodb.Table("Households") 
+households_table = aws.table("Households")
 
+@metrics.invocation
 def lambda_handler(event, context):
-    cors_headers = {
-        "Access-Control-Allow-Origin": "*",
-        "Access-Control-Allow-Headers": "Content-Type,Authorization",
-        "Access-Control-Allow-Methods": "OPTIONS,POST"
-    }
-
+    log.request(event, context)
     if event.get("httpMethod") == "OPTIONS":
-        return {"statusCode": 200, "headers": cors_headers, "body": ""}
+        return preflight()
 
     body = json.loads(event.get("body", "{}"))
 
@@ -24,43 +20,23 @@ def lambda_handler(event, context):
     new_name = body.get("NewName")             
 
     if not (household_id and requesting_user_id and action):
-        return {
-            "statusCode": 400,
-            "headers": cors_headers,
-            "body": json.dumps({"message": "Missing HouseholdID, RequestingUserID, or Action"})
-        }
+        return respond(400, {"message": "Missing HouseholdID, RequestingUserID, or Action"})
 
     res = households_table.get_item(Key={"HouseholdID": household_id})
     household = res.get("Item")
     if not household:
-        return {
-            "statusCode": 404,
-            "headers": cors_headers,
-            "body": json.dumps({"message": "Household not found"})
-        }
+        return respond(404, {"message": "Household not found"})
 
     admins = household.get("Admins", [])
     if requesting_user_id not in admins:
-        return {
-            "statusCode": 403,
-            "headers": cors_headers,
-            "body": json.dumps({"message": "You are not an admin of this household"})
-        }
+        return respond(403, {"message": "You are not an admin of this household"})
 
     if action == "grant":
         if not target_user_id:
-            return {
-                "statusCode": 400,
-                "headers": cors_headers,
-                "body": json.dumps({"message": "TargetUserID required for 'grant'"})
-            }
+            return respond(400, {"message": "TargetUserID required for 'grant'"})
         members = household.get("Members", [])
         if target_user_id not in members:
-            return {
-                "statusCode": 400,
-                "headers": cors_headers,
-                "body": json.dumps({"message": "Target user is not a member of the household"})
-            }
+            return respond(400, {"message": "Target user is not a member of the household"})
         if target_user_id in admins:
             message = "Target user is already an admin"
         else:
@@ -72,19 +48,11 @@ def lambda_handler(event, context):
             )
             message = "Admin privileges granted"
 
-        return {
-            "statusCode": 200,
-            "headers": cors_headers,
-            "body": json.dumps({"message": message, "Admins": admins})
-        }
+        return respond(200, {"message": message, "Admins": admins})
 
     elif action == "revoke":
         if not target_user_id:
-            return {
-                "statusCode": 400,
-                "headers": cors_headers,
-                "body": json.dumps({"message": "TargetUserID required for 'revoke'"})
-            }
+            return respond(400, {"message": "TargetUserID required for 'revoke'"})
         if target_user_id in admins:
             admins.remove(target_user_id)
             households_table.update_item(
@@ -96,11 +64,7 @@ def lambda_handler(event, context):
         else:
             message = "Target user was not an admin"
 
-        return {
-            "statusCode": 200,
-            "headers": cors_headers,
-            "body": json.dumps({"message": message, "Admins": admins})
-        }
+        return respond(200, {"message": message, "Admins": admins})
 
     elif action == "regenerate":
         new_join_code = str(uuid.uuid4().int)[:6]
@@ -109,40 +73,24 @@ def lambda_handler(event, context):
             UpdateExpression="SET JoinCode = :jc",
             ExpressionAttributeValues={":jc": new_join_code}
         )
-        return {
-            "statusCode": 200,
-            "headers": cors_headers,
-            "body": json.dumps({
-                "message": "Join code regenerated",
-                "NewJoinCode": new_join_code
-            })
-        }
+        return respond(200, {
+            "message": "Join code regenerated",
+            "NewJoinCode": new_join_code
+        })
 
     elif action == "rename":
         if not new_name:
-            return {
-                "statusCode": 400,
-                "headers": cors_headers,
-                "body": json.dumps({"message": "NewName is required for rename"})
-            }
+            return respond(400, {"message": "NewName is required for rename"})
         households_table.update_item(
             Key={"HouseholdID": household_id},
             UpdateExpression="SET #n = :val_name",
             ExpressionAttributeNames={"#n": "Name"},
             ExpressionAttributeValues={":val_name": new_name}
         )
-        return {
-            "statusCode": 200,
-            "headers": cors_headers,
-            "body": json.dumps({
-                "message": "Household name updated",
-                "NewName": new_name
-            })
-        }
+        return respond(200, {
+            "message": "Household name updated",
+            "NewName": new_name
+        })
 
     else:
-        return {
-            "statusCode": 400,
-            "headers": cors_headers,
-            "body": json.dumps({"message": "Action must be grant, revoke, regenerate, or rename"})
-        }
+        return respond(400, {"message": "Action must be grant, revoke, regenerate, or rename"})
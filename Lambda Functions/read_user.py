@@ -1,88 +1,27 @@
-from decimal import Decimal
 import json
-import boto3
-
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('UserDetails') 
-
-def convert_decimals(obj):
-    """Recursively convert Decimal types to float."""
-    if isinstance(obj, list):
-        return [convert_decimals(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_decimals(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        return float(obj)
-    else:
-        return obj
+from flatchat.http import respond, preflight
+from flatchat import log, metrics, profiles
 
+@metrics.invocation
 def lambda_handler(event, context):
+    log.request(event, context)
     if event.get('httpMethod') == 'OPTIONS':
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*", 
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE"
-            },
-            "body": ""
-        }
+        return preflight()
     
     try:
         body = json.loads(event.get("body", "{}"))
         user_id = body.get("UserID")
         if not user_id:
-            return {
-                "statusCode": 400,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                    "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE"
-                },
-                "body": json.dumps({"message": "UserID is required in request body"})
-            }
+            return respond(400, {"message": "UserID is required in request body"})
     except json.JSONDecodeError:
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE"
-            },
-            "body": json.dumps({"message": "Invalid JSON"})
-        }
+        return respond(400, {"message": "Invalid JSON"})
     
     try:
-        response = table.get_item(Key={"UserID": user_id})
-        if "Item" not in response:
-            return {
-                "statusCode": 404,
-                "headers": {
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                    "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE"
-                },
-                "body": json.dumps({"message": "User not found"})
-            }
-        user_data = response["Item"]
-        user_data = convert_decimals(user_data)
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE"
-            },
-            "body": json.dumps(user_data)
-        }
+        # Read straight after household writes elsewhere, so never from cache
+        user = profiles.get(user_id, fresh=True)
+        if user is None:
+            return respond(404, {"message": "User not found"})
+        return respond(200, user)
     except Exception as e:
-        print(f"Error reading user: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,GET,PUT,DELETE"
-            },
-            "body": json.dumps({"message": "Internal Server Error"})
-        }
+        log.error("reading user failed", error=str(e))
+        return respond(500, {"message": "Internal Server Error"})
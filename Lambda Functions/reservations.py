@@ -1,14 +1,969 @@
 import json
+import math
 import uuid
-import boto3
-from boto3.dynamodb.conditions import Key
+import base64
+import argparse
+from datetime import datetime, timedelta, timezone
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+from flatchat.http import respond
+from flatchat import aws, idempotency, log, metrics
+from flatchat.validation import Number, Object, Schema, String, ValidationError
 
-dynamodb = boto3.resource("dynamodb", region_name="eu-west-1")
+dynamodb = aws.resource("dynamodb", region_name="eu-west-1")
 TABLE_NAME = "ReservedSpaces"
-table = dynamodb.Table(TABLE_NAME)
+table = aws.table(TABLE_NAME, region_name="eu-west-1")
 
+# Besides the reservations themselves, each household partition holds:
+#   "SLOT#<space>#<start>#<ReservationID>" - one per active booking, so a
+#       space's bookings are sorted by start time under the table's sort key
+#   "SPACE#<space>" - a version counter every booking write for that space
+#       must bump, which serializes concurrent writers. It also keeps the ids
+#       of the space's live series (SeriesIDs), so a booking only reads those
+#   "SERIES#<SeriesID>" - a standing booking: the first occurrence's times, a
+#       Recurrence rule and the start times of cancelled occurrences.
+#       Occurrences are expanded on read and addressed as "<SeriesID>@<start>".
+# Rejected reservations give up their slot.
+SLOT_PREFIX = "SLOT#"
+SPACE_PREFIX = "SPACE#"
+SERIES_PREFIX = "SERIES#"
+SERIES_ID_PREFIX = "series-"
+OCCURRENCE_SEPARATOR = "@"
+PERIOD_DAYS = {"DAILY": 1, "WEEKLY": 7}
+MAX_RECURRENCE_INTERVAL = 4
+MAX_RECURRENCE_COUNT = 520
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+MAX_WRITE_ATTEMPTS = 3
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+DEFAULT_WINDOW_DAYS = 7
+MAX_AVAILABILITY_DAYS = 31
+
+# Fields a PUT may not touch; status and approvers only change via /approve
+PROTECTED_FIELDS = {
+    "HouseholdID", "ReservationID", "ReservedBy", "ApprovalStatus", "Approvers", "SlotID", "RecordType", "RequestUserID",
+    "SeriesID", "Recurrence", "CancelledOccurrences", "OccurrenceStart"
+}
+STATUS_FOR_ACTION = {"Approve": "Approved", "Reject": "Rejected"}
+
+# Request bodies. Status, approvers and slot bookkeeping are never taken
+# from the client, so they are not listed and get dropped.
+RESERVATION_FIELDS = {
+    "HouseholdID": String(max_length=128),
+    "SpaceName": String(max_length=100),
+    "Purpose": String(max_length=500),
+    "StartTime": String(max_length=32),
+    "EndTime": String(max_length=32),
+}
+REQUEST_SCHEMAS = {
+    ("POST", "/reservations"): Schema(dict(
+        RESERVATION_FIELDS,
+        ReservedBy=String(max_length=128),
+        Recurrence=Object({
+            "Frequency": String(max_length=16),
+            "Interval": Number(minimum=1, maximum=MAX_RECURRENCE_INTERVAL, integer=True),
+            "Until": String(max_length=32),
+            "Count": Number(minimum=1, maximum=MAX_RECURRENCE_COUNT, integer=True),
+        }),
+    ), max_bytes=8 * 1024),
+    ("PUT", "/reservations/{id}"): Schema(dict(
+        RESERVATION_FIELDS,
+        RequestUserID=String(max_length=128, required=True),
+    ), max_bytes=8 * 1024),
+    ("PATCH", "/reservations/{id}/approve"): Schema({
+        "HouseholdID": String(max_length=128),
+        "Action": String(choices=STATUS_FOR_ACTION, required=True),
+        "UserID": String(max_length=128, required=True),
+    }, max_bytes=4 * 1024),
+}
+
+class ReservationConflict(Exception):
+    def __init__(self, slot):
+        super().__init__("Reservation overlaps an existing booking")
+        self.slot = slot
+
+class ReservationChanged(Exception):
+    """The reservation was edited, deleted or handed over since it was read."""
+
+def normalize_time(value):
+    """
+    Parses the datetime-local strings the frontend sends (with or without
+    seconds/offset) into one sortable format. Aware times are moved to UTC.
+    """
+    text = str(value or "").strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime(TIME_FORMAT)
+
+def space_key(space_name):
+    return str(space_name).strip().replace("#", "_")
+
+def slot_id(space_name, start, reservation_id):
+    return f"{SLOT_PREFIX}{space_key(space_name)}#{start}#{reservation_id}"
+
+def parse_time(value):
+    return datetime.strptime(value, TIME_FORMAT)
+
+def normalize_recurrence(recurrence):
+    """Validates a client Recurrence rule: DAILY/WEEKLY, Interval, optional Until or Count."""
+    if not isinstance(recurrence, dict):
+        raise ValueError("Recurrence must be an object")
+    frequency = str(recurrence.get("Frequency", "WEEKLY")).upper()
+    if frequency not in PERIOD_DAYS:
+        raise ValueError("Frequency must be DAILY or WEEKLY")
+    interval = int(recurrence.get("Interval", 1))
+    if not 1 <= interval <= MAX_RECURRENCE_INTERVAL:
+        raise ValueError(f"Interval must be between 1 and {MAX_RECURRENCE_INTERVAL}")
+    rule = {"Frequency": frequency, "Interval": interval}
+    if recurrence.get("Until"):
+        rule["Until"] = normalize_time(recurrence["Until"])
+    if recurrence.get("Count"):
+        count = int(recurrence["Count"])
+        if not 1 <= count <= MAX_RECURRENCE_COUNT:
+            raise ValueError(f"Count must be between 1 and {MAX_RECURRENCE_COUNT}")
+        rule["Count"] = count
+    return rule
+
+def series_period(series):
+    rule = series["Recurrence"]
+    return timedelta(days=PERIOD_DAYS[rule["Frequency"]] * int(rule["Interval"]))
+
+def series_last_start(series):
+    """Start of the final occurrence, or None for an open-ended series."""
+    rule = series["Recurrence"]
+    limits = []
+    if rule.get("Until"):
+        limits.append(parse_time(rule["Until"]))
+    if rule.get("Count"):
+        limits.append(parse_time(series["StartTime"]) + (int(rule["Count"]) - 1) * series_period(series))
+    return min(limits) if limits else None
+
+def series_occurrences(series, window_start, window_end, skip_cancelled=True):
+    """
+    Lazily yields (start, end) of the series' occurrences that overlap
+    [window_start, window_end). The first candidate is found arithmetically,
+    so the cost depends on the window, not on how long the series has run.
+    """
+    first = parse_time(series["StartTime"])
+    duration = parse_time(series["EndTime"]) - first
+    period = series_period(series)
+    last = series_last_start(series)
+    window_start, window_end = parse_time(window_start), parse_time(window_end)
+    cancelled = set(series.get("CancelledOccurrences") or []) if skip_cancelled else set()
+
+    k = max(0, (window_start - first - duration) // period)
+    while True:
+        occurrence_start = first + k * period
+        if occurrence_start >= window_end or (last is not None and occurrence_start > last):
+            return
+        if occurrence_start + duration > window_start:
+            start_text = occurrence_start.strftime(TIME_FORMAT)
+            if start_text not in cancelled:
+                yield start_text, (occurrence_start + duration).strftime(TIME_FORMAT)
+        k += 1
+
+def occurrence_id(series, occurrence_start):
+    return f"{series['SeriesID']}{OCCURRENCE_SEPARATOR}{occurrence_start}"
+
+def parse_reservation_id(reservation_id):
+    """Returns (SeriesID, occurrence start) for series ids, (None, None) otherwise."""
+    if reservation_id and OCCURRENCE_SEPARATOR in reservation_id:
+        series_id, occurrence_start = reservation_id.split(OCCURRENCE_SEPARATOR, 1)
+        return series_id, occurrence_start
+    if reservation_id and reservation_id.startswith(SERIES_ID_PREFIX):
+        return reservation_id, None
+    return None, None
+
+def is_occurrence(series, occurrence_start):
+    try:
+        end = (parse_time(occurrence_start) + timedelta(seconds=1)).strftime(TIME_FORMAT)
+    except ValueError:
+        return False
+    return any(start == occurrence_start for start, _ in series_occurrences(series, occurrence_start, end))
+
+def household_series(household_id, space_name=None):
+    """The household's live (not rejected) series, optionally for one space."""
+    query_kwargs = {
+        "KeyConditionExpression": Key("HouseholdID").eq(household_id) & Key("ReservationID").begins_with(SERIES_PREFIX),
+        "ConsistentRead": True
+    }
+    found = []
+    while True:
+        result = table.query(**query_kwargs)
+        for series in result.get("Items", []):
+            if series.get("ApprovalStatus") == "Rejected":
+                continue
+            if space_name is not None and space_key(series["SpaceName"]) != space_key(space_name):
+                continue
+            found.append(series)
+        if "LastEvaluatedKey" not in result:
+            return found
+        query_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
+def present_series(series):
+    """A series item as the API shows it, addressed by its SeriesID."""
+    presented = dict(series, ReservationID=series["SeriesID"])
+    presented.pop("RecordType", None)
+    return presented
+
+def present_occurrence(series, occurrence_start, occurrence_end):
+    presented = present_series(series)
+    presented.pop("CancelledOccurrences", None)
+    presented.update(
+        ReservationID=occurrence_id(series, occurrence_start),
+        StartTime=occurrence_start,
+        EndTime=occurrence_end
+    )
+    return presented
+
+def space_series(household_id, series_ids):
+    """The live series behind a space's SeriesIDs, read consistently."""
+    found = []
+    keys = [{"HouseholdID": household_id, "ReservationID": SERIES_PREFIX + series_id} for series_id in sorted(series_ids)]
+    for i in range(0, len(keys), 100):
+        request = {TABLE_NAME: {"Keys": keys[i:i + 100], "ConsistentRead": True}}
+        while request:
+            result = dynamodb.batch_get_item(RequestItems=request)
+            found.extend(
+                series for series in result.get("Responses", {}).get(TABLE_NAME, [])
+                if series.get("ApprovalStatus") != "Rejected"
+            )
+            request = result.get("UnprocessedKeys") or None
+    return found
+
+def series_conflict(space_series_items, start, end, ignore_occurrences=()):
+    """First occurrence of the space's standing bookings that overlaps [start, end)."""
+    for series in space_series_items:
+        for occurrence_start, occurrence_end in series_occurrences(series, start, end):
+            occ_id = occurrence_id(series, occurrence_start)
+            if occ_id in ignore_occurrences:
+                continue
+            return {"ReservationRef": occ_id, "StartTime": occurrence_start, "EndTime": occurrence_end}
+    return None
+
+def find_conflict(household_id, space_name, start, end, ignore_reservation_id=None):
+    """
+    Because a space's bookings never overlap, they are ordered by end time
+    as well as start time. The only booking that can clash with [start, end)
+    is the one with the latest start before `end`, so this is a single
+    Limit-2 descending query on the slot index (the second item covers the
+    case where the first one is the reservation being edited).
+    """
+    prefix = f"{SLOT_PREFIX}{space_key(space_name)}#"
+    result = table.query(
+        KeyConditionExpression=Key("HouseholdID").eq(household_id) & Key("ReservationID").between(prefix, prefix + end),
+        ScanIndexForward=False,
+        Limit=2,
+        ConsistentRead=True
+    )
+    for slot in result.get("Items", []):
+        if slot.get("ReservationRef") == ignore_reservation_id:
+            continue
+        return slot if slot["EndTime"] > start else None
+    return None
+
+def space_guard_action(household_id, space_name, add_series_id=None):
+    """
+    Reads the space's version counter and returns the transaction item that
+    bumps it, with the space's live series. The bump also rewrites the
+    guard's SeriesIDs when they changed: `add_series_id` joins them, ids of
+    deleted or rejected series drop out, and a guard from before the index
+    is filled in from a household query.
+    """
+    guard_key = {"HouseholdID": household_id, "ReservationID": SPACE_PREFIX + space_key(space_name)}
+    guard = table.get_item(Key=guard_key, ConsistentRead=True).get("Item")
+    if not guard:
+        indexed, series = set(), []
+    elif guard.get("SeriesIndexed"):
+        indexed = set(guard.get("SeriesIDs") or ())
+        series = space_series(household_id, indexed)
+    else:
+        indexed, series = None, household_series(household_id, space_name)
+
+    if guard:
+        sets = ["Version = Version + :one"]
+        condition = "Version = :version"
+        values = {":one": 1, ":version": guard["Version"]}
+    else:
+        sets = ["Version = :one", "SpaceName = :space", "RecordType = :type"]
+        condition = "attribute_not_exists(Version)"
+        values = {":one": 1, ":space": space_name, ":type": "Space"}
+
+    series_ids = {s["SeriesID"] for s in series} | ({add_series_id} if add_series_id else set())
+    removes = []
+    if not guard or indexed is None or series_ids != indexed:
+        sets.append("SeriesIndexed = :indexed")
+        values[":indexed"] = True
+        if series_ids:
+            sets.append("SeriesIDs = :series")
+            values[":series"] = series_ids
+        elif indexed:
+            removes.append("SeriesIDs")
+    update_expression = "SET " + ", ".join(sets) + (" REMOVE " + ", ".join(removes) if removes else "")
+    return {"Update": {
+        "TableName": TABLE_NAME,
+        "Key": guard_key,
+        "UpdateExpression": update_expression,
+        "ConditionExpression": condition,
+        "ExpressionAttributeValues": values
+    }}, series
+
+def lost_guard_race(reasons):
+    """
+    Whether a cancelled transaction lost the space guard to another writer:
+    either its version moved (ConditionalCheckFailed) or the two
+    transactions met on it mid-flight (TransactionConflict).
+    """
+    return bool(reasons) and reasons[0].get("Code") in ("ConditionalCheckFailed", "TransactionConflict")
+
+def save_reservation(household_id, reservation, previous=None, owner=None, extra_actions=(), ignore_occurrences=()):
+    """
+    Writes a reservation together with its slot, after checking the space's
+    slot index for overlaps. The check and the write are tied together by
+    the space's version counter: if another booking for the space commits
+    in between, the transaction is cancelled and we re-check.
+
+    For a new booking `reservation` is the full item. For an edit it holds
+    ReservationID, SpaceName/StartTime/EndTime and the changed fields, and
+    `previous` is the stored item: the reservation is then updated in place
+    (so concurrent approvals survive), guarded on its current SlotID and,
+    if given, on `owner`.
+    `extra_actions` join the same transaction and `ignore_occurrences` are
+    series occurrences it replaces (used when detaching one occurrence).
+    Raises ReservationConflict when the time is taken and ReservationChanged
+    when the edit guard (or a condition on an extra action) fails.
+    """
+    space_name = reservation["SpaceName"]
+    start = normalize_time(reservation["StartTime"])
+    end = normalize_time(reservation["EndTime"])
+    if end <= start:
+        raise ValueError("EndTime must be after StartTime")
+
+    reservation_id = reservation["ReservationID"]
+    new_slot_id = slot_id(space_name, start, reservation_id)
+    reservation["SlotID"] = new_slot_id
+    reservation_key = {"HouseholdID": household_id, "ReservationID": reservation_id}
+
+    if previous is None:
+        reservation_action = {"Put": {
+            "TableName": TABLE_NAME,
+            "Item": reservation,
+            "ConditionExpression": "attribute_not_exists(ReservationID)"
+        }}
+    else:
+        fields = {k: v for k, v in reservation.items() if k not in ("HouseholdID", "ReservationID")}
+        names = {f"#f{i}": field for i, field in enumerate(fields)}
+        values = {f":f{i}": value for i, value in enumerate(fields.values())}
+        condition = "attribute_exists(ReservationID)"
+        if previous.get("SlotID"):
+            condition += " AND SlotID = :old_slot"
+            values[":old_slot"] = previous["SlotID"]
+        else:
+            condition += " AND attribute_not_exists(SlotID)"
+        if owner:
+            condition += " AND ReservedBy = :owner"
+            values[":owner"] = owner
+        reservation_action = {"Update": {
+            "TableName": TABLE_NAME,
+            "Key": reservation_key,
+            "UpdateExpression": "SET " + ", ".join(f"#f{i} = :f{i}" for i in range(len(fields))),
+            "ConditionExpression": condition,
+            "ExpressionAttributeNames": names,
+            "ExpressionAttributeValues": values
+        }}
+
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        guard_action, space_series_items = space_guard_action(household_id, space_name)
+        conflict = (
+            find_conflict(household_id, space_name, start, end, ignore_reservation_id=reservation_id)
+            or series_conflict(space_series_items, start, end, ignore_occurrences=ignore_occurrences)
+        )
+        if conflict:
+            raise ReservationConflict(conflict)
+
+        actions = [
+            guard_action,
+            reservation_action,
+            {"Put": {"TableName": TABLE_NAME, "Item": {
+                "HouseholdID": household_id,
+                "ReservationID": new_slot_id,
+                "RecordType": "Slot",
+                "SpaceName": space_name,
+                "StartTime": start,
+                "EndTime": end,
+                "ReservationRef": reservation_id
+            }}}
+        ]
+        old_slot_id = (previous or {}).get("SlotID")
+        if old_slot_id and old_slot_id != new_slot_id:
+            actions.append({"Delete": {"TableName": TABLE_NAME, "Key": {"HouseholdID": household_id, "ReservationID": old_slot_id}}})
+        actions.extend(extra_actions)
+
+        try:
+            dynamodb.meta.client.transact_write_items(TransactItems=actions)
+            return reservation
+        except ClientError as e:
+            reasons = e.response.get("CancellationReasons") or []
+            if any(reason.get("Code") == "ConditionalCheckFailed" for reason in reasons[1:]):
+                raise ReservationChanged()
+            guard_lost = lost_guard_race(reasons)
+            if not guard_lost or attempt == MAX_WRITE_ATTEMPTS - 1:
+                raise
+
+def series_fit_conflict(household_id, series, space_series_items):
+    """
+    Checks a new series against the space's one-off bookings from its first
+    occurrence on (each slot is tested arithmetically against the rule) and
+    against the space's other series. Two periodic series line up the same
+    way every lcm(periods), so one common cycle is enough to compare them.
+    """
+    space_name = series["SpaceName"]
+    first = parse_time(series["StartTime"])
+    duration = parse_time(series["EndTime"]) - first
+    last = series_last_start(series)
+    horizon = (last + duration).strftime(TIME_FORMAT) if last else "9999-12-31T00:00:00"
+
+    after = None
+    while True:
+        slots, more = window_slots(household_id, space_name, series["StartTime"], horizon, after=after, limit=MAX_PAGE_SIZE)
+        for slot in slots:
+            if next(series_occurrences(series, slot["StartTime"], slot["EndTime"]), None):
+                return slot
+        if not more or not slots:
+            break
+        after = [slots[-1]["StartTime"], slots[-1]["ReservationID"]]
+
+    for other in space_series_items:
+        other_first = parse_time(other["StartTime"])
+        other_duration = parse_time(other["EndTime"]) - other_first
+        cycle_days = math.lcm(series_period(series).days, series_period(other).days)
+        common_start = max(first, other_first) - max(duration, other_duration)
+        common_end = max(first, other_first) + timedelta(days=cycle_days) + max(duration, other_duration)
+        for occurrence_start, occurrence_end in series_occurrences(series, common_start.strftime(TIME_FORMAT), common_end.strftime(TIME_FORMAT)):
+            clash = next(series_occurrences(other, occurrence_start, occurrence_end, skip_cancelled=False), None)
+            if clash:
+                return {"ReservationRef": occurrence_id(other, clash[0]), "StartTime": clash[0], "EndTime": clash[1]}
+    return None
+
+def save_series(household_id, series):
+    """
+    Stores a standing booking as one item, after checking it against the
+    space's bookings under the same version counter one-off writes use.
+    Raises ReservationConflict when any occurrence would clash.
+    """
+    if series["EndTime"] <= series["StartTime"]:
+        raise ValueError("EndTime must be after StartTime")
+    if parse_time(series["EndTime"]) - parse_time(series["StartTime"]) > series_period(series):
+        raise ValueError("A single occurrence cannot be longer than the recurrence period")
+
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        guard_action, space_series_items = space_guard_action(household_id, series["SpaceName"], add_series_id=series["SeriesID"])
+        conflict = series_fit_conflict(household_id, series, space_series_items)
+        if conflict:
+            raise ReservationConflict(conflict)
+        try:
+            dynamodb.meta.client.transact_write_items(TransactItems=[
+                guard_action,
+                {"Put": {"TableName": TABLE_NAME, "Item": series, "ConditionExpression": "attribute_not_exists(ReservationID)"}}
+            ])
+            return series
+        except ClientError as e:
+            reasons = e.response.get("CancellationReasons") or []
+            guard_lost = lost_guard_race(reasons)
+            if not guard_lost or attempt == MAX_WRITE_ATTEMPTS - 1:
+                raise
+
+def release_slot_action(household_id, reservation):
+    """
+    The transaction item that drops a reservation's slot, written together
+    with the reject or delete so a slot can never be left behind. Guarded
+    on ReservationRef so it never removes someone else's.
+    """
+    return {"Delete": {
+        "TableName": TABLE_NAME,
+        "Key": {"HouseholdID": household_id, "ReservationID": reservation["SlotID"]},
+        "ConditionExpression": "attribute_not_exists(ReservationID) OR ReservationRef = :rid",
+        "ExpressionAttributeValues": {":rid": reservation["ReservationID"]}
+    }}
+
+def write_with_slot_release(household_id, reservation, action):
+    """
+    Runs `action` (an Update or Delete of the reservation) on its own, or in
+    one transaction with the slot's delete when it holds a slot. Returns
+    False when the action's condition failed.
+    """
+    try:
+        if reservation.get("SlotID"):
+            dynamodb.meta.client.transact_write_items(
+                TransactItems=[action, release_slot_action(household_id, reservation)]
+            )
+        else:
+            kind, params = next(iter(action.items()))
+            params = {k: v for k, v in params.items() if k != "TableName"}
+            (table.update_item if kind == "Update" else table.delete_item)(**params)
+        return True
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        reasons = e.response.get("CancellationReasons") or []
+        if code == "ConditionalCheckFailedException" or (reasons and reasons[0].get("Code") == "ConditionalCheckFailed"):
+            return False
+        raise
+
+def slot_guard(reservation, values):
+    """Condition that the reservation still holds the slot we read (or none)."""
+    if reservation.get("SlotID"):
+        values[":slot"] = reservation["SlotID"]
+        return "SlotID = :slot"
+    return "attribute_not_exists(SlotID)"
+
+def delete_reservation(household_id, reservation_id, owner):
+    """Deletes a one-off reservation and its slot, guarded on ownership. Returns (status_code, body)."""
+    key = {"HouseholdID": household_id, "ReservationID": reservation_id}
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        item = table.get_item(Key=key, ConsistentRead=True).get("Item")
+        if not item:
+            return 404, {"message": "Reservation not found"}
+        if item.get("ReservedBy") != owner:
+            return 403, {"message": "You are not allowed to delete this reservation."}
+        values = {":owner": owner}
+        condition = "attribute_exists(ReservationID) AND ReservedBy = :owner AND " + slot_guard(item, values)
+        action = {"Delete": {
+            "TableName": TABLE_NAME,
+            "Key": key,
+            "ConditionExpression": condition,
+            "ExpressionAttributeValues": values
+        }}
+        if write_with_slot_release(household_id, item, action):
+            return 200, {"message": "Reservation deleted"}
+    return 409, {"message": "Reservation was changed concurrently, please retry"}
+
+def reject_reservation(household_id, reservation_id, user_id):
+    """
+    Rejects a reservation and gives up its slot in one transaction, guarded
+    on the status, approvers and slot read. Returns (status_code, body).
+    """
+    key = {"HouseholdID": household_id, "ReservationID": reservation_id}
+    for attempt in range(MAX_WRITE_ATTEMPTS):
+        item = table.get_item(Key=key, ConsistentRead=True).get("Item")
+        if not item:
+            return 404, {"message": "Reservation not found"}
+        if item.get("ReservedBy") == user_id:
+            return 403, {"message": "You cannot review your own reservation."}
+        status = item.get("ApprovalStatus")
+        if (status or "Pending") not in ("Pending", "Approved"):
+            return 409, {"message": f"Reservation is already {status}"}
+
+        # Approvers may still be a list on older items; it is rewritten as a set
+        approvers = set(item.get("Approvers") or []) | {user_id}
+        values = {":approvers": approvers, ":status": "Rejected"}
+        conditions = ["attribute_exists(ReservationID)", slot_guard(item, values)]
+        if status:
+            conditions.append("ApprovalStatus = :old_status")
+            values[":old_status"] = status
+        else:
+            conditions.append("attribute_not_exists(ApprovalStatus)")
+        if "Approvers" in item:
+            conditions.append("Approvers = :old_approvers")
+            values[":old_approvers"] = item["Approvers"]
+        else:
+            conditions.append("attribute_not_exists(Approvers)")
+        action = {"Update": {
+            "TableName": TABLE_NAME,
+            "Key": key,
+            "UpdateExpression": "SET Approvers = :approvers, ApprovalStatus = :status REMOVE SlotID",
+            "ConditionExpression": " AND ".join(conditions),
+            "ExpressionAttributeValues": values
+        }}
+        if write_with_slot_release(household_id, item, action):
+            item.pop("SlotID", None)
+            item.update(ApprovalStatus="Rejected", Approvers=approvers)
+            return 200, item
+    return 409, {"message": "Reservation was reviewed concurrently, please retry"}
+
+def condition_failure_item(error):
+    """
+    The stored item DynamoDB hands back (ReturnValuesOnConditionCheckFailure)
+    when a guarded write fails, or None if it is not a condition failure or
+    the item does not exist. Values are in DynamoDB's typed form.
+    """
+    if error.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+        raise error
+    return error.response.get("Item")
+
+def update_reservation_fields(household_id, reservation_id, changes, owner):
+    """SETs the given fields in one UpdateItem guarded on ownership. Returns (status_code, body)."""
+    try:
+        result = table.update_item(
+            Key={"HouseholdID": household_id, "ReservationID": reservation_id},
+            UpdateExpression="SET " + ", ".join(f"#f{i} = :f{i}" for i in range(len(changes))),
+            ConditionExpression="attribute_exists(ReservationID) AND ReservedBy = :owner",
+            ExpressionAttributeNames={f"#f{i}": field for i, field in enumerate(changes)},
+            ExpressionAttributeValues={
+                **{f":f{i}": value for i, value in enumerate(changes.values())},
+                ":owner": owner
+            },
+            ReturnValues="ALL_NEW",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
+        )
+    except ClientError as e:
+        if condition_failure_item(e):
+            return 403, {"message": "You are not allowed to edit this reservation."}
+        return 404, {"message": "Reservation not found"}
+    return 200, result.get("Attributes", {})
+
+def conflict_response(conflict):
+    return 409, {
+        "message": "That space is already booked for part of this time",
+        "conflict": {"ReservationID": conflict["ReservationRef"], "StartTime": conflict["StartTime"], "EndTime": conflict["EndTime"]}
+    }
+
+def create_series(household_id, data):
+    """POST with a Recurrence rule: one item however many weeks it covers."""
+    series_id = SERIES_ID_PREFIX + str(uuid.uuid4())
+    series = {k: v for k, v in data.items() if k not in PROTECTED_FIELDS}
+    try:
+        series.update(
+            HouseholdID=household_id,
+            ReservationID=SERIES_PREFIX + series_id,
+            SeriesID=series_id,
+            RecordType="Series",
+            ReservedBy=data.get("ReservedBy"),
+            ApprovalStatus="Pending",
+            Recurrence=normalize_recurrence(data["Recurrence"]),
+            StartTime=normalize_time(data.get("StartTime")),
+            EndTime=normalize_time(data.get("EndTime"))
+        )
+        save_series(household_id, series)
+    except ValueError as e:
+        return 400, {"message": f"Invalid recurring reservation: {e}"}
+    except ReservationConflict as e:
+        return conflict_response(e.slot)
+    return 201, dict(present_series(series), Approvers=[])
+
+def update_series(household_id, series_id, occurrence_start, changes, owner):
+    """
+    PUT on a series edits its details (not its times). PUT on one
+    occurrence detaches it: the occurrence is cancelled on the series and
+    a one-off reservation with the changes takes its place, in the same
+    transaction and under the usual conflict check.
+    """
+    if occurrence_start is None:
+        if any(field in changes for field in ("SpaceName", "StartTime", "EndTime")):
+            return 400, {"message": "To change a standing booking's times, cancel it and create a new one."}
+        status_code, body = update_reservation_fields(household_id, SERIES_PREFIX + series_id, changes, owner)
+        return status_code, present_series(body) if status_code == 200 else body
+
+    series_key = {"HouseholdID": household_id, "ReservationID": SERIES_PREFIX + series_id}
+    series = table.get_item(Key=series_key, ConsistentRead=True).get("Item")
+    if not series or not is_occurrence(series, occurrence_start):
+        return 404, {"message": "Reservation not found"}
+    if series.get("ReservedBy") != owner:
+        return 403, {"message": "You are not allowed to edit this reservation."}
+
+    duration = parse_time(series["EndTime"]) - parse_time(series["StartTime"])
+    one_off = {k: v for k, v in series.items() if k not in ("Recurrence", "CancelledOccurrences", "RecordType")}
+    one_off.update(StartTime=occurrence_start, EndTime=(parse_time(occurrence_start) + duration).strftime(TIME_FORMAT))
+    one_off.update(changes)
+    one_off.update(ReservationID=str(uuid.uuid4()), HouseholdID=household_id, SeriesID=series_id, OccurrenceStart=occurrence_start)
+
+    cancel_occurrence = {"Update": {
+        "TableName": TABLE_NAME,
+        "Key": series_key,
+        "UpdateExpression": "ADD CancelledOccurrences :occurrence",
+        "ConditionExpression": "attribute_exists(ReservationID) AND ReservedBy = :owner",
+        "ExpressionAttributeValues": {":occurrence": {occurrence_start}, ":owner": owner}
+    }}
+    try:
+        save_reservation(
+            household_id, one_off,
+            extra_actions=[cancel_occurrence],
+            ignore_occurrences={occurrence_id(series, occurrence_start)}
+        )
+    except ValueError as e:
+        return 400, {"message": f"Invalid reservation time: {e}"}
+    except ReservationConflict as e:
+        return conflict_response(e.slot)
+    except ReservationChanged:
+        return 409, {"message": "Reservation was changed concurrently, please retry"}
+    return 200, one_off
+
+def delete_series(household_id, series_id, occurrence_start, owner):
+    """DELETE on an occurrence cancels just that date; on the series removes it entirely."""
+    key = {"HouseholdID": household_id, "ReservationID": SERIES_PREFIX + series_id}
+    try:
+        if occurrence_start is None:
+            table.delete_item(
+                Key=key,
+                ConditionExpression="attribute_exists(ReservationID) AND ReservedBy = :owner",
+                ExpressionAttributeValues={":owner": owner},
+                ReturnValuesOnConditionCheckFailure="ALL_OLD"
+            )
+            return 200, {"message": "Recurring reservation deleted"}
+        table.update_item(
+            Key=key,
+            UpdateExpression="ADD CancelledOccurrences :occurrence",
+            ConditionExpression="attribute_exists(ReservationID) AND ReservedBy = :owner",
+            ExpressionAttributeValues={":occurrence": {occurrence_start}, ":owner": owner},
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
+        )
+        return 200, {"message": "Occurrence cancelled"}
+    except ClientError as e:
+        if condition_failure_item(e):
+            return 403, {"message": "You are not allowed to delete this reservation."}
+        return 404, {"message": "Reservation not found"}
+
+def review_reservation(household_id, reservation_id, action, user_id):
+    """
+    Records an approval or rejection in one guarded UpdateItem: the user is
+    ADDed to the Approvers string set and the status moves on only from
+    Pending/Approved, never for the person who made the booking.
+    Rejections also give up the slot, see reject_reservation.
+    Returns (status_code, body).
+    """
+    key = {"HouseholdID": household_id, "ReservationID": reservation_id}
+    new_status = STATUS_FOR_ACTION[action]
+    if new_status == "Rejected":
+        return reject_reservation(household_id, reservation_id, user_id)
+    try:
+        result = table.update_item(
+            Key=key,
+            UpdateExpression="ADD Approvers :approver SET ApprovalStatus = :status",
+            ConditionExpression=(
+                "attribute_exists(ReservationID) AND ApprovalStatus IN (:pending, :approved) "
+                "AND (attribute_not_exists(ReservedBy) OR ReservedBy <> :user)"
+            ),
+            ExpressionAttributeValues={
+                ":approver": {user_id},
+                ":status": new_status,
+                ":pending": "Pending",
+                ":approved": "Approved",
+                ":user": user_id
+            },
+            ReturnValues="ALL_OLD",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "ValidationException":
+            # Reservations created before Approvers became a set still hold a list
+            return review_legacy_reservation(household_id, reservation_id, action, user_id)
+        item = condition_failure_item(e)
+        if not item:
+            return 404, {"message": "Reservation not found"}
+        if item.get("ReservedBy", {}).get("S") == user_id:
+            return 403, {"message": "You cannot review your own reservation."}
+        return 409, {"message": f"Reservation is already {item.get('ApprovalStatus', {}).get('S', 'closed')}"}
+
+    old = result.get("Attributes", {})
+    updated = dict(old, ApprovalStatus=new_status, Approvers=set(old.get("Approvers") or []) | {user_id})
+    return 200, updated
+
+def review_legacy_reservation(household_id, reservation_id, action, user_id):
+    """
+    One-off conversion for items whose Approvers is still a list: rewrite it
+    as a set, guarded on the list we read, so later reviews take the fast path.
+    """
+    key = {"HouseholdID": household_id, "ReservationID": reservation_id}
+    item = table.get_item(Key=key, ConsistentRead=True).get("Item")
+    if not item:
+        return 404, {"message": "Reservation not found"}
+    if item.get("ReservedBy") == user_id:
+        return 403, {"message": "You cannot review your own reservation."}
+    if item.get("ApprovalStatus", "Pending") not in ("Pending", "Approved"):
+        return 409, {"message": f"Reservation is already {item.get('ApprovalStatus')}"}
+
+    new_status = STATUS_FOR_ACTION[action]
+    approvers = set(item.get("Approvers") or []) | {user_id}
+    try:
+        table.update_item(
+            Key=key,
+            UpdateExpression="SET Approvers = :approvers, ApprovalStatus = :status",
+            ConditionExpression="Approvers = :old_approvers",
+            ExpressionAttributeValues={":approvers": approvers, ":status": new_status, ":old_approvers": item.get("Approvers") or []}
+        )
+    except ClientError as e:
+        condition_failure_item(e)
+        return 409, {"message": "Reservation was reviewed concurrently, please retry"}
+
+    item.update(ApprovalStatus=new_status, Approvers=approvers)
+    return 200, item
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii")
+
+def decode_cursor(text):
+    return json.loads(base64.urlsafe_b64decode(text.encode("ascii")))
+
+def household_spaces(household_id):
+    """Names of every space the household has booked, from the SPACE# items."""
+    query_kwargs = {
+        "KeyConditionExpression": Key("HouseholdID").eq(household_id) & Key("ReservationID").begins_with(SPACE_PREFIX),
+        "ProjectionExpression": "SpaceName"
+    }
+    spaces = []
+    while True:
+        result = table.query(**query_kwargs)
+        spaces.extend(item["SpaceName"] for item in result.get("Items", []))
+        if "LastEvaluatedKey" not in result:
+            return spaces
+        query_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
+def window_slots(household_id, space_name, start, end, after=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Returns (slots, more): up to `limit` of the space's slots overlapping
+    [start, end) in start order, resuming after the (StartTime, slot key)
+    position `after`. The one booking that starts before the window but runs
+    into it is picked up with a Limit-1 predecessor query on the first page.
+    """
+    prefix = f"{SLOT_PREFIX}{space_key(space_name)}#"
+    slots = []
+    if after is None:
+        result = table.query(
+            KeyConditionExpression=Key("HouseholdID").eq(household_id) & Key("ReservationID").between(prefix, prefix + start),
+            ScanIndexForward=False,
+            Limit=1,
+            ConsistentRead=True
+        )
+        slots.extend(slot for slot in result.get("Items", []) if slot["EndTime"] > start)
+        lower = prefix + start
+    else:
+        lower = prefix + after[0]
+
+    query_kwargs = {
+        "KeyConditionExpression": Key("HouseholdID").eq(household_id) & Key("ReservationID").between(lower, prefix + end),
+        "Limit": limit + 1,
+        "ConsistentRead": True
+    }
+    while len(slots) <= limit:
+        result = table.query(**query_kwargs)
+        for slot in result.get("Items", []):
+            if slot["EndTime"] <= start:
+                continue
+            if after is not None and (slot["StartTime"], slot["ReservationID"]) <= tuple(after):
+                continue
+            slots.append(slot)
+        if "LastEvaluatedKey" not in result:
+            return slots[:limit], len(slots) > limit
+        query_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+    return slots[:limit], True
+
+def get_reservations_by_id(household_id, reservation_ids):
+    """BatchGetItem the reservations behind a page of slots, keeping order."""
+    found = {}
+    for i in range(0, len(reservation_ids), 100):
+        request = {TABLE_NAME: {"Keys": [{"HouseholdID": household_id, "ReservationID": rid} for rid in reservation_ids[i:i + 100]]}}
+        while request:
+            result = dynamodb.batch_get_item(RequestItems=request)
+            for item in result.get("Responses", {}).get(TABLE_NAME, []):
+                found[item["ReservationID"]] = item
+            request = result.get("UnprocessedKeys") or None
+    return [found[rid] for rid in reservation_ids if rid in found]
+
+def list_reservations_window(household_id, start, end, space_name=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of the household's bookings overlapping [start, end), ordered
+    by start time. With no SpaceName the per-space slot ranges are merged.
+    """
+    spaces = [space_name] if space_name else household_spaces(household_id)
+    after = decode_cursor(cursor) if cursor else None
+
+    candidates = []
+    more = False
+    for space in spaces:
+        slots, space_more = window_slots(household_id, space, start, end, after=after, limit=limit)
+        candidates.extend(slots)
+        more = more or space_more
+
+    # Standing bookings are expanded here, keyed like slots so they sort and page the same way
+    expand_from = max(start, after[0]) if after else start
+    for series in household_series(household_id, space_name):
+        taken = 0
+        for occurrence_start, occurrence_end in series_occurrences(series, expand_from, end):
+            sort_key = slot_id(series["SpaceName"], occurrence_start, occurrence_id(series, occurrence_start))
+            if after is not None and (occurrence_start, sort_key) <= tuple(after):
+                continue
+            if taken == limit:
+                more = True
+                break
+            candidates.append({
+                "StartTime": occurrence_start,
+                "ReservationID": sort_key,
+                "Occurrence": present_occurrence(series, occurrence_start, occurrence_end)
+            })
+            taken += 1
+    candidates.sort(key=lambda slot: (slot["StartTime"], slot["ReservationID"]))
+
+    page = candidates[:limit]
+    more = more or len(candidates) > limit
+    next_cursor = encode_cursor([page[-1]["StartTime"], page[-1]["ReservationID"]]) if more and page else None
+
+    fetched = {
+        item["ReservationID"]: item
+        for item in get_reservations_by_id(household_id, [slot["ReservationRef"] for slot in page if "Occurrence" not in slot])
+    }
+    reservations = [slot["Occurrence"] if "Occurrence" in slot else fetched.get(slot["ReservationRef"]) for slot in page]
+    return [reservation for reservation in reservations if reservation], next_cursor
+
+def merge_busy(intervals):
+    """Sorts (start, end) pairs and coalesces any that overlap or touch."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+def free_gaps(start, end, busy, min_minutes):
+    """Gaps of at least min_minutes between the coalesced busy intervals in [start, end)."""
+    min_length = timedelta(minutes=min_minutes)
+    gaps = []
+    cursor = start
+    for busy_start, busy_end in busy + [[end, end]]:
+        gap_end = min(busy_start, end)
+        if gap_end > cursor and datetime.strptime(gap_end, TIME_FORMAT) - datetime.strptime(cursor, TIME_FORMAT) >= min_length:
+            gaps.append({"StartTime": cursor, "EndTime": gap_end})
+        cursor = max(cursor, busy_end)
+        if cursor >= end:
+            break
+    return gaps
+
+def space_availability(household_id, space_name, start, end, min_minutes):
+    """
+    Free slots for one space over [start, end), from a time-range read of
+    that space's slot index (pending and approved bookings; rejected ones
+    hold no slot) plus its standing bookings expanded over the window.
+    """
+    intervals = []
+    after = None
+    while True:
+        slots, more = window_slots(household_id, space_name, start, end, after=after, limit=MAX_PAGE_SIZE)
+        intervals.extend((max(slot["StartTime"], start), min(slot["EndTime"], end)) for slot in slots)
+        if not more or not slots:
+            break
+        after = [slots[-1]["StartTime"], slots[-1]["ReservationID"]]
+    for series in household_series(household_id, space_name):
+        intervals.extend(
+            (max(occurrence_start, start), min(occurrence_end, end))
+            for occurrence_start, occurrence_end in series_occurrences(series, start, end)
+        )
+
+    busy = merge_busy(intervals)
+    return {
+        "SpaceName": space_name,
+        "from": start,
+        "to": end,
+        "busy": [{"StartTime": busy_start, "EndTime": busy_end} for busy_start, busy_end in busy],
+        "free": free_gaps(start, end, busy, min_minutes)
+    }
+
+@metrics.invocation
+@idempotency.idempotent(routes={("POST", "/reservations")})
 def lambda_handler(event, context):
-    print("Received event:", json.dumps(event))
+    log.request(event, context)
 
     method = event.get("httpMethod", "")
     path_parameters = event.get("pathParameters") or {}
@@ -17,67 +972,156 @@ def lambda_handler(event, context):
 
     resource_path = event.get("resource", "")
 
-    household_id = query_params.get("HouseholdID")
-    if not household_id:
-        try:
-            body = json.loads(event.get("body") or "{}")
-            household_id = body.get("HouseholdID")
-        except Exception as e:
-            print("Error parsing body for HouseholdID:", e)
+    schema = REQUEST_SCHEMAS.get((method, resource_path))
+    payload = {}
+    try:
+        if schema:
+            payload = schema.parse(event)
+        else:
+            payload = json.loads(event.get("body") or "{}")
+    except ValidationError as e:
+        log.info("request rejected", error=str(e))
+        return respond(e.status_code, {"message": str(e)})
+    except Exception as e:
+        log.warning("invalid request body", error=str(e))
 
+    household_id = query_params.get("HouseholdID") or payload.get("HouseholdID")
     if not household_id:
         return respond(400, {"message": "Missing HouseholdID"})
 
     try:
-        if method == "GET":
-            response = table.query(
-                KeyConditionExpression=Key('HouseholdID').eq(household_id)
-            )
-            reservations = response.get('Items', [])
-            return respond(200, {"reservations": reservations})
+        if method == "GET" and resource_path == "/reservations/availability":
+            space_name = query_params.get("SpaceName")
+            if not space_name:
+                return respond(400, {"message": "Missing SpaceName"})
+            try:
+                start = normalize_time(query_params.get("from")) if query_params.get("from") else datetime.utcnow().strftime(TIME_FORMAT)
+                end = normalize_time(query_params.get("to")) if query_params.get("to") else (datetime.strptime(start, TIME_FORMAT) + timedelta(days=DEFAULT_WINDOW_DAYS)).strftime(TIME_FORMAT)
+                min_minutes = int(query_params.get("duration") or 30)
+            except ValueError as e:
+                return respond(400, {"message": f"Invalid from/to/duration: {e}"})
+            if end <= start or min_minutes <= 0:
+                return respond(400, {"message": "to must be after from and duration must be positive"})
+            if datetime.strptime(end, TIME_FORMAT) - datetime.strptime(start, TIME_FORMAT) > timedelta(days=MAX_AVAILABILITY_DAYS):
+                return respond(400, {"message": f"Availability window is limited to {MAX_AVAILABILITY_DAYS} days"})
+            return respond(200, space_availability(household_id, space_name, start, end, min_minutes))
+
+        elif method == "GET":
+            try:
+                limit = min(int(query_params.get("limit") or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+            except ValueError:
+                return respond(400, {"message": "limit must be a number"})
+            cursor = query_params.get("cursor")
+
+            window_from = query_params.get("from")
+            window_to = query_params.get("to")
+            if window_from or window_to or query_params.get("SpaceName"):
+                try:
+                    start = normalize_time(window_from) if window_from else datetime.utcnow().strftime(TIME_FORMAT)
+                    end = normalize_time(window_to) if window_to else (datetime.strptime(start, TIME_FORMAT) + timedelta(days=DEFAULT_WINDOW_DAYS)).strftime(TIME_FORMAT)
+                    reservations, next_cursor = list_reservations_window(
+                        household_id, start, end,
+                        space_name=query_params.get("SpaceName"),
+                        cursor=cursor,
+                        limit=limit
+                    )
+                except ValueError as e:
+                    return respond(400, {"message": f"Invalid from/to/cursor: {e}"})
+                return respond(200, {"reservations": reservations, "cursor": next_cursor})
+
+            # No window: every reservation the household has, a page at a time
+            query_kwargs = {
+                "KeyConditionExpression": Key('HouseholdID').eq(household_id),
+                "FilterExpression": Attr('RecordType').not_exists() | Attr('RecordType').eq("Series"),
+                "Limit": limit
+            }
+            if cursor:
+                try:
+                    start_key = decode_cursor(cursor)
+                except ValueError:
+                    return respond(400, {"message": "Invalid cursor"})
+                if not isinstance(start_key, dict) or start_key.get("HouseholdID") != household_id:
+                    return respond(400, {"message": "Invalid cursor"})
+                query_kwargs["ExclusiveStartKey"] = start_key
+            response = table.query(**query_kwargs)
+            reservations = [
+                present_series(item) if item.get("RecordType") == "Series" else item
+                for item in response.get('Items', [])
+            ]
+            last_key = response.get("LastEvaluatedKey")
+            return respond(200, {"reservations": reservations, "cursor": encode_cursor(last_key) if last_key else None})
 
         elif method == "POST":
-            data = json.loads(event.get('body') or "{}")
+            data = payload
 
             data['ReservationID'] = str(uuid.uuid4())
             data['HouseholdID'] = household_id
 
             data['ApprovalStatus'] = "Pending"
-            data['Approvers'] = []
+            # Approvers becomes a string set on first review (sets can't be empty)
+            data.pop('Approvers', None)
+            data.pop('RecordType', None)
+
+            if not data.get("SpaceName") or not data.get("StartTime") or not data.get("EndTime"):
+                return respond(400, {"message": "SpaceName, StartTime and EndTime are required"})
+
+            if data.get("Recurrence"):
+                return respond(*create_series(household_id, data))
 
-            table.put_item(Item=data)
+            try:
+                save_reservation(household_id, data)
+            except ValueError as e:
+                return respond(400, {"message": f"Invalid reservation time: {e}"})
+            except ReservationConflict as e:
+                return respond(*conflict_response(e.slot))
+            data['Approvers'] = []
             return respond(201, data)
 
         elif method == "PUT":
             if not reservation_id:
                 return respond(400, {"message": "Missing reservation ID in path"})
 
-            data = json.loads(event.get('body') or "{}")
+            data = payload
 
             requesting_user_id = data.get("RequestUserID")
             if not requesting_user_id:
                 return respond(400, {"message": "Missing RequestUserID in request body"})
 
-            existing_item = table.get_item(
-                Key={"HouseholdID": household_id, "ReservationID": reservation_id}
-            ).get("Item")
+            changes = {k: v for k, v in data.items() if k not in PROTECTED_FIELDS}
+            if not changes:
+                return respond(400, {"message": "No fields provided to update"})
+            key = {"HouseholdID": household_id, "ReservationID": reservation_id}
+
+            series_id, occurrence_start = parse_reservation_id(reservation_id)
+            if series_id:
+                return respond(*update_series(household_id, series_id, occurrence_start, changes, requesting_user_id))
 
+            if not any(field in changes for field in ("SpaceName", "StartTime", "EndTime")):
+                # Nothing that affects the slot: one update guarded on ownership
+                return respond(*update_reservation_fields(household_id, reservation_id, changes, requesting_user_id))
+
+            # Moving the booking needs its current slot, so read it first
+            existing_item = table.get_item(Key=key, ConsistentRead=True).get("Item")
             if not existing_item:
                 return respond(404, {"message": "Reservation not found"})
-
-            if existing_item["ReservedBy"] != requesting_user_id:
+            if existing_item.get("ReservedBy") != requesting_user_id:
                 return respond(403, {"message": "You are not allowed to edit this reservation."})
+            if existing_item.get("ApprovalStatus") == "Rejected":
+                return respond(409, {"message": "Rejected reservations cannot be moved; make a new booking instead."})
 
-            data['ReservationID'] = reservation_id
-            data['HouseholdID'] = household_id
-
-            if 'ApprovalStatus' not in data:
-                data['ApprovalStatus'] = existing_item.get('ApprovalStatus', 'Pending')
-            if 'Approvers' not in data:
-                data['Approvers'] = existing_item.get('Approvers', [])
+            changes["ReservationID"] = reservation_id
+            for field in ("SpaceName", "StartTime", "EndTime"):
+                changes.setdefault(field, existing_item.get(field))
 
-            table.put_item(Item=data)
-            return respond(200, data)
+            try:
+                save_reservation(household_id, changes, previous=existing_item, owner=requesting_user_id)
+            except ValueError as e:
+                return respond(400, {"message": f"Invalid reservation time: {e}"})
+            except ReservationConflict as e:
+                return respond(*conflict_response(e.slot))
+            except ReservationChanged:
+                return respond(409, {"message": "Reservation was changed concurrently, please retry"})
+            return respond(200, dict(existing_item, **changes))
 
         elif method == "DELETE":
             if not reservation_id:
@@ -87,77 +1131,58 @@ def lambda_handler(event, context):
             if not requesting_user_id:
                 return respond(400, {"message": "Missing UserID in query parameters"})
 
-            existing_item = table.get_item(
-                Key={"HouseholdID": household_id, "ReservationID": reservation_id}
-            ).get("Item")
-
-            if not existing_item:
-                return respond(404, {"message": "Reservation not found"})
+            series_id, occurrence_start = parse_reservation_id(reservation_id)
+            if series_id:
+                return respond(*delete_series(household_id, series_id, occurrence_start, requesting_user_id))
 
             # Only allow the original creator to delete
-            if existing_item["ReservedBy"] != requesting_user_id:
-                return respond(403, {"message": "You are not allowed to delete this reservation."})
-
-            table.delete_item(
-                Key={
-                    "HouseholdID": household_id,
-                    "ReservationID": reservation_id
-                }
-            )
-            return respond(200, {"message": "Reservation deleted"})
+            return respond(*delete_reservation(household_id, reservation_id, requesting_user_id))
 
         elif method == "PATCH" and resource_path == "/reservations/{id}/approve":
             # Approve or reject a reservation
             if not reservation_id:
                 return respond(400, {"message": "Missing reservation ID in path"})
-            body_data = json.loads(event.get("body") or "{}")
-            action = body_data.get("Action")  
-            user_id = body_data.get("UserID")
+            action = payload.get("Action")
+            user_id = payload.get("UserID")
 
             if not action or not user_id:
                 return respond(400, {"message": "Missing Action or UserID in request body"})
 
-            existing_item = table.get_item(
-                Key={
-                    "HouseholdID": household_id,
-                    "ReservationID": reservation_id
-                }
-            ).get("Item")
-
-            if not existing_item:
-                return respond(404, {"message": "Reservation not found"})
-
-            approvers = existing_item.get("Approvers", [])
-            if user_id not in approvers:
-                approvers.append(user_id)
-            existing_item["Approvers"] = approvers
-
-            # Approve/Reject
-            if action == "Approve":
-                existing_item["ApprovalStatus"] = "Approved"
-            elif action == "Reject":
-                existing_item["ApprovalStatus"] = "Rejected"
-            else:
+            if action not in STATUS_FOR_ACTION:
                 return respond(400, {"message": "Invalid Action"})
 
-            table.put_item(Item=existing_item)
-            return respond(200, existing_item)
+            # Reviewing any occurrence of a standing booking reviews the whole series
+            series_id, _ = parse_reservation_id(reservation_id)
+            if series_id:
+                status_code, body = review_reservation(household_id, SERIES_PREFIX + series_id, action, user_id)
+                return respond(status_code, present_series(body) if status_code == 200 else body)
+
+            status_code, body = review_reservation(household_id, reservation_id, action, user_id)
+            return respond(status_code, body)
 
         else:
             return respond(405, {"message": f"Method not allowed: {method}"})
 
     except Exception as e:
-        print("Error:", e)
+        log.error("unhandled error", error=str(e))
         return respond(500, {"message": str(e)})
 
-def respond(status_code, body):
-    """Return a JSON response with CORS headers."""
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Credentials": "true"
-        },
-        "body": json.dumps(body)
-    }
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index existing reservations into the per-space slot index.")
+    parser.parse_args()
+
+    scan_kwargs = {"FilterExpression": Attr("RecordType").not_exists() & Attr("SlotID").not_exists()}
+    while True:
+        result = table.scan(**scan_kwargs)
+        for item in result.get("Items", []):
+            if item.get("ApprovalStatus") == "Rejected" or not item.get("SpaceName"):
+                continue
+            fields = {field: item[field] for field in ("ReservationID", "SpaceName", "StartTime", "EndTime")}
+            try:
+                save_reservation(item["HouseholdID"], fields, previous=item)
+                print("Indexed", item["HouseholdID"], item["ReservationID"])
+            except (ValueError, KeyError, ReservationConflict, ReservationChanged) as e:
+                print("Skipped", item["HouseholdID"], item["ReservationID"], "-", e)
+        if "LastEvaluatedKey" not in result:
+            break
+        scan_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
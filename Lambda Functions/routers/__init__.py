@@ -0,0 +1,5 @@
+"""
+Per-domain entry points: one deployable function per group of handlers,
+dispatching on the API Gateway `resource` and `httpMethod`. See
+routers/routes.py for the route table and the domains.
+"""
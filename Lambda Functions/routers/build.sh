@@ -0,0 +1,13 @@
+#!/bin/sh
+# Builds one deployment zip per domain router (routers-<domain>.zip): the
+# routers package plus that domain's handler modules. Deploy each with
+# handler routers.<domain>.lambda_handler and the flatchat layer attached.
+set -e
+cd "$(dirname "$0")/.."
+rm -rf routers/dist
+mkdir -p routers/dist
+for domain in $(python -c "from routers.routes import DOMAINS; print(' '.join(DOMAINS))"); do
+    modules=$(python -c "from routers.routes import DOMAINS; print(' '.join(m + '.py' for m in DOMAINS['$domain']))")
+    zip -q "routers/dist/routers-$domain.zip" routers/*.py $modules
+    echo "Built $(pwd)/routers/dist/routers-$domain.zip"
+done
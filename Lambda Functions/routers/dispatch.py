@@ -0,0 +1,49 @@
+"""
+Dispatch for a router function. API Gateway already resolved the route,
+so dispatch is a dict lookup on (httpMethod, resource). Handler modules
+are imported on first use: a cold container pays only for the handler
+its first request needs, and later ones load into the warm process,
+reusing its session, clients and caches.
+"""
+import threading
+
+from flatchat import log
+from flatchat.http import preflight, respond
+from routers.routes import ANY, DOMAINS, domain_routes, load_handler
+
+
+class Dispatcher:
+    def __init__(self, routes):
+        self.routes = {(method, resource): module for method, resource, module in routes}
+        self.resources = {resource for _, resource, _ in routes}
+        self.handlers = {}
+        self._lock = threading.Lock()
+
+    def handler(self, module):
+        found = self.handlers.get(module)
+        if found is None:
+            with self._lock:
+                found = self.handlers.get(module)
+                if found is None:
+                    found = self.handlers[module] = load_handler(module)
+        return found
+
+    def __call__(self, event, context):
+        method = event.get("httpMethod", "")
+        resource = event.get("resource", "")
+        module = self.routes.get((method, resource)) or self.routes.get((ANY, resource))
+        if module is None:
+            log.request(event, context)
+            if resource not in self.resources:
+                return respond(404, {"message": "Not Found"})
+            if method == "OPTIONS":
+                return preflight()
+            return respond(405, {"message": f"Method not allowed: {method}"})
+        return self.handler(module)(event, context)
+
+
+def for_domain(domain):
+    """The lambda_handler for one of routers.routes.DOMAINS."""
+    if domain not in DOMAINS:
+        raise ValueError(f"Unknown domain: {domain}")
+    return Dispatcher(domain_routes(domain))
@@ -0,0 +1,4 @@
+"""Router function for the household handlers; deploy with handler routers.household.lambda_handler."""
+from routers.dispatch import for_domain
+
+lambda_handler = for_domain("household")
@@ -0,0 +1,86 @@
+"""
+The API Gateway routes the frontend calls, the handler module behind each,
+and the domain whose router function serves it. Resources use API
+Gateway's {param} syntax, as the handlers see them in `resource`.
+"""
+import importlib.util
+import os
+
+ANY = "ANY"
+
+ROUTES = [
+    # Users and households
+    ("POST", "/create-user", "create_user"),
+    ("POST", "/read-user", "read_user"),
+    ("PUT", "/update-user", "update_user"),
+    ("POST", "/create-household", "create_household"),
+    ("POST", "/join-household", "join_household"),
+    ("GET", "/household-users", "get_household_users"),
+    ("POST", "/household-users", "manage_household_admins"),
+    ("DELETE", "/household-users", "remove_household_member"),
+
+    # Household features
+    (ANY, "/bills", "bills_handler"),
+    (ANY, "/bills/import", "bills_handler"),
+    (ANY, "/bills/summary", "bills_handler"),
+    (ANY, "/bills/export", "bills_handler"),
+    (ANY, "/bills/rollups/rebuild", "bills_handler"),
+    (ANY, "/bills/{id}", "bills_handler"),
+    (ANY, "/notices", "householdNotices"),
+    (ANY, "/notices/{id}", "householdNotices"),
+    (ANY, "/reservations", "reservations"),
+    (ANY, "/reservations/availability", "reservations"),
+    (ANY, "/reservations/{id}", "reservations"),
+    (ANY, "/reservations/{id}/approve", "reservations"),
+    (ANY, "/shopping-lists", "shopping_list"),
+    (ANY, "/shopping-lists/catalog", "shopping_list"),
+    (ANY, "/shopping-lists/catalog/rebuild", "shopping_list"),
+    (ANY, "/shopping-lists/{id}", "shopping_list"),
+    (ANY, "/shopping-lists/{id}/sync", "shopping_list"),
+    ("GET", "/tasks", "get_tasks"),
+    ("POST", "/tasks", "add_task"),
+    ("PUT", "/tasks/{taskID}", "update_task"),
+    ("DELETE", "/tasks/{taskID}", "delete_task"),
+
+    # Social feed
+    ("POST", "/create-post", "createPost"),
+    ("GET", "/get-posts", "getPosts"),
+    ("GET", "/get-posts/{postID}", "get-post"),
+    ("DELETE", "/delete-post", "deletePost"),
+    ("POST", "/like-post", "likePost"),
+    ("POST", "/create-comment", "createComment"),
+    ("GET", "/get-comments/{postID}", "getComments"),
+]
+
+# Which router function serves each handler module. Handlers a session
+# tends to call together share a domain, so they share warm containers,
+# clients and caches (profiles, catalogue, pooled connections).
+DOMAINS = {
+    "users": ("create_user", "read_user", "update_user", "create_household", "join_household",
+              "get_household_users", "manage_household_admins", "remove_household_member"),
+    "tasks": ("get_tasks", "add_task", "update_task", "delete_task"),
+    "social": ("createPost", "getPosts", "get-post", "deletePost", "likePost", "createComment", "getComments"),
+    "household": ("bills_handler", "householdNotices", "reservations", "shopping_list"),
+}
+
+HANDLERS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def domain_of(module):
+    for domain, modules in DOMAINS.items():
+        if module in modules:
+            return domain
+    return None
+
+
+def domain_routes(domain):
+    return [route for route in ROUTES if route[2] in DOMAINS[domain]]
+
+
+def load_handler(module):
+    """Imports `<module>.py` from the handlers directory and returns its lambda_handler."""
+    spec = importlib.util.spec_from_file_location(
+        module.replace("-", "_"), os.path.join(HANDLERS_DIR, f"{module}.py"))
+    loaded = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(loaded)
+    return loaded.lambda_handler
@@ -0,0 +1,4 @@
+"""Router function for the social handlers; deploy with handler routers.social.lambda_handler."""
+from routers.dispatch import for_domain
+
+lambda_handler = for_domain("social")
@@ -0,0 +1,4 @@
+"""Router function for the tasks handlers; deploy with handler routers.tasks.lambda_handler."""
+from routers.dispatch import for_domain
+
+lambda_handler = for_domain("tasks")
@@ -0,0 +1,4 @@
+"""Router function for the users handlers; deploy with handler routers.users.lambda_handler."""
+from routers.dispatch import for_domain
+
+lambda_handler = for_domain("users")
@@ -1,37 +1,689 @@
 import os
 import json
+import time
 import uuid
-from decimal import Decimal
-import boto3
+import heapq
+from bisect import bisect_left
+from collections import OrderedDict
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
+from flatchat.http import respond, preflight, not_modified, validator_headers
+from flatchat import aws, log, metrics, versioning
+from flatchat.validation import Boolean, List, Number, Object, Schema, String, ValidationError
 
-dynamodb = boto3.resource('dynamodb', region_name='eu-west-1')
+dynamodb = aws.resource('dynamodb', region_name='eu-west-1')
 TABLE_NAME = os.environ.get('SHOPPING_LISTS_TABLE', 'ShoppingLists')
-table = dynamodb.Table(TABLE_NAME)
+table = aws.table(TABLE_NAME, region_name='eu-west-1')
 
+# Per-household version marker, bumped in the same transaction as every
+# list write. Lists carry the Version they were written at and the sparse
+# (HouseholdID, Version) GSI serves "changes since" reads; deleted lists
+# are kept as tombstones on the marker (newest MAX_TOMBSTONES only).
+VERSION_ID = '#VERSION'
+VERSION_INDEX = os.environ.get('SHOPPING_LISTS_VERSION_INDEX', 'HouseholdID-Version-index')
+MAX_TOMBSTONES = 100
+MAX_WRITE_ATTEMPTS = 3
+
+# Products are stored in a ProductMap keyed by ProductID so single products
+# can be changed with targeted update paths; clients still see a Products
+# array ordered by Position. Lists written before this keep a Products
+# array until their first product operation converts them.
+PRODUCT_OPS = ("add", "remove", "setQuantity", "check", "uncheck")
+MAX_OPS_PER_REQUEST = 50
+
+# Offline sync: every product field is a last-writer-wins register whose
+# stamp is kept in the list's Clock map under "<ProductID>/<field>".
+# Removes leave a Deleted tombstone (pruned after TOMBSTONE_RETENTION_MS)
+# and SyncVector maps each replica to the last op seq applied from it.
+SERVER_REPLICA = "server"
+UNCLOCKED_FIELDS = ("ProductID", "Position", "UpdatedAt", "Version")
+SYNC_ATTRIBUTES = ("Clock", "SyncVector", "PrunedVersion")
+MAX_SYNC_OPS = 500
+TOMBSTONE_RETENTION_MS = 30 * 24 * 3600 * 1000
+
+# Per-household product catalogue, one #CATALOG item holding maps keyed by
+# normalized product name: Names (display name), Added and Purchased
+# (counts). It is bumped best-effort after list writes and served from a
+# prefix index cached per warm container.
+CATALOG_ID = '#CATALOG'
+CATALOG_CACHE_SECONDS = int(os.environ.get('CATALOG_CACHE_SECONDS', '60'))
+CATALOG_CACHE_SIZE = 256
+MAX_UPDATE_EXPRESSION_BYTES = 4000
+DEFAULT_SUGGESTIONS = 10
+MAX_SUGGESTIONS = 50
+_catalog_cache = OrderedDict()
+
+# Whole-list writes (POST/PUT). Version and sync bookkeeping are the
+# server's, so they are dropped; PATCH and sync bodies are checked by
+# collapse_ops and validate_sync_ops.
+PRODUCT_FIELDS = {
+    "ProductID": String(max_length=64),
+    "Name": String(max_length=200, required=True),
+    "Purchased": Boolean(),
+    "Quantity": Number(minimum=0, maximum=10_000),
+    "Position": Number(minimum=0, integer=True),
+    "addedBy": String(max_length=200),
+}
+LIST_WRITE = Schema({
+    "HouseholdID": String(max_length=128),
+    "Title": String(max_length=200),
+    "Products": List(Object(PRODUCT_FIELDS), max_items=500),
+}, max_bytes=256 * 1024)
+
+# One product operation, as sent in PATCH ops (check ops may carry the
+# product's Name for the catalogue)
+PRODUCT_OP = Object({
+    "op": String(max_length=16, choices=PRODUCT_OPS, required=True),
+    "ProductID": String(max_length=64),
+    "Name": String(max_length=200),
+    "Quantity": Number(minimum=1, maximum=10_000, integer=True),
+    "product": Object(PRODUCT_FIELDS),
+}).compile("ops[]")
+REQUEST_SCHEMAS = {
+    ("POST", "/shopping-lists"): LIST_WRITE,
+    ("PUT", "/shopping-lists/{id}"): LIST_WRITE,
+}
+
+class ListNotFound(Exception):
+    pass
+
+class ListChanged(Exception):
+    pass
+
+def is_marker(item):
+    return item["ListID"].startswith("#")
+
+VERSIONS = versioning.Marker(TABLE_NAME, marker_key={"ListID": VERSION_ID}, region_name='eu-west-1',
+                             max_tombstones=MAX_TOMBSTONES, max_attempts=MAX_WRITE_ATTEMPTS)
+
+def read_version(household_id, consistent=False):
+    return VERSIONS.read(household_id, consistent=consistent)
+
+def write_versioned(household_id, build_actions, removed_id=None):
+    """Runs build_actions(version) together with the marker bump, retrying when another write wins."""
+    return VERSIONS.write(household_id, build_actions, removed_id=removed_id)
+
+def make_stamp(ms, seq, replica):
+    """LWW stamps are strings that sort in (time, seq, replica) order."""
+    return f"{int(ms):013d}:{int(seq):09d}:{replica}"
+
+def server_stamp(now_ms):
+    return make_stamp(now_ms, 0, SERVER_REPLICA)
+
+def clock_key(product_id, field):
+    return f"{product_id}/{field}"
+
+def register_fields(product):
+    return [field for field in product if field not in UNCLOCKED_FIELDS]
+
+def to_product_map(products, clock, stamp):
+    """Builds a ProductMap from a Products array, stamping every field in `clock`."""
+    product_map = {}
+    for position, product in enumerate(products or []):
+        product = dict(product)
+        product.setdefault("ProductID", str(uuid.uuid4()))
+        product.setdefault("Position", position)
+        product.setdefault("Deleted", False)
+        product_map[product["ProductID"]] = product
+        for field in register_fields(product):
+            clock[clock_key(product["ProductID"], field)] = stamp
+    return product_map
+
+def present_product(product):
+    if product.get("Deleted"):
+        return {"ProductID": product["ProductID"], "Deleted": True}
+    return {k: v for k, v in product.items() if k != "Deleted"}
+
+def present_list(item):
+    """Turns a stored list back into the Products-array shape clients use, without sync bookkeeping."""
+    item = {k: v for k, v in item.items() if k not in SYNC_ATTRIBUTES}
+    if "ProductMap" not in item:
+        return item
+    products = [p for p in item.pop("ProductMap").values() if not p.get("Deleted")]
+    item["Products"] = [present_product(p) for p in sorted(products, key=lambda p: (p.get("Position", 0), p["ProductID"]))]
+    return item
+
+def put_list(shopping_list, previous=None):
+    """
+    Writes a whole list (POST/PUT), storing its products as a ProductMap.
+    `previous` is the stored item being replaced, used for catalogue counts.
+    """
+    item = {k: v for k, v in shopping_list.items() if k not in SYNC_ATTRIBUTES}
+    item["Clock"] = {}
+    item["ProductMap"] = to_product_map(item.pop("Products", []), item["Clock"], server_stamp(time.time() * 1000))
+    before = (previous or {}).get("ProductMap") or to_product_map((previous or {}).get("Products"), {}, "")
+
+    def build_actions(version):
+        item["Version"] = version
+        # Replacing the list drops its tombstones, so replicas must resync in full
+        item["PrunedVersion"] = version
+        for product in item["ProductMap"].values():
+            product["Version"] = version
+        return [{"Put": {"TableName": TABLE_NAME, "Item": item}}]
+    write_versioned(item["HouseholdID"], build_actions)
+    record_catalog(item["HouseholdID"], *catalog_changes(before, item["ProductMap"]))
+    return present_list(item)
+
+def collapse_ops(ops, now):
+    """
+    Folds a batch of product operations into one change per product, in
+    request order, so each product path appears once in the update.
+    Changes are ("put", product) or ("fields", values); a remove sets the
+    Deleted tombstone so offline replicas learn about it on sync.
+    """
+    changes = {}
+    removed = set()
+    for op in ops:
+        kind = op["op"]
+        if kind == "add":
+            product = dict(op.get("product") or {})
+            if not product.get("Name", "").strip():
+                raise ValueError("add needs a product Name")
+            product.setdefault("ProductID", str(uuid.uuid4()))
+            product.setdefault("Purchased", False)
+            product.setdefault("Quantity", 1)
+            product["Deleted"] = False
+            product["Position"] = now
+            product["UpdatedAt"] = now
+            changes[product["ProductID"]] = ("put", product)
+            removed.discard(product["ProductID"])
+            continue
+
+        product_id = op.get("ProductID")
+        if not product_id:
+            raise ValueError(f"{kind} needs a ProductID")
+        if product_id in removed:
+            continue
+        if kind == "remove":
+            fields = {"Deleted": True}
+            removed.add(product_id)
+        elif kind == "setQuantity":
+            if op.get("Quantity") is None:
+                raise ValueError("setQuantity needs a Quantity")
+            fields = {"Quantity": op["Quantity"]}
+        else:
+            fields = {"Purchased": kind == "check"}
+        fields["UpdatedAt"] = now
+
+        previous_kind, previous = changes.get(product_id, ("fields", {}))
+        changes[product_id] = (previous_kind, {**previous, **fields})
+    return changes
+
+def product_update(household_id, list_id, changes, version, stamp):
+    """
+    One UpdateItem touching only the changed products' paths (and their
+    clock entries). Field changes require the product to still exist, so a
+    tick on a product that was never synced here fails the condition
+    instead of creating a partial product.
+    """
+    sets = ["Version = :version"]
+    conditions = ["attribute_exists(ProductMap)", "attribute_exists(Clock)"]
+    names = {}
+    values = {":version": version, ":stamp": stamp}
+    for i, (product_id, (kind, value)) in enumerate(changes.items()):
+        names[f"#p{i}"] = product_id
+        if kind == "put":
+            sets.append(f"ProductMap.#p{i} = :p{i}")
+            values[f":p{i}"] = {**value, "Version": version}
+        else:
+            conditions.append(f"attribute_exists(ProductMap.#p{i})")
+            for field, field_value in {**value, "Version": version}.items():
+                sets.append(f"ProductMap.#p{i}.#{field} = :p{i}{field}")
+                names[f"#{field}"] = field
+                values[f":p{i}{field}"] = field_value
+        for j, field in enumerate(register_fields(value)):
+            sets.append(f"Clock.#c{i}_{j} = :stamp")
+            names[f"#c{i}_{j}"] = clock_key(product_id, field)
+    return {"Update": {
+        "TableName": TABLE_NAME,
+        "Key": {"HouseholdID": household_id, "ListID": list_id},
+        "UpdateExpression": "SET " + ", ".join(sets),
+        "ConditionExpression": " AND ".join(conditions),
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values
+    }}
+
+def convert_legacy_list(item):
+    """
+    Moves a list's Products array into a ProductMap and gives it a Clock
+    (no-op if another request already did).
+    """
+    key = {"HouseholdID": item["HouseholdID"], "ListID": item["ListID"]}
+    stamp = server_stamp(time.time() * 1000)
+    try:
+        if "ProductMap" not in item:
+            clock = {}
+            table.update_item(
+                Key=key,
+                UpdateExpression="SET ProductMap = :map, Clock = :clock REMOVE Products",
+                ConditionExpression="attribute_exists(ListID) AND attribute_not_exists(ProductMap)",
+                ExpressionAttributeValues={":map": to_product_map(item.get("Products"), clock, stamp), ":clock": clock}
+            )
+        else:
+            clock = {}
+            for product_id, product in item["ProductMap"].items():
+                for field in register_fields(product):
+                    clock[clock_key(product_id, field)] = stamp
+            table.update_item(
+                Key=key,
+                UpdateExpression="SET Clock = :clock",
+                ConditionExpression="attribute_exists(ListID) AND attribute_not_exists(Clock)",
+                ExpressionAttributeValues={":clock": clock}
+            )
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+
+def apply_product_ops(household_id, list_id, ops):
+    """
+    Applies a batch of product operations as one versioned write, stamped
+    with the server clock. Ops on products that do not exist are dropped
+    and reported as skipped.
+    """
+    now = int(time.time() * 1000)
+    ops = [PRODUCT_OP(op) for op in ops]
+    changes = collapse_ops(ops, now)
+    skipped = []
+    for attempt in range(MAX_WRITE_ATTEMPTS + 1):
+        if not changes:
+            return {"applied": [], "skipped": skipped, "version": None}
+        try:
+            version = write_versioned(household_id, lambda v: [product_update(household_id, list_id, changes, v, server_stamp(now))])
+            record_op_catalog(household_id, list_id, ops, changes)
+            return {"applied": list(changes), "skipped": skipped, "version": version}
+        except ClientError as e:
+            reasons = e.response.get("CancellationReasons") or []
+            if not reasons or reasons[0].get("Code") != "ConditionalCheckFailed" or attempt == MAX_WRITE_ATTEMPTS:
+                raise
+        item = table.get_item(Key={"HouseholdID": household_id, "ListID": list_id}, ConsistentRead=True).get("Item")
+        if not item or is_marker(item):
+            raise ListNotFound()
+        if "ProductMap" not in item or "Clock" not in item:
+            convert_legacy_list(item)
+            continue
+        for product_id, (kind, value) in list(changes.items()):
+            if kind == "fields" and product_id not in item["ProductMap"]:
+                skipped.append(product_id)
+                del changes[product_id]
+
+def record_op_catalog(household_id, list_id, ops, changes):
+    """
+    Catalogue counts for applied PATCH ops. Check ops may carry the
+    product's Name; otherwise it is looked up from the list.
+    """
+    added = [value["Name"] for kind, value in changes.values() if kind == "put"]
+    checked = {op["ProductID"]: op.get("Name") for op in ops
+               if op.get("op") == "check" and changes.get(op["ProductID"], ("", {}))[1].get("Purchased")}
+    unnamed = [product_id for product_id, name in checked.items() if not name]
+    if unnamed:
+        names = {f"#p{i}": product_id for i, product_id in enumerate(unnamed)}
+        names["#name"] = "Name"
+        try:
+            item = table.get_item(
+                Key={"HouseholdID": household_id, "ListID": list_id},
+                ProjectionExpression=", ".join(f"ProductMap.#p{i}.#name" for i in range(len(unnamed))),
+                ExpressionAttributeNames=names
+            ).get("Item") or {}
+            for product_id, product in (item.get("ProductMap") or {}).items():
+                checked[product_id] = product.get("Name")
+        except ClientError as e:
+            log.warning("catalogue name lookup failed", error=str(e))
+    record_catalog(household_id, added, [name for name in checked.values() if name])
+
+def op_fields(op):
+    """The register values a sync op writes, or None for an op that cannot apply."""
+    kind = op.get("op")
+    if kind == "add":
+        product = {k: v for k, v in (op.get("product") or {}).items() if k not in UNCLOCKED_FIELDS}
+        product.setdefault("Purchased", False)
+        product.setdefault("Quantity", 1)
+        product["Deleted"] = False
+        return product
+    if kind == "remove":
+        return {"Deleted": True}
+    if kind == "setQuantity":
+        return {"Quantity": op["Quantity"]}
+    return {"Purchased": kind == "check"}
+
+def validate_sync_ops(ops):
+    if not isinstance(ops, list) or len(ops) > MAX_SYNC_OPS:
+        raise ValueError(f"ops must be a list of at most {MAX_SYNC_OPS} operations")
+    checked = []
+    for op in ops:
+        clean = PRODUCT_OP(op)
+        seq, ts = op.get("seq"), op.get("ts")
+        if not isinstance(seq, int) or isinstance(seq, bool) or seq < 1 or not isinstance(ts, int) or isinstance(ts, bool):
+            raise ValueError("Every op needs an integer seq (from 1) and ts (epoch ms)")
+        product_id = clean.get("ProductID") or (clean.get("product") or {}).get("ProductID")
+        if not product_id:
+            raise ValueError("Every op needs a ProductID")
+        if clean["op"] == "add" and not clean.get("product", {}).get("Name", "").strip():
+            raise ValueError("add needs a product Name")
+        if clean["op"] == "setQuantity" and clean.get("Quantity") is None:
+            raise ValueError("setQuantity needs a Quantity")
+        checked.append({**clean, "seq": seq, "ts": ts})
+    return sorted(checked, key=lambda op: op["seq"])
+
+def merge_ops(item, replica, ops, now):
+    """
+    Merges a replica's ops into the stored list in memory. Each product
+    field is a last-writer-wins register whose stamp lives in Clock; an op
+    only wins a register whose current stamp is older. Ops already covered
+    by the replica's entry in SyncVector are replays and are ignored.
+    Returns the IDs of products whose state changed.
+    """
+    product_map = item["ProductMap"]
+    clock = item["Clock"]
+    vector = item.setdefault("SyncVector", {})
+    changed = set()
+    for op in ops:
+        if op["seq"] <= vector.get(replica, 0):
+            continue
+        vector[replica] = op["seq"]
+        # Clients may not write into the future; their clock is clamped to ours
+        stamp = make_stamp(min(op["ts"], now), op["seq"], replica)
+        product_id = op.get("ProductID") or op["product"]["ProductID"]
+        product = product_map.get(product_id)
+        if product is None:
+            if op["op"] != "add":
+                continue
+            product = product_map[product_id] = {"ProductID": product_id, "Position": min(op["ts"], now)}
+        for field, value in op_fields(op).items():
+            key = clock_key(product_id, field)
+            if stamp > clock.get(key, ""):
+                clock[key] = stamp
+                product[field] = value
+                product["UpdatedAt"] = now
+                changed.add(product_id)
+    return changed
+
+def prune_tombstones(item, now):
+    """Drops tombstones older than TOMBSTONE_RETENTION_MS, returning whether any were dropped."""
+    product_map = item["ProductMap"]
+    clock = item["Clock"]
+    horizon = server_stamp(now - TOMBSTONE_RETENTION_MS)
+    stale = [pid for pid, product in product_map.items()
+             if product.get("Deleted") and clock.get(clock_key(pid, "Deleted"), "") < horizon]
+    for product_id in stale:
+        for field in register_fields(product_map.pop(product_id)):
+            clock.pop(clock_key(product_id, field), None)
+    return bool(stale)
+
+def sync_list(household_id, list_id, replica, ops, since):
+    """
+    Pushes a replica's queued ops and returns the merged state it is
+    missing: the products changed after version `since` (tombstones
+    included), the list version to send next time, and the version vector
+    telling the replica which of its ops are now applied.
+    The merge is written back guarded on the list Version, so concurrent
+    PATCH ops or syncs make us re-read and re-merge rather than clobber.
+    """
+    for attempt in range(MAX_WRITE_ATTEMPTS + 1):
+        item = table.get_item(Key={"HouseholdID": household_id, "ListID": list_id}, ConsistentRead=True).get("Item")
+        if not item or is_marker(item):
+            raise ListNotFound()
+        if "ProductMap" not in item or "Clock" not in item:
+            convert_legacy_list(item)
+            continue
+
+        now = int(time.time() * 1000)
+        read_version = item.get("Version")
+        vector_before = dict(item.get("SyncVector") or {})
+        products_before = {pid: dict(p) for pid, p in item["ProductMap"].items()}
+        changed = merge_ops(item, replica, ops, now)
+        pruned = prune_tombstones(item, now)
+        if changed or pruned or item["SyncVector"] != vector_before:
+            def build_actions(version):
+                for product_id in changed:
+                    item["ProductMap"][product_id]["Version"] = version
+                if pruned:
+                    item["PrunedVersion"] = version
+                item["Version"] = version
+                return [{"Update": {
+                    "TableName": TABLE_NAME,
+                    "Key": {"HouseholdID": household_id, "ListID": list_id},
+                    "UpdateExpression": "SET ProductMap = :map, Clock = :clock, SyncVector = :vector, "
+                                        "PrunedVersion = :pruned, Version = :version",
+                    "ConditionExpression": "Version = :read" if read_version is not None else "attribute_not_exists(Version)",
+                    "ExpressionAttributeValues": {
+                        ":map": item["ProductMap"],
+                        ":clock": item["Clock"],
+                        ":vector": item["SyncVector"],
+                        ":pruned": item.get("PrunedVersion", 0),
+                        ":version": version,
+                        **({":read": read_version} if read_version is not None else {})
+                    }
+                }}]
+            try:
+                write_versioned(household_id, build_actions)
+            except ClientError as e:
+                reasons = e.response.get("CancellationReasons") or []
+                if not reasons or reasons[0].get("Code") != "ConditionalCheckFailed" or attempt == MAX_WRITE_ATTEMPTS:
+                    raise
+                continue
+            record_catalog(household_id, *catalog_changes(
+                {pid: products_before[pid] for pid in changed if pid in products_before},
+                {pid: item["ProductMap"][pid] for pid in changed}
+            ))
+
+        full = since is None or since < int(item.get("PrunedVersion", 0))
+        products = [present_product(p) for p in item["ProductMap"].values()
+                    if (full and not p.get("Deleted")) or (not full and int(p.get("Version", 0)) > since)]
+        return {
+            "ListID": list_id,
+            "Title": item.get("Title"),
+            "version": int(item.get("Version", 0)),
+            "vector": item["SyncVector"],
+            "full": full,
+            "products": products
+        }
+    raise ListChanged()
+
+def normalize_name(name):
+    return " ".join(str(name).lower().split())
+
+def catalog_changes(before, after):
+    """
+    Compares two ProductMaps and returns the product names that were added
+    and the ones that went from unpurchased to purchased.
+    """
+    added, purchased = [], []
+    for product_id, product in after.items():
+        if product.get("Deleted") or not product.get("Name"):
+            continue
+        old = before.get(product_id)
+        if old is None or old.get("Deleted"):
+            added.append(product["Name"])
+        if product.get("Purchased") and not (old and not old.get("Deleted") and old.get("Purchased")):
+            purchased.append(product["Name"])
+    return added, purchased
+
+def catalog_updates(counts):
+    """
+    Yields (sets, names, values) for the catalogue count updates, grouped
+    so each UpdateExpression stays under DynamoDB's 4 KB expression limit.
+    """
+    # Names is a reserved word, so the maps are always aliased
+    sets, names, values = [], {"#names": "Names"}, {":zero": 0}
+    length = len("SET ")
+    for i, (key, entry) in enumerate(counts.items()):
+        clauses = [f"#names.#n{i} = :name{i}"]
+        for field in ("Added", "Purchased"):
+            if entry[field]:
+                alias = f"#{field.lower()}"
+                clauses.append(f"{alias}.#n{i} = if_not_exists({alias}.#n{i}, :zero) + :{field}{i}")
+        added_length = sum(len(clause) + len(", ") for clause in clauses)
+        if sets and length + added_length > MAX_UPDATE_EXPRESSION_BYTES:
+            yield sets, names, values
+            sets, names, values = [], {"#names": "Names"}, {":zero": 0}
+            length = len("SET ")
+        sets.extend(clauses)
+        length += added_length
+        names[f"#n{i}"] = key
+        values[f":name{i}"] = entry["Name"]
+        for field in ("Added", "Purchased"):
+            if entry[field]:
+                names[f"#{field.lower()}"] = field
+                values[f":{field}{i}"] = entry[field]
+    if sets:
+        yield sets, names, values
+
+def update_catalog(key, sets, names, values):
+    for attempt in range(2):
+        try:
+            table.update_item(
+                Key=key,
+                UpdateExpression="SET " + ", ".join(sets),
+                ConditionExpression="attribute_exists(#names)",
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+            return
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException" or attempt:
+                raise
+        # First entry for this household: create the empty maps, then retry
+        try:
+            table.put_item(
+                Item={**key, "Names": {}, "Added": {}, "Purchased": {}},
+                ConditionExpression="attribute_not_exists(ListID)"
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+
+def record_catalog(household_id, added=(), purchased=(), raise_errors=False):
+    """
+    Bumps the catalogue counts for the given product names. Failures are
+    logged, never raised, unless raise_errors is set.
+    """
+    counts = {}
+    for field, names in (("Added", added), ("Purchased", purchased)):
+        for name in names:
+            key = normalize_name(name)
+            if key:
+                entry = counts.setdefault(key, {"Name": str(name).strip(), "Added": 0, "Purchased": 0})
+                entry[field] += 1
+    if not counts:
+        return
+
+    key = {"HouseholdID": household_id, "ListID": CATALOG_ID}
+    try:
+        for sets, names, values in catalog_updates(counts):
+            update_catalog(key, sets, names, values)
+    except Exception as e:
+        if raise_errors:
+            raise
+        log.warning("catalogue update failed", error=str(e))
+    finally:
+        _catalog_cache.pop(household_id, None)
+
+class CatalogIndex:
+    """
+    Sorted array of every word-start suffix of every product name, so a
+    prefix lookup is two bisects. "milk" matches both "milk" and
+    "oat milk". Matches are ranked by purchases, then additions.
+    """
+
+    def __init__(self, catalog):
+        self.names = catalog.get("Names") or {}
+        self.added = catalog.get("Added") or {}
+        self.purchased = catalog.get("Purchased") or {}
+        suffixes = []
+        for key in self.names:
+            words = key.split(" ")
+            suffixes.extend((" ".join(words[i:]), key) for i in range(len(words)))
+        suffixes.sort()
+        self.suffixes = [suffix for suffix, _ in suffixes]
+        self.keys = [key for _, key in suffixes]
+
+    def suggest(self, prefix, limit):
+        prefix = normalize_name(prefix)
+        lo = bisect_left(self.suffixes, prefix)
+        hi = bisect_left(self.suffixes, prefix + "\uffff")
+        matches = set(self.keys[lo:hi])
+        ranked = heapq.nsmallest(limit, matches, key=lambda k: (-self.purchased.get(k, 0), -self.added.get(k, 0), k))
+        return [{
+            "Name": self.names[k],
+            "Purchased": int(self.purchased.get(k, 0)),
+            "Added": int(self.added.get(k, 0))
+        } for k in ranked]
+
+def catalog_index(household_id):
+    """The household's CatalogIndex, reloaded once it is older than CATALOG_CACHE_SECONDS."""
+    cached = _catalog_cache.get(household_id)
+    if cached and time.time() - cached[0] < CATALOG_CACHE_SECONDS:
+        _catalog_cache.move_to_end(household_id)
+        return cached[1]
+    catalog = table.get_item(Key={"HouseholdID": household_id, "ListID": CATALOG_ID}).get("Item") or {}
+    index = CatalogIndex(catalog)
+    _catalog_cache[household_id] = (time.time(), index)
+    while len(_catalog_cache) > CATALOG_CACHE_SIZE:
+        _catalog_cache.popitem(last=False)
+    return index
+
+def rebuild_catalog(household_id):
+    """Seeds the catalogue from the household's existing lists (counts every current product once)."""
+    added, purchased = [], []
+    for item in query_all(KeyConditionExpression=Key("HouseholdID").eq(household_id)):
+        if is_marker(item):
+            continue
+        for product in present_list(item).get("Products", []):
+            if product.get("Name"):
+                added.append(product["Name"])
+                if product.get("Purchased"):
+                    purchased.append(product["Name"])
+    # Start from empty maps, so a failure below leaves an empty catalogue and an error
+    table.put_item(Item={"HouseholdID": household_id, "ListID": CATALOG_ID, "Names": {}, "Added": {}, "Purchased": {}})
+    record_catalog(household_id, added, purchased, raise_errors=True)
+    return len(added)
+
+def query_all(**query_kwargs):
+    items = []
+    while True:
+        result = table.query(**query_kwargs)
+        items.extend(result.get("Items", []))
+        if "LastEvaluatedKey" not in result:
+            return items
+        query_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
+def changes_since(household_id, marker, since):
+    """Lists written after version `since`, plus the IDs of lists deleted since then."""
+    full = since == 0 or since < int(marker.get("TombstoneFloor", 0))
+    if full:
+        # Older lists may predate versioning, so resend them all
+        since = 0
+        changed = [present_list(i) for i in query_all(KeyConditionExpression=Key("HouseholdID").eq(household_id)) if not is_marker(i)]
+    else:
+        changed = [present_list(i) for i in query_all(
+            IndexName=VERSION_INDEX,
+            KeyConditionExpression=Key("HouseholdID").eq(household_id) & Key("Version").gt(since)
+        )]
+    deleted = [lid for lid, version in (marker.get("Tombstones") or {}).items() if version > since]
+    return {
+        "version": int(marker.get("HouseholdVersion", 0)),
+        "full": full,
+        "shoppingLists": changed,
+        "deleted": deleted
+    }
+
+@metrics.invocation
 def lambda_handler(event, context):
-    print("Received event:", json.dumps(event))
+    log.request(event, context)
     
     if event.get("httpMethod") == "OPTIONS":
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-                "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                "Access-Control-Allow-Credentials": "true"
-            },
-            "body": ""
-        }
+        return preflight()
     
     try:
-        if "body" in event:
-            payload = json.loads(event.get("body") or "{}")
-        else:
+        method = event.get("httpMethod", "")
+        schema = REQUEST_SCHEMAS.get((method, event.get("resource", "")))
+        if "body" not in event:
             payload = event
+        elif schema:
+            payload = schema.parse(event)
+        else:
+            payload = json.loads(event.get("body") or "{}")
         
-        method = event.get("httpMethod", "")
         path_params = event.get("pathParameters") or {}
         query_params = event.get("queryStringParameters") or {}
         list_id = path_params.get("id")
@@ -39,58 +691,113 @@ def lambda_handler(event, context):
         household_id = query_params.get("HouseholdID") or payload.get("HouseholdID")
         if not household_id:
             return respond(400, {"message": "Missing HouseholdID"})
+        if list_id and list_id.startswith("#"):
+            # Marker items (#VERSION, #CATALOG) are not lists
+            return respond(404, {"message": "Shopping list not found"})
         
+        if method == "GET" and event.get("resource", "") == "/shopping-lists/catalog":
+            prefix = query_params.get("prefix", "")
+            try:
+                limit = min(int(query_params.get("limit") or DEFAULT_SUGGESTIONS), MAX_SUGGESTIONS)
+            except ValueError:
+                return respond(400, {"message": "limit must be a number"})
+            return respond(200, {"suggestions": catalog_index(household_id).suggest(prefix, limit)})
+
+        if method == "POST" and event.get("resource", "") == "/shopping-lists/catalog/rebuild":
+            return respond(200, {"products": rebuild_catalog(household_id)})
+
         if method == "GET":
+            since = query_params.get("since")
+            if since is not None and not since.isdigit():
+                return respond(400, {"message": "since must be a version number"})
+
+            # Idle households are answered from the marker alone with a 304
+            marker = read_version(household_id)
+            version = int(marker.get("HouseholdVersion", 0))
+            modified = int(marker.get("ModifiedAt", 0))
+            validators = validator_headers(f'"{version}"', modified)
+            if not_modified(event, validators["ETag"], modified):
+                return respond(304, None, validators)
+
             if list_id:
                 result = table.get_item(Key={"HouseholdID": household_id, "ListID": list_id})
-                if "Item" in result:
-                    return respond(200, result["Item"])
+                if "Item" in result and not is_marker(result["Item"]):
+                    return respond(200, present_list(result["Item"]), validators)
                 else:
                     return respond(404, {"message": "Shopping list not found"})
+            elif since is not None:
+                return respond(200, changes_since(household_id, marker, int(since)), validators)
             else:
-                result = table.query(KeyConditionExpression=Key("HouseholdID").eq(household_id))
-                return respond(200, {"shoppingLists": result.get("Items", [])})
+                items = query_all(KeyConditionExpression=Key("HouseholdID").eq(household_id))
+                return respond(200, {
+                    "shoppingLists": [present_list(item) for item in items if not is_marker(item)],
+                    "version": version
+                }, validators)
+        
+        elif method == "POST" and event.get("resource", "") == "/shopping-lists/{id}/sync":
+            # {"ReplicaID": ..., "since": <list version>, "ops": [{"op", "ProductID", "seq", "ts", ...}]}
+            replica = payload.get("ReplicaID")
+            if not replica or not isinstance(replica, str) or replica == SERVER_REPLICA:
+                return respond(400, {"message": "Missing ReplicaID"})
+            since = payload.get("since")
+            if since is not None and not isinstance(since, int):
+                return respond(400, {"message": "since must be a list version number"})
+            try:
+                ops = validate_sync_ops(payload.get("ops") or [])
+                return respond(200, sync_list(household_id, list_id, replica, ops, since))
+            except ValueError as e:
+                return respond(400, {"message": str(e)})
+            except ListNotFound:
+                return respond(404, {"message": "Shopping list not found"})
+            except ListChanged:
+                return respond(409, {"message": "Shopping list is busy, please retry"})
         
         elif method == "POST":
             list_id = str(uuid.uuid4())
             payload["ListID"] = list_id
             payload["HouseholdID"] = household_id
             payload["Products"] = payload.get("Products", [])
-            table.put_item(Item=payload)
-            return respond(201, payload)
+            return respond(201, put_list(payload))
         
         elif method == "PUT":
             if not list_id:
                 return respond(400, {"message": "Missing List ID in path"})
             payload["ListID"] = list_id
             payload["HouseholdID"] = household_id
-            table.put_item(Item=payload)
-            return respond(200, payload)
+            previous = table.get_item(Key={"HouseholdID": household_id, "ListID": list_id}).get("Item")
+            return respond(200, put_list(payload, previous))
+        
+        elif method == "PATCH":
+            # Batched per-product operations: {"ops": [{"op": "check", "ProductID": ...}, ...]}
+            if not list_id:
+                return respond(400, {"message": "Missing List ID in path"})
+            ops = payload.get("ops")
+            if not isinstance(ops, list) or not ops:
+                return respond(400, {"message": "ops must be a non-empty list"})
+            if len(ops) > MAX_OPS_PER_REQUEST:
+                return respond(400, {"message": f"At most {MAX_OPS_PER_REQUEST} ops per request"})
+            try:
+                result = apply_product_ops(household_id, list_id, ops)
+            except ValueError as e:
+                return respond(400, {"message": str(e)})
+            except ListNotFound:
+                return respond(404, {"message": "Shopping list not found"})
+            return respond(200, {"ListID": list_id, **result})
         
         elif method == "DELETE":
             if not list_id:
                 return respond(400, {"message": "Missing List ID in path"})
-            table.delete_item(Key={"HouseholdID": household_id, "ListID": list_id})
+            write_versioned(household_id, lambda version: [
+                {"Delete": {"TableName": TABLE_NAME, "Key": {"HouseholdID": household_id, "ListID": list_id}}}
+            ], removed_id=list_id)
             return respond(200, {"message": "Shopping list deleted"})
         
         else:
             return respond(405, {"message": "Method not allowed"})
     
+    except ValidationError as e:
+        log.info("request rejected", error=str(e))
+        return respond(e.status_code, {"message": str(e)})
     except Exception as e:
-        print("Error:", e)
+        log.error("unhandled error", error=str(e))
         return respond(500, {"message": str(e)})
-
-def respond(status_code, body):
-    def decimal_default(obj):
-        if isinstance(obj, Decimal):
-            return float(obj)
-        raise TypeError
-    return {
-        "statusCode": status_code,
-        "headers": {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Credentials": "true"
-        },
-        "body": json.dumps(body, default=decimal_default)
-    }
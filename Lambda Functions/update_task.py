@@ -1,10 +1,14 @@
 import json
-import boto3
+from botocore.exceptions import ClientError
+from flatchat.http import respond
+from flatchat import log, metrics, versioning
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('Households') 
+class TasksNotFound(Exception):
+    pass
 
+@metrics.invocation
 def lambda_handler(event, context):
+    log.request(event, context)
     try:
         task_id = event["pathParameters"]["taskID"]
 
@@ -18,58 +22,41 @@ def lambda_handler(event, context):
         completed = body.get("Completed")
 
         if not household_id:
-            return {
-                "statusCode": 400,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps("HouseholdID is required")
-            }
-
-        response = table.get_item(Key={"HouseholdID": household_id})
-        household = response.get("Item")
-
-        if not household or "Tasks" not in household:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps("No tasks found for that Household")
-            }
-
-        tasks = household["Tasks"]  
-        task_found = False
-        
-        for t in tasks:
-            if t["TaskID"] == task_id:
-                t["Title"] = title
-                t["AssignedTo"] = assigned_to
-                t["Frequency"] = frequency
-                t["DueDate"] = due_date
-                t["Completed"] = completed
-                task_found = True
-                break
-        
-        if not task_found:
-            return {
-                "statusCode": 404,
-                "headers": {"Access-Control-Allow-Origin": "*"},
-                "body": json.dumps("Task not found")
-            }
-
-        table.update_item(
-            Key={"HouseholdID": household_id},
-            UpdateExpression="SET Tasks = :tasks",
-            ExpressionAttributeValues={":tasks": tasks}
-        )
-
-        return {
-            "statusCode": 200,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps({"message": "Task updated", "tasks": tasks})
-        }
+            return respond(400, "HouseholdID is required")
+
+        # Guarded on the version read, so a concurrent task write is not lost
+        updated = {}
+
+        def changes(household, version, now):
+            if "Tasks" not in household:
+                raise TasksNotFound("No tasks found for that Household")
+            tasks = household["Tasks"]
+            for t in tasks:
+                if t["TaskID"] == task_id:
+                    t["Title"] = title
+                    t["AssignedTo"] = assigned_to
+                    t["Frequency"] = frequency
+                    t["DueDate"] = due_date
+                    t["Completed"] = completed
+                    t["Version"] = version
+                    break
+            else:
+                raise TasksNotFound("Task not found")
+            updated["tasks"] = tasks
+            return {"sets": ["Tasks = :tasks"], "values": {":tasks": tasks}}
+
+        try:
+            versioning.TASKS.write(household_id, changes=changes)
+        except TasksNotFound as e:
+            return respond(404, str(e))
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            return respond(409, "Tasks changed concurrently, please retry")
+
+        tasks = updated["tasks"]
+        return respond(200, {"message": "Task updated", "tasks": tasks})
 
     except Exception as e:
-        print("Error:", e)
-        return {
-            "statusCode": 500,
-            "headers": {"Access-Control-Allow-Origin": "*"},
-            "body": json.dumps(f"Error: {str(e)}")
-        }
+        log.error("unhandled error", error=str(e))
+        return respond(500, f"Error: {str(e)}")
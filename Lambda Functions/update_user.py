@@ -1,49 +1,35 @@
 from decimal import Decimal, InvalidOperation
-import json
-import boto3
+from flatchat.http import respond, preflight
+from flatchat import aws, log, metrics, profiles
+from flatchat.validation import Boolean, Number, Schema, String, ValidationError
 
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('UserDetails')  
+table = aws.table('UserDetails')
 
-def convert_decimals(obj):
-    """
-    Recursively convert any Decimal to float in a dict or list.
-    """
-    if isinstance(obj, list):
-        return [convert_decimals(i) for i in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_decimals(v) for k, v in obj.items()}
-    elif isinstance(obj, Decimal):
-        return float(obj)
-    else:
-        return obj
+# What a user may change about themselves; HouseholdID and CreatedAt are
+# only set by the household and registration flows.
+USER_UPDATE = Schema({
+    "UserID": String(max_length=128, required=True),
+    "Name": String(max_length=100),
+    "Email": String(max_length=254),
+    "College": String(max_length=200),
+    "AreaOfStudy": String(max_length=200),
+    "DoNotDisturb": Boolean(),
+    "Latitude": Number(minimum=-90, maximum=90),
+    "Longitude": Number(minimum=-180, maximum=180),
+}, max_bytes=16 * 1024)
 
+@metrics.invocation
 def lambda_handler(event, context):
+    log.request(event, context)
     if event.get('httpMethod') == 'OPTIONS':
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "http://localhost:5173",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,PUT,GET,DELETE"
-            },
-            "body": ""
-        }
+        return preflight()
     
     try:
-        body = json.loads(event.get("body", "{}"))
+        body = USER_UPDATE.parse(event)
         user_id = body["UserID"]
-    except (KeyError, json.JSONDecodeError) as e:
-        print("Error parsing body or missing UserID:", e)
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Access-Control-Allow-Origin": "http://localhost:5173",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,PUT,GET,DELETE"
-            },
-            "body": json.dumps({"message": "UserID is required in request body"})
-        }
+    except ValidationError as e:
+        log.warning("invalid request body", error=str(e))
+        return respond(e.status_code, {"message": str(e)})
     
     expression_pieces = []
     expression_names = {}
@@ -62,7 +48,7 @@ def lambda_handler(event, context):
             try:
                 expression_values[f":val_{key}"] = Decimal(str(value))
             except (ValueError, InvalidOperation) as num_err:
-                print(f"Error converting numeric field {key}: {num_err}")
+                log.debug("keeping non-decimal numeric field", field=key, error=str(num_err))
                 expression_values[f":val_{key}"] = value
         elif isinstance(value, str):
             if value.strip() == "":
@@ -77,20 +63,10 @@ def lambda_handler(event, context):
             expression_values[f":val_{key}"] = value
 
     if not expression_pieces:
-        return {
-            "statusCode": 400,
-            "headers": {
-                "Access-Control-Allow-Origin": "http://localhost:5173",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,PUT,GET,DELETE"
-            },
-            "body": json.dumps({"message": "No fields provided to update"})
-        }
+        return respond(400, {"message": "No fields provided to update"})
 
     update_expression = "SET " + ", ".join(expression_pieces)
-    print("UpdateExpression:", update_expression)
-    print("ExpressionAttributeNames:", expression_names)
-    print("ExpressionAttributeValues:", expression_values)
+    log.debug("updating user", userId=user_id, fields=sorted(expression_names.values()))
     
     try:
         result = table.update_item(
@@ -100,28 +76,12 @@ def lambda_handler(event, context):
             ExpressionAttributeValues=expression_values,
             ReturnValues="ALL_NEW"
         )
-        updated_item = convert_decimals(result.get("Attributes", {}))
-        print("Update result:", updated_item)
-        return {
-            "statusCode": 200,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,PUT,GET,DELETE"
-            },
-            "body": json.dumps({
-                "message": "User updated successfully",
-                "UpdatedItem": updated_item
-            })
-        }
+        updated_item = result.get("Attributes", {})
+        profiles.store(updated_item)
+        return respond(200, {
+            "message": "User updated successfully",
+            "UpdatedItem": updated_item
+        })
     except Exception as e:
-        print(f"Error updating user: {str(e)}")
-        return {
-            "statusCode": 500,
-            "headers": {
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "Content-Type,Authorization",
-                "Access-Control-Allow-Methods": "OPTIONS,POST,PUT,GET,DELETE"
-            },
-            "body": json.dumps({"message": "Internal Server Error", "error": str(e)})
-        }
+        log.error("updating user failed", userId=user_id, error=str(e))
+        return respond(500, {"message": "Internal Server Error", "error": str(e)})
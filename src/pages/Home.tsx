@@ -32,6 +32,16 @@ const formatOrdinalDate = (d: Date): string => {
   return `${day}${suffix} ${month}`;
 };
 
+// Matches the datetime-local values the booking form sends
+const toLocalInputValue = (date: Date): string => {
+  const pad = (n: number) => String(n).padStart(2, "0");
+  return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}T${pad(
+    date.getHours()
+  )}:${pad(date.getMinutes())}`;
+};
+
+const UPCOMING_RESERVATION_DAYS = 90;
+
 interface BillInfo {
   Title: string;
   DueBy?: string;
@@ -145,7 +155,8 @@ const Home: React.FC = () => {
     fetch(`${ENDPOINTS.notices}?HouseholdID=${householdID}`)
       .then(r => r.json())
       .then(d => {
-        const notes = d.notices||[];
+        // Pinned notices come back separately from the first page
+        const notes = [...(d.pinned||[]), ...(d.notices||[])];
         if (notes.length) {
           const latest = notes.sort((a:any,b:any) =>
             new Date(b.CreatedAt).getTime() - new Date(a.CreatedAt).getTime()
@@ -187,29 +198,46 @@ const Home: React.FC = () => {
       .catch(() => setChosenChore("Chore data unavailable"))
       .finally(() => setLoadingChore(false));
 
-    // next reservation
+    // next reservation: page through the upcoming window in start order
+    // until a booking that has not started yet turns up
+    const findNextReservation = async () => {
+      const now = new Date();
+      const until = new Date(now);
+      until.setDate(until.getDate() + UPCOMING_RESERVATION_DAYS);
+      const params = new URLSearchParams({
+        HouseholdID: householdID,
+        from: toLocalInputValue(now),
+        to: toLocalInputValue(until),
+        limit: "10",
+      });
+      let cursor: string | null = null;
+      do {
+        if (cursor) params.set("cursor", cursor);
+        const r = await fetch(`${ENDPOINTS.reservations}?${params.toString()}`);
+        if (!r.ok) throw new Error();
+        const data: { reservations?: any[]; cursor?: string | null } = await r.json();
+        const next = (data.reservations || []).find((x: any) => new Date(x.StartTime) > now);
+        if (next) return next;
+        cursor = data.cursor || null;
+      } while (cursor);
+      return null;
+    };
     fetch(`${ENDPOINTS.householdUsers}?HouseholdID=${householdID}`)
       .then(r => r.json())
       .then(({ users }) => {
         const m: Record<string,string> = {};
         (users||[]).forEach((u:any)=>m[u.UserID]=u.Name);
-        return fetch(`${ENDPOINTS.reservations}?HouseholdID=${householdID}`)
-          .then(r => r.json())
-          .then(({ reservations }) => {
-            const up = (reservations||[])
-              .filter((x:any)=>new Date(x.StartTime) > new Date())
-              .sort((a:any,b:any)=>new Date(a.StartTime).getTime() - new Date(b.StartTime).getTime());
-            if (up.length) {
-              const n = up[0];
-              const who = n.ReservedBy === userID ? "You" : m[n.ReservedBy]||"Someone";
-              const dt = new Date(n.StartTime).toLocaleString("default", {
-                day: "numeric", month: "short", hour: "numeric", minute: "2-digit", hour12: true
-              });
-              setNextReservation(`Upcoming: ${who} has ${n.SpaceName} reserved for ${dt}`);
-            } else {
-              setNextReservation("No upcoming reservations");
-            }
-          });
+        return findNextReservation().then(n => {
+          if (n) {
+            const who = n.ReservedBy === userID ? "You" : m[n.ReservedBy]||"Someone";
+            const dt = new Date(n.StartTime).toLocaleString("default", {
+              day: "numeric", month: "short", hour: "numeric", minute: "2-digit", hour12: true
+            });
+            setNextReservation(`Upcoming: ${who} has ${n.SpaceName} reserved for ${dt}`);
+          } else {
+            setNextReservation("No upcoming reservations");
+          }
+        });
       })
       .catch(() => setNextReservation("Reservation data unavailable"))
       .finally(() => setLoadingResv(false));
@@ -79,6 +79,8 @@ interface Notice {
   Content?: string;
   CreatedBy?: string;  // we'll store the user's friendly name here
   CreatedAt?: string;
+  Pinned?: boolean;
+  ExpiresAt?: number;
 }
 
 function getOrdinalSuffix(day: number): string {
@@ -119,6 +121,8 @@ const NoticeBoardPage: React.FC = () => {
   const [userName, setUserName] = useState<string | null>(null);
 
   const [notices, setNotices] = useState<Notice[]>([]);
+  const [pinned, setPinned] = useState<Notice[]>([]);
+  const [cursor, setCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState<boolean>(false);
   const [error, setError] = useState<string | null>(null);
 
@@ -145,19 +149,28 @@ const NoticeBoardPage: React.FC = () => {
     }
   }, [householdID]);
 
-  const fetchNotices = async (hid: string) => {
+  // Newest first; passing a cursor appends the next page
+  const fetchNotices = async (hid: string, pageCursor?: string) => {
     setLoading(true);
     setError(null);
     try {
-      const response = await fetch(
-        `${NOTICE_API_BASE_URL}/notices?HouseholdID=${encodeURIComponent(hid)}`
-      );
+      let url = `${NOTICE_API_BASE_URL}/notices?HouseholdID=${encodeURIComponent(hid)}`;
+      if (pageCursor) {
+        url += `&cursor=${encodeURIComponent(pageCursor)}`;
+      }
+      const response = await fetch(url);
       if (!response.ok) {
         const text = await response.text();
         throw new Error(text || "Failed to fetch notices");
       }
       const data = await response.json();
-      setNotices(data.notices || []);
+      if (pageCursor) {
+        setNotices((prev) => [...prev, ...(data.notices || [])]);
+      } else {
+        setNotices(data.notices || []);
+        setPinned(data.pinned || []);
+      }
+      setCursor(data.cursor || null);
     } catch (err: unknown) {
       setError(err instanceof Error ? err.message : "Failed to fetch notices");
     }
@@ -254,10 +267,11 @@ const NoticeBoardPage: React.FC = () => {
 
         {/* sticky note style */}
         <MDBRow>
-          {notices.map((notice) => (
+          {[...pinned, ...notices].map((notice) => (
             <MDBCol key={notice.NoticeID} xs="12" sm="6" md="4" lg="3" className="mb-3">
               <MDBCard style={{ backgroundColor: "#fff9c4", minHeight: "150px" }}>
                 <MDBCardHeader style={{ fontWeight: "bold" }}>
+                  {notice.Pinned && <MDBIcon icon="thumbtack" className="me-2" />}
                   {notice.Title || "Untitled"}
                   <MDBIcon
                     icon="trash"
@@ -282,6 +296,16 @@ const NoticeBoardPage: React.FC = () => {
             </MDBCol>
           ))}
         </MDBRow>
+
+        {cursor && householdID && (
+          <MDBRow className="mb-3">
+            <MDBCol className="text-center">
+              <MDBBtn color="secondary" disabled={loading} onClick={() => fetchNotices(householdID, cursor)}>
+                Load more
+              </MDBBtn>
+            </MDBCol>
+          </MDBRow>
+        )}
       </MDBContainer>
 
       {/* Modal for adding a new note */}
@@ -75,6 +75,20 @@ const formatDateTime = (dateString: string): string => {
   return date.toLocaleString("en-US", opts);
 };
 
+// Matches the datetime-local values the booking form sends
+const toLocalInputValue = (date: Date): string => {
+  const pad = (n: number) => String(n).padStart(2, "0");
+  return `${date.getFullYear()}-${pad(date.getMonth() + 1)}-${pad(date.getDate())}T${pad(
+    date.getHours()
+  )}:${pad(date.getMinutes())}`;
+};
+
+const startOfToday = (): Date => {
+  const d = new Date();
+  d.setHours(0, 0, 0, 0);
+  return d;
+};
+
 interface Reservation {
   ReservationID: string;
   SpaceName: string;
@@ -84,6 +98,8 @@ interface Reservation {
   EndTime: string;
   ApprovalStatus?: "Pending" | "Approved" | "Rejected";
   Approvers?: string[];
+  SeriesID?: string;
+  Recurrence?: { Frequency: "DAILY" | "WEEKLY"; Interval?: number; Until?: string };
 }
 
 interface HouseholdUser {
@@ -108,6 +124,7 @@ const ReserveSharedSpace: React.FC = () => {
   const [reservations, setReservations] = useState<Reservation[]>([]);
   const [householdUsers, setHouseholdUsers] = useState<HouseholdUser[]>([]);
   const [loading, setLoading] = useState<boolean>(false);
+  const [weekStart, setWeekStart] = useState<Date>(startOfToday());
 
   // Modal state
   const [modalOpen, setModalOpen] = useState<boolean>(false);
@@ -117,6 +134,7 @@ const ReserveSharedSpace: React.FC = () => {
   const spaceOptions = ["Living Room", "Kitchen", "Dining Room", "Study", "Other"];
   const [useCustomSpace, setUseCustomSpace] = useState<boolean>(false);
   const [customSpaceName, setCustomSpaceName] = useState<string>("");
+  const [repeatWeekly, setRepeatWeekly] = useState<boolean>(false);
 
   // Load session on mount
   useEffect(() => {
@@ -137,19 +155,29 @@ const ReserveSharedSpace: React.FC = () => {
     })();
   }, [navigate]);
 
-  // Fetch reservations
+  // Fetch reservations for the visible week
   const fetchReservations = async () => {
     if (!householdID) return;
     setLoading(true);
     try {
-      const url = `${RESERVATIONS_BASE_URL}/reservations?HouseholdID=${encodeURIComponent(
-        householdID
-      )}`;
-      const resp = await fetch(url);
-      const { reservations: all = [] } = await resp.json();
-      const now = new Date();
-      const active = all.filter((r: Reservation) => new Date(r.EndTime) > now);
-      setReservations(active);
+      const weekEnd = new Date(weekStart);
+      weekEnd.setDate(weekEnd.getDate() + 7);
+      const from = weekStart < new Date() && weekEnd > new Date() ? new Date() : weekStart;
+      const params = new URLSearchParams({
+        HouseholdID: householdID,
+        from: toLocalInputValue(from),
+        to: toLocalInputValue(weekEnd),
+      });
+      const all: Reservation[] = [];
+      let cursor: string | null = null;
+      do {
+        if (cursor) params.set("cursor", cursor);
+        const resp = await fetch(`${RESERVATIONS_BASE_URL}/reservations?${params.toString()}`);
+        const data: { reservations?: Reservation[]; cursor?: string | null } = await resp.json();
+        all.push(...(data.reservations || []));
+        cursor = data.cursor || null;
+      } while (cursor);
+      setReservations(all);
     } catch (e) {
       console.error(e);
       setError("Failed to load reservations.");
@@ -158,6 +186,12 @@ const ReserveSharedSpace: React.FC = () => {
     }
   };
 
+  const shiftWeek = (weeks: number) => {
+    const next = new Date(weekStart);
+    next.setDate(next.getDate() + weeks * 7);
+    setWeekStart(next);
+  };
+
   // Fetch users
   const fetchHouseholdUsers = async () => {
     if (!householdID) return;
@@ -175,15 +209,20 @@ const ReserveSharedSpace: React.FC = () => {
 
   useEffect(() => {
     if (householdID) {
-      fetchReservations();
       fetchHouseholdUsers();
     }
   }, [householdID]);
 
+  useEffect(() => {
+    if (householdID) {
+      fetchReservations();
+    }
+  }, [householdID, weekStart]);
+
   // Delete
   const deleteReservation = async (id: string) => {
     if (!currentUser) return;
-    const url = `${RESERVATIONS_BASE_URL}/reservations/${id}?HouseholdID=${encodeURIComponent(
+    const url = `${RESERVATIONS_BASE_URL}/reservations/${encodeURIComponent(id)}?HouseholdID=${encodeURIComponent(
       householdID
     )}&UserID=${encodeURIComponent(currentUser.userID)}`;
     try {
@@ -197,7 +236,7 @@ const ReserveSharedSpace: React.FC = () => {
   // Approve/Reject
   const handleApproval = async (id: string, action: "Approve" | "Reject") => {
     if (!currentUser) return;
-    const url = `${RESERVATIONS_BASE_URL}/reservations/${id}/approve?HouseholdID=${encodeURIComponent(
+    const url = `${RESERVATIONS_BASE_URL}/reservations/${encodeURIComponent(id)}/approve?HouseholdID=${encodeURIComponent(
       householdID
     )}`;
     try {
@@ -233,6 +272,7 @@ const ReserveSharedSpace: React.FC = () => {
       EndTime: newReservation.EndTime,
       ApprovalStatus: "Pending",
       Approvers: [] as string[],
+      ...(repeatWeekly ? { Recurrence: { Frequency: "WEEKLY", Interval: 1 } } : {}),
     };
     try {
       const resp = await fetch(`${RESERVATIONS_BASE_URL}/reservations`, {
@@ -244,7 +284,8 @@ const ReserveSharedSpace: React.FC = () => {
         setModalOpen(false);
         fetchReservations();
       } else {
-        alert("Failed to save reservation");
+        const { message } = await resp.json().catch(() => ({ message: "" }));
+        alert(message || "Failed to save reservation");
       }
     } catch (e) {
       console.error(e);
@@ -269,6 +310,7 @@ const ReserveSharedSpace: React.FC = () => {
                   setNewReservation({});
                   setUseCustomSpace(false);
                   setCustomSpaceName("");
+                  setRepeatWeekly(false);
                   setModalOpen(true);
                 }}
               >
@@ -276,10 +318,22 @@ const ReserveSharedSpace: React.FC = () => {
               </MDBBtn>
             </div>
 
+            <div className="d-flex justify-content-between align-items-center mb-3">
+              <MDBBtn color="light" size="sm" onClick={() => shiftWeek(-1)}>
+                <MDBIcon fas icon="chevron-left" />
+              </MDBBtn>
+              <span>
+                Week of {weekStart.toLocaleDateString()}
+              </span>
+              <MDBBtn color="light" size="sm" onClick={() => shiftWeek(1)}>
+                <MDBIcon fas icon="chevron-right" />
+              </MDBBtn>
+            </div>
+
             {loading && <p className="text-center">Loading...</p>}
             {error && <p className="text-danger text-center">{error}</p>}
             {!loading && reservations.length === 0 && (
-              <p className="text-center text-muted">No reservations yet…</p>
+              <p className="text-center text-muted">No reservations this week…</p>
             )}
 
             {reservations.map((res) => {
@@ -301,6 +355,11 @@ const ReserveSharedSpace: React.FC = () => {
                     <p>
                       <strong>End:</strong> {formatDateTime(res.EndTime)}
                     </p>
+                    {res.Recurrence && (
+                      <p className="text-muted">
+                        <MDBIcon fas icon="redo" /> Repeats weekly
+                      </p>
+                    )}
                     <p>
                       <strong>Status:</strong> {res.ApprovalStatus || "Pending"}
                     </p>
@@ -429,6 +488,18 @@ const ReserveSharedSpace: React.FC = () => {
                 }
                 className="mb-3"
               />
+              <div className="form-check">
+                <input
+                  className="form-check-input"
+                  type="checkbox"
+                  id="repeatWeekly"
+                  checked={repeatWeekly}
+                  onChange={(e) => setRepeatWeekly(e.target.checked)}
+                />
+                <label className="form-check-label" htmlFor="repeatWeekly">
+                  Repeat every week
+                </label>
+              </div>
             </MDBModalBody>
             <MDBModalFooter>
               <MDBBtn color="secondary" onClick={() => setModalOpen(false)}>
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, ChangeEvent } from "react";
+import React, { useState, useEffect, useRef, ChangeEvent } from "react";
 import { useParams, useNavigate } from "react-router-dom";
 import Navigation from "../components/Navigation";
 import {
@@ -60,6 +60,7 @@ interface Product {
   ProductID: string;
   Name: string;
   Purchased: boolean;
+  Quantity?: number;
   addedBy?: string;
 }
 
@@ -68,18 +69,84 @@ interface ShoppingList {
   HouseholdID: string;
   Title: string;
   Products: Product[];
+  Version?: number;
 }
 
+// Offline edits are queued per list and pushed to the sync endpoint on
+// reconnect. Each op carries this browser's replica ID, a sequence number
+// and a timestamp so the server can merge them last-writer-wins.
+interface QueuedOp {
+  op: string;
+  ProductID?: string;
+  product?: Product;
+  Quantity?: number;
+  seq: number;
+  ts: number;
+}
+
+const getReplicaID = (): string => {
+  let replicaID = localStorage.getItem("shoppingReplicaID");
+  if (!replicaID) {
+    replicaID = `web-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 10)}`;
+    localStorage.setItem("shoppingReplicaID", replicaID);
+  }
+  return replicaID;
+};
+
+const nextSeq = (): number => {
+  const seq = Number(localStorage.getItem("shoppingReplicaSeq") || "0") + 1;
+  localStorage.setItem("shoppingReplicaSeq", String(seq));
+  return seq;
+};
+
+const queueKey = (listID: string) => `shoppingSyncQueue:${listID}`;
+
+const readQueue = (listID: string): QueuedOp[] =>
+  JSON.parse(localStorage.getItem(queueKey(listID)) || "[]");
+
+const writeQueue = (listID: string, ops: QueuedOp[]) => {
+  if (ops.length > 0) {
+    localStorage.setItem(queueKey(listID), JSON.stringify(ops));
+  } else {
+    localStorage.removeItem(queueKey(listID));
+  }
+};
+
 const ShoppingListDetail: React.FC = () => {
   const { id } = useParams<{ id: string }>(); // Shopping list ID from URL
   const navigate = useNavigate();
   const [householdID, setHouseholdID] = useState<string | null>(null);
   const [userName, setUserName] = useState<string | null>(null);
   const [shoppingList, setShoppingList] = useState<ShoppingList | null>(null);
+  // The "online" listener outlives renders, so it reads the version from here
+  const versionRef = useRef<number | undefined>(undefined);
   const [loading, setLoading] = useState<boolean>(false);
   const [error, setError] = useState<string | null>(null);
 
   const [newItemName, setNewItemName] = useState<string>("");
+  const [suggestions, setSuggestions] = useState<string[]>([]);
+
+  // Autocomplete from the household's product catalogue
+  useEffect(() => {
+    if (!householdID || !newItemName.trim()) {
+      setSuggestions([]);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const response = await fetch(
+          `${API_BASE_URL}/shopping-lists/catalog?HouseholdID=${encodeURIComponent(householdID)}&prefix=${encodeURIComponent(newItemName)}`
+        );
+        if (response.ok) {
+          const data = await response.json();
+          setSuggestions((data.suggestions || []).map((s: { Name: string }) => s.Name));
+        }
+      } catch (err) {
+        setSuggestions([]);
+      }
+    }, 150);
+    return () => clearTimeout(timer);
+  }, [householdID, newItemName]);
 
   useEffect(() => {
     async function loadSession() {
@@ -114,68 +181,160 @@ const ShoppingListDetail: React.FC = () => {
     setLoading(false);
   };
 
+  useEffect(() => {
+    versionRef.current = shoppingList?.Version;
+  }, [shoppingList]);
+
   useEffect(() => {
     if (householdID && id) {
-      fetchShoppingList();
+      if (readQueue(id).length > 0) {
+        syncQueuedOps();
+      } else {
+        fetchShoppingList();
+      }
+      window.addEventListener("online", syncQueuedOps);
+      return () => window.removeEventListener("online", syncQueuedOps);
     }
   }, [householdID, id]);
 
-  // Toggle the purchased status of a product then update server
+  // Push queued offline ops in one round trip and merge what comes back
+  const syncQueuedOps = async () => {
+    if (!householdID || !id) return;
+    const queued = readQueue(id);
+    if (queued.length === 0) return;
+    const replicaID = getReplicaID();
+    try {
+      const response = await fetch(
+        `${API_BASE_URL}/shopping-lists/${id}/sync?HouseholdID=${encodeURIComponent(householdID)}`,
+        {
+          method: "POST",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({
+            HouseholdID: householdID,
+            ReplicaID: replicaID,
+            since: versionRef.current,
+            ops: queued,
+          }),
+        }
+      );
+      if (!response.ok) {
+        // 5xx and 409 (list busy) are retried on the next sync; any other
+        // 4xx will never apply, so drop the queue and reload the list
+        if (response.status >= 500 || response.status === 409) return;
+        const errData = await response.json().catch(() => ({}));
+        writeQueue(id, []);
+        alert("Failed to sync offline changes: " + (errData.message || "Unknown error"));
+        fetchShoppingList();
+        return;
+      }
+      const data = await response.json();
+      const applied = (data.vector && data.vector[replicaID]) || 0;
+      writeQueue(id, readQueue(id).filter((op) => op.seq > applied));
+
+      setShoppingList((current) => {
+        const base: Product[] = data.full || !current ? [] : current.Products;
+        const merged = new Map(base.map((p) => [p.ProductID, p]));
+        for (const product of data.products || []) {
+          if (product.Deleted) {
+            merged.delete(product.ProductID);
+          } else {
+            merged.set(product.ProductID, product);
+          }
+        }
+        return {
+          ListID: data.ListID,
+          HouseholdID: householdID,
+          Title: data.Title ?? current?.Title ?? "",
+          Products: Array.from(merged.values()),
+          Version: data.version,
+        };
+      });
+    } catch (err) {
+      // Still offline; the queue is kept for the next attempt
+    }
+  };
+
+  const queueOps = (ops: object[]) => {
+    if (!id) return;
+    const stamped = ops.map((op) => ({ ...op, seq: nextSeq(), ts: Date.now() } as QueuedOp));
+    writeQueue(id, [...readQueue(id), ...stamped]);
+  };
+
+  // Apply a change locally, then send it as a per-product op so
+  // concurrent edits to other products are never overwritten
+  const sendOps = async (ops: object[], updatedProducts: Product[]) => {
+    if (!householdID || !shoppingList) return;
+    setShoppingList({ ...shoppingList, Products: updatedProducts });
+    if (!navigator.onLine || (id && readQueue(id).length > 0)) {
+      // Keep ordering behind ops that are already waiting
+      queueOps(ops);
+      syncQueuedOps();
+      return;
+    }
+    try {
+      const response = await fetch(
+        `${API_BASE_URL}/shopping-lists/${shoppingList.ListID}?HouseholdID=${encodeURIComponent(householdID)}`,
+        {
+          method: "PATCH",
+          headers: { "Content-Type": "application/json" },
+          body: JSON.stringify({ HouseholdID: householdID, ops }),
+        }
+      );
+      if (!response.ok) {
+        const errData = await response.json();
+        alert("Failed to update list: " + (errData.message || "Unknown error"));
+        fetchShoppingList();
+      } else {
+        const data = await response.json();
+        if (data.skipped && data.skipped.length > 0) {
+          // Someone else removed the product meanwhile
+          fetchShoppingList();
+        }
+      }
+    } catch (err: any) {
+      // Lost connection mid-request: queue for the sync endpoint
+      queueOps(ops);
+    }
+  };
+
+  // Toggle the purchased status of a product
   const togglePurchased = (productId: string) => {
     if (!shoppingList) return;
+    const product = shoppingList.Products.find((prod) => prod.ProductID === productId);
+    if (!product) return;
     const updatedProducts = shoppingList.Products.map((prod) =>
       prod.ProductID === productId
         ? { ...prod, Purchased: !prod.Purchased }
         : prod
     );
-    updateShoppingListOnServer({ ...shoppingList, Products: updatedProducts });
+    sendOps(
+      [{ op: product.Purchased ? "uncheck" : "check", ProductID: productId, Name: product.Name }],
+      updatedProducts
+    );
   };
 
-  // Add new item (with addedBy set to userName) then update server
+  // Add new item (with addedBy set to userName)
   const addNewItem = () => {
     if (!newItemName.trim() || !shoppingList) return;
     const newProduct: Product = {
       ProductID: Date.now().toString(),
       Name: newItemName,
       Purchased: false,
+      Quantity: 1,
       addedBy: userName || "Unknown",
     };
     const updatedProducts = [...shoppingList.Products, newProduct];
-    updateShoppingListOnServer({ ...shoppingList, Products: updatedProducts });
+    sendOps([{ op: "add", product: newProduct }], updatedProducts);
     setNewItemName("");
   };
 
-  // Delete a product then update server
+  // Delete a product
   const deleteProduct = (productId: string) => {
     if (!shoppingList) return;
     const updatedProducts = shoppingList.Products.filter(
       (prod) => prod.ProductID !== productId
     );
-    updateShoppingListOnServer({ ...shoppingList, Products: updatedProducts });
-  };
-
-  // Update shopping list on server via PUT
-  const updateShoppingListOnServer = async (updatedList: ShoppingList) => {
-    if (!householdID) return;
-    try {
-      const response = await fetch(
-        `${API_BASE_URL}/shopping-lists/${updatedList.ListID}?HouseholdID=${encodeURIComponent(householdID)}`,
-        {
-          method: "PUT",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify(updatedList),
-        }
-      );
-      if (response.ok) {
-        const data = await response.json();
-        setShoppingList(data);
-      } else {
-        const errData = await response.json();
-        alert("Failed to update list: " + (errData.message || "Unknown error"));
-      }
-    } catch (err: any) {
-      alert("Error updating list: " + (err.message || "Unknown error"));
-    }
+    sendOps([{ op: "remove", ProductID: productId }], updatedProducts);
   };
 
   if (loading) {
@@ -259,7 +418,13 @@ const ShoppingListDetail: React.FC = () => {
                     label="Add New Item"
                     value={newItemName}
                     onChange={(e: ChangeEvent<HTMLInputElement>) => setNewItemName(e.target.value)}
+                    list="product-suggestions"
                   />
+                  <datalist id="product-suggestions">
+                    {suggestions.map((name) => (
+                      <option key={name} value={name} />
+                    ))}
+                  </datalist>
                 </MDBCol>
                 <MDBCol md="4">
                   <MDBBtn color="primary" onClick={addNewItem} className="w-100">